@@ -0,0 +1,42 @@
+'''
+Benchmarks of the comets accessors, and of a whole run with the synthetic
+engine.
+'''
+
+from .common import run_synthetic
+
+
+class AccessorSuite:
+    """ get_*_image accessors on a finished grid x grid simulation """
+    params = [10, 40, 100]
+    param_names = ['grid']
+    timeout = 600
+
+    def setup_cache(self):
+        return({grid: run_synthetic(grid, 20) for grid in self.params})
+
+    def setup(self, sims, grid):
+        self.sim = sims[grid]
+        self.model_id = self.sim.layout.get_model_ids()[0]
+        self.met = self.sim.layout.all_exchanged_mets[0]
+        self.reaction = self.sim.layout.models[0].get_reaction_names()[0]
+
+    def time_get_metabolite_image(self, sims, grid):
+        self.sim.get_metabolite_image(self.met, 20)
+
+    def time_get_biomass_image(self, sims, grid):
+        self.sim.get_biomass_image(self.model_id, 20)
+
+    def time_get_flux_image(self, sims, grid):
+        self.sim.get_flux_image(self.model_id, self.reaction, 20)
+
+
+class RunSuite:
+    """ comets.run() from writing the input files to parsing the logs, with
+    the synthetic engine standing in for COMETS """
+    params = [10, 40]
+    param_names = ['grid']
+    timeout = 600
+
+    def time_run(self, grid):
+        run_synthetic(grid, 10)
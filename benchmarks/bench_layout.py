@@ -0,0 +1,39 @@
+'''
+Benchmarks of writing and reading layouts with many local values.
+'''
+
+import os
+import tempfile
+
+import cometspy as c
+
+from .common import make_layout
+
+
+class LayoutSuite:
+    """ layout files with local media, refresh and static values on every
+    cell of a grid x grid layout, and a region map """
+    params = [10, 50, 150]
+    param_names = ['grid']
+    timeout = 600
+
+    def setup(self, grid):
+        self.layout = make_layout(grid)
+        self.dir = tempfile.mkdtemp(prefix = 'cometspy_bench_') + '/'
+        self.layout.write_necessary_files(self.dir)
+        self.path = self.dir + '.current_layout'
+        self.cwd = os.getcwd()
+        os.chdir(self.dir)  # model files are found from here when reading
+
+    def teardown(self, grid):
+        os.chdir(self.cwd)
+
+    def time_write_layout(self, grid):
+        self.layout.write_layout(self.dir)
+
+    def time_read_comets_layout(self, grid):
+        c.layout(self.path)
+
+    def track_layout_file_bytes(self, grid):
+        return(os.path.getsize(self.path))
+    track_layout_file_bytes.unit = 'bytes'
@@ -0,0 +1,47 @@
+'''
+Benchmarks of converting, writing and reading models.
+'''
+
+import io
+import os
+import tempfile
+
+import cometspy as c
+
+from .common import make_cobra_model, make_model
+
+
+class ModelSuite:
+    """ model conversion from cobra, and COMETS model file I/O """
+    params = [500, 2000, 8000]
+    param_names = ['n_reactions']
+    timeout = 600
+
+    def setup(self, n_reactions):
+        self.cobra_model = make_cobra_model(n_reactions)
+        self.model = make_model(n_reactions)
+        self.dir = tempfile.mkdtemp(prefix = 'cometspy_bench_') + '/'
+        self.model.write_comets_model(self.dir)
+        self.path = self.dir + self.model.id + '.cmd'
+
+    def time_load_cobra_model(self, n_reactions):
+        c.model().load_cobra_model(self.cobra_model)
+
+    def peakmem_load_cobra_model(self, n_reactions):
+        c.model().load_cobra_model(self.cobra_model)
+
+    def time_write_comets_model(self, n_reactions):
+        self.model.write_comets_model(self.dir)
+
+    def time_write_comets_model_to_buffer(self, n_reactions):
+        self.model.write_comets_model(buffer = io.StringIO())
+
+    def time_read_comets_model(self, n_reactions):
+        c.model().read_comets_model(self.path)
+
+    def time_get_exchange_metabolites(self, n_reactions):
+        self.model.get_exchange_metabolites()
+
+    def track_model_file_bytes(self, n_reactions):
+        return(os.path.getsize(self.path))
+    track_model_file_bytes.unit = 'bytes'
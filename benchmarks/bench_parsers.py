@@ -0,0 +1,77 @@
+'''
+Benchmarks of parsing every COMETS log read by comets.run(), in both decimal
+formats, on logs written by the synthetic engine.
+'''
+
+import os
+
+from cometspy import parsers
+
+from .common import run_synthetic
+
+
+class ParserSuite:
+    """ log parsers on a grid x grid simulation of 20 cycles, every cycle
+    logged """
+    params = ([10, 40, 100], ['.', ','])
+    param_names = ['grid', 'decimal']
+    timeout = 600
+
+    def setup_cache(self):
+        sims = {}
+        for grid in self.params[0]:
+            for decimal in self.params[1]:
+                os.environ['COMETSPY_SYNTHETIC_DECIMAL'] = decimal
+                try:
+                    sim = run_synthetic(grid, 20, delete_files = False)
+                finally:
+                    del os.environ['COMETSPY_SYNTHETIC_DECIMAL']
+                logs = {name: sim.working_dir + sim.parameters.all_params[name]
+                        for name in ['TotalBiomassLogName', 'BiomassLogName',
+                                     'MediaLogName', 'FluxLogName',
+                                     'SpecificMediaLogName']}
+                logs['model_ids'] = sim.layout.get_model_ids()
+                logs['n_reactions'] = [len(m.reactions) for m in sim.layout.models]
+                sims[(grid, decimal)] = logs
+        return(sims)
+
+    def time_read_total_biomass(self, sims, grid, decimal):
+        logs = sims[(grid, decimal)]
+        parsers.read_total_biomass(logs['TotalBiomassLogName'], logs['model_ids'])
+
+    def time_read_biomass(self, sims, grid, decimal):
+        parsers.read_biomass(sims[(grid, decimal)]['BiomassLogName'])
+
+    def time_read_media(self, sims, grid, decimal):
+        parsers.read_media(sims[(grid, decimal)]['MediaLogName'])
+
+    def peakmem_read_media(self, sims, grid, decimal):
+        parsers.read_media(sims[(grid, decimal)]['MediaLogName'])
+
+    def time_read_fluxes_by_species(self, sims, grid, decimal):
+        logs = sims[(grid, decimal)]
+        parsers.read_fluxes_by_species(logs['FluxLogName'], logs['n_reactions'])
+
+    def time_read_specific_media(self, sims, grid, decimal):
+        parsers.read_specific_media(sims[(grid, decimal)]['SpecificMediaLogName'])
+
+    def track_media_log_bytes(self, sims, grid, decimal):
+        return(os.path.getsize(sims[(grid, decimal)]['MediaLogName']))
+    track_media_log_bytes.unit = 'bytes'
+
+
+class GenotypesSuite:
+    """ the genotypes log of an evolution simulation """
+    params = [1000, 100000]
+    param_names = ['n_genotypes']
+
+    def setup(self, n_genotypes):
+        import tempfile
+        self.path = os.path.join(tempfile.mkdtemp(prefix = 'cometspy_bench_'),
+                                 'GENOTYPES_biomass')
+        with open(self.path, 'w') as f:
+            f.writelines('a_%d m%d a_%d_m%d\n' % (i // 10, i, i // 10, i)
+                         for i in range(n_genotypes))
+
+    def time_read_genotypes(self, n_genotypes):
+        parsers.read_genotypes(self.path)
@@ -0,0 +1,120 @@
+'''
+Synthetic inputs for the benchmarks, generated locally and reproducibly.
+
+Models are random but well-formed cobra models of a given number of reactions,
+with exchange reactions and an objective, so that they convert to COMETS
+models like genome-scale models do. Simulations are run with the synthetic
+engine (see cometspy.synthetic), so no java or COMETS installation is needed.
+'''
+
+import os
+import tempfile
+import numpy as np
+import cobra
+
+import cometspy as c
+
+
+def make_cobra_model(n_reactions : int, seed : int = 0) -> cobra.Model:
+    """ a random cobra model with n_reactions reactions, about a tenth of
+    them exchanges, and a biomass objective """
+    rng = np.random.default_rng(seed)
+    n_internal = max(2, int(0.6 * n_reactions))
+    n_external = max(1, n_reactions // 10)
+    m = cobra.Model('synthetic_' + str(n_reactions))
+    internal = [cobra.Metabolite('m' + str(i) + '_c', compartment = 'c')
+                for i in range(n_internal)]
+    external = [cobra.Metabolite('m' + str(i) + '_e', compartment = 'e')
+                for i in range(n_external)]
+    m.add_metabolites(internal + external)
+    reactions = []
+    for i, met in enumerate(external):
+        exchange = cobra.Reaction('EX_' + met.id, lower_bound = -10.,
+                                  upper_bound = 1000.)
+        exchange.add_metabolites({met: -1.})
+        transport = cobra.Reaction('T_' + met.id, lower_bound = -1000.,
+                                   upper_bound = 1000.)
+        transport.add_metabolites({met: -1., internal[i % n_internal]: 1.})
+        reactions += [exchange, transport]
+    n_left = n_reactions - len(reactions) - 1
+    for i in range(max(0, n_left)):
+        size = rng.integers(2, 7)
+        mets = rng.choice(n_internal, size = min(size, n_internal),
+                          replace = False)
+        coefs = rng.choice([-2., -1., -1., 1., 1., 2.], size = len(mets))
+        rxn = cobra.Reaction('R' + str(i), lower_bound = -1000. * (i % 2),
+                             upper_bound = 1000.)
+        rxn.add_metabolites({internal[j]: coef for j, coef in zip(mets, coefs)})
+        reactions.append(rxn)
+    biomass = cobra.Reaction('Biomass', lower_bound = 0., upper_bound = 1000.)
+    biomass.add_metabolites({met: -0.1 for met in internal[:20]})
+    reactions.append(biomass)
+    m.add_reactions(reactions)
+    m.objective = 'Biomass'
+    return(m)
+
+
+def make_model(n_reactions : int, seed : int = 0, initial_pop = None):
+    """ a cometspy model converted from make_cobra_model """
+    model = c.model(make_cobra_model(n_reactions, seed))
+    model.initial_pop = initial_pop if initial_pop is not None else [0, 0, 1.e-4]
+    model.open_exchanges()
+    return(model)
+
+
+def make_layout(grid : int, n_reactions : int = 200, local : bool = True):
+    """ a grid x grid layout with one model founding every fourth cell and,
+    if local, local media, refresh and static values on every cell and a
+    region map """
+    founders = [[x, y, 1.e-5] for x in range(0, grid, 2)
+                for y in range(0, grid, 2)]
+    model = make_model(n_reactions, initial_pop = founders)
+    layout = c.layout([model])
+    layout.grid = [grid, grid]
+    mets = layout.all_exchanged_mets
+    for met in mets:
+        layout.set_specific_metabolite(met, 0.01)
+    if local:
+        for x in range(grid):
+            for y in range(grid):
+                layout.set_specific_metabolite_at_location(mets[0], (x, y),
+                                                           0.001 * (x + y))
+                layout.set_specific_refresh_at_location(mets[1 % len(mets)],
+                                                        (x, y), 1.e-4)
+                layout.set_specific_static_at_location(mets[2 % len(mets)],
+                                                       (x, y), 1.)
+        region_map = np.ones((grid, grid), dtype = int)
+        region_map[grid // 2:, :] = 2
+        layout.set_region_map(region_map)
+        for region in [1, 2]:
+            layout.set_region_parameters(region, [1.e-6 * region] * len(layout.media), 1.)
+    return(layout)
+
+
+def make_params(cycles : int, log_rate : int = 1):
+    """ params writing every log every log_rate cycles """
+    params = c.params()
+    params.set_param('maxCycles', cycles)
+    for log in ['writeTotalBiomassLog', 'writeBiomassLog', 'writeMediaLog',
+                'writeFluxLog', 'writeSpecificMediaLog']:
+        params.set_param(log, True)
+    for rate in ['BiomassLogRate', 'MediaLogRate', 'FluxLogRate',
+                 'specificMediaLogRate', 'totalBiomassLogRate']:
+        params.set_param(rate, log_rate)
+    return(params)
+
+
+def run_synthetic(grid : int, cycles : int, delete_files : bool = True):
+    """ a finished simulation of make_layout(grid) with the synthetic engine,
+    run in a new temporary directory """
+    layout = make_layout(grid, local = False)
+    params = make_params(cycles)
+    params.set_param('specificMedia', ','.join(layout.all_exchanged_mets[:3]))
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix = 'cometspy_bench_'))
+    try:
+        sim = c.comets(layout, params, engine = 'synthetic')
+        sim.run(delete_files = delete_files)
+    finally:
+        os.chdir(cwd)
+    return(sim)
@@ -42,7 +42,8 @@ models -> layout, layout + params -> comets, comets.run()
 >>> # sim.total_biomass.plot(x = "cycle")
 
 """
-from cometspy.comets import comets
+from cometspy.comets import comets, CometsStoppedError, CometsTimeoutError
 from cometspy.model import model
 from cometspy.layout import layout
 from cometspy.params import params
+from cometspy.store import load_results
@@ -0,0 +1,161 @@
+'''
+The batch module runs many COMETS simulations in parallel.
+
+Each comets.run() blocks while a single java process does the work, so a loop
+over simulations only ever uses one JVM at a time. The functions here spread
+a list of (layout, params) pairs over a bounded pool of worker processes. Every
+simulation gets its own working directory, so temporary files and logs from
+concurrent simulations never overwrite each other. The model files are written
+only once for the whole batch, into a directory shared by all simulations (see
+cometspy.cache.model_store).
+
+The finished comets objects are sent back to the calling process, where their
+total_biomass, biomass, media, fluxes etc. can be used as after a normal run.
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cometspy.comets import comets
+from cometspy.cache import get_model_store
+
+
+def _job_dir(relative_dir : str, index : int) -> str:
+    """ returns the isolated relative_dir used by the job at index """
+    return relative_dir + 'batch_' + str(index) + '/'
+
+
+def _run_job(index : int, layout, parameters, relative_dir : str,
+             delete_files : bool, model_dir : str):
+    """ runs one simulation inside a worker process and returns it """
+    job_dir = _job_dir(relative_dir, index)
+    os.makedirs(os.path.join(os.getcwd(), job_dir), exist_ok=True)
+    sim = comets(layout, parameters, job_dir)
+    sim.model_dir = model_dir
+    sim.run(delete_files=delete_files)
+    if delete_files:
+        sim.release_model_files()
+        try:
+            os.rmdir(sim.working_dir)
+        except OSError:  # something else lives there, leave it be
+            pass
+    return(index, sim)
+
+
+def iter_batch(jobs : list, max_workers : int = None,
+               relative_dir : str = '', delete_files : bool = True,
+               model_dir : str = None):
+    """
+    runs many COMETS simulations in parallel, yielding them as they finish
+
+    Parameters
+    ----------
+
+    jobs : list(tuple)
+        a list of (layout, params) pairs, one per simulation
+    max_workers : int, optional
+        the number of simulations run at once. Default is os.cpu_count()
+    relative_dir : str, optional
+        directory, relative to the current one, below which each simulation
+        gets its own 'batch_<index>/' working directory.
+    delete_files : bool, optional
+        Whether to delete simulation and log files. The default is True.
+    model_dir : str, optional
+        the directory where the model files of all simulations are written,
+        once per distinct model. Default is '.cometspy_models/' in
+        relative_dir. Model files are removed after the batch if
+        delete_files is True
+
+    Yields
+    ------
+
+    tuple (int, comets)
+        the position of the job in jobs, and the finished comets object
+
+    Examples
+    --------
+
+    >>> from cometspy.batch import iter_batch
+    >>> jobs = [(layout, p) for p in many_params] # made beforehand
+    >>> for i, sim in iter_batch(jobs, max_workers = 8):
+    >>>     print(i, sim.total_biomass.iloc[-1])
+
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    if model_dir is None:
+        model_dir = os.path.join(os.getcwd(), relative_dir, '.cometspy_models')
+    # the models are written, and held, here for the whole batch, so the
+    # workers only find them
+    store = get_model_store(model_dir)
+    models = list({id(m): m for layout, parameters in jobs
+                   for m in layout.models}.values())
+    for m in models:
+        store.add(m)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_job, i, layout, parameters,
+                                       relative_dir, delete_files, model_dir)
+                       for i, (layout, parameters) in enumerate(jobs)]
+            for future in as_completed(futures):
+                yield(future.result())
+    finally:
+        if delete_files:
+            for m in models:
+                store.release(m)
+            try:
+                os.rmdir(model_dir)
+            except OSError:  # other files live there, leave it be
+                pass
+
+
+def run_batch(jobs : list, max_workers : int = None,
+              relative_dir : str = '', delete_files : bool = True,
+              model_dir : str = None) -> list:
+    """
+    runs many COMETS simulations in parallel and returns them in order
+
+    This is a convenience wrapper around iter_batch which waits for every
+    simulation to finish. If any simulation raises an error, it is re-raised
+    here.
+
+    Parameters
+    ----------
+
+    jobs : list(tuple)
+        a list of (layout, params) pairs, one per simulation
+    max_workers : int, optional
+        the number of simulations run at once. Default is os.cpu_count()
+    relative_dir : str, optional
+        directory, relative to the current one, below which each simulation
+        gets its own 'batch_<index>/' working directory.
+    delete_files : bool, optional
+        Whether to delete simulation and log files. The default is True.
+    model_dir : str, optional
+        the directory where the model files are written, see iter_batch
+
+    Returns
+    -------
+
+    list(comets)
+        the finished comets objects, in the same order as jobs
+
+    Examples
+    --------
+
+    >>> import cometspy as c
+    >>> from cometspy.batch import run_batch
+    >>> jobs = []
+    >>> for rate in [0.01, 0.1, 1.]:
+    >>>     p = c.params()
+    >>>     p.set_param("deathRate", rate)
+    >>>     jobs.append((layout, p))
+    >>> sims = run_batch(jobs)
+    >>> sims[0].total_biomass.plot(x = "cycle")
+
+    """
+    sims = [None] * len(jobs)
+    for index, sim in iter_batch(jobs, max_workers, relative_dir,
+                                 delete_files, model_dir):
+        sims[index] = sim
+    return(sims)
@@ -0,0 +1,355 @@
+'''
+The cache module stores the results of finished simulations on disk.
+
+A result_cache is handed to comets.run(). Before starting COMETS, run() hashes
+the files it wrote for the simulation (layout, models and params) together
+with the COMETS version. If a simulation with exactly the same inputs has been
+run before, its parsed output is loaded from the cache instead of running
+java again.
+
+A model_store holds the model files of simulations, named after the hash of
+their contents, so that runs of unchanged models do not write them again. It
+is used when comets.model_dir is set, and by cometspy.batch.
+'''
+
+import os
+import re
+import hashlib
+import pickle
+import threading
+import weakref
+import contextlib
+try:
+    import fcntl
+except ImportError:  # e.g. on Windows
+    fcntl = None
+
+
+class result_cache:
+    """
+    a size-bounded, on-disk store of parsed COMETS simulation results
+
+    Results are stored as one file per simulation, named after the hash of
+    the simulation's inputs (see comets.cache_key). When the files together
+    take more than max_bytes, the least recently used ones are removed.
+
+    Parameters
+    ----------
+
+    directory : str
+        the directory holding the cached results. Created if needed.
+    max_bytes : int, optional
+        the maximum total size of the cache on disk. Default is 1 GB.
+
+    Examples
+    --------
+
+    >>> from cometspy.cache import result_cache
+    >>> cache = result_cache("./comets_cache/")
+    >>> sim = c.comets(layout, params)
+    >>> sim.run(cache = cache) # runs COMETS
+    >>> sim2 = c.comets(layout, params)
+    >>> sim2.run(cache = cache) # loads the results of sim
+    >>> cache.invalidate(sim2.cache_key) # forget them again
+
+    """
+    def __init__(self, directory : str, max_bytes : int = 2**30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __path(self, key : str) -> str:
+        return(os.path.join(self.directory, key + '.pkl'))
+
+    def keys(self) -> list:
+        """ returns the keys of all cached results """
+        return([f[:-4] for f in os.listdir(self.directory)
+                if f.endswith('.pkl')])
+
+    def get(self, key : str):
+        """
+        returns the results stored under key, or None if there are none
+
+        Parameters
+        ----------
+
+        key : str
+            a simulation input hash, as in comets.cache_key
+        """
+        path = self.__path(key)
+        try:
+            with open(path, 'rb') as f:
+                results = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return(None)
+        # mark as recently used, unless another process evicted it meanwhile
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return(results)
+
+    def put(self, key : str, results : dict):
+        """
+        stores results under key, then evicts old results if over max_bytes
+
+        Parameters
+        ----------
+
+        key : str
+            a simulation input hash, as in comets.cache_key
+        results : dict
+            attribute names and values of a finished comets object
+        """
+        path = self.__path(key)
+        tmp = path + '.' + str(os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.__evict()
+
+    def invalidate(self, key : str):
+        """
+        removes the results stored under key, if any
+
+        Parameters
+        ----------
+
+        key : str
+            a simulation input hash, as in comets.cache_key
+        """
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.__path(key))
+
+    def clear(self):
+        """ removes every cached result """
+        for key in self.keys():
+            self.invalidate(key)
+
+    def size(self) -> int:
+        """ returns the total size in bytes of the cached results """
+        return(sum(st.st_size for st in self.__stats().values()))
+
+    def __stats(self) -> dict:
+        """ returns the os.stat of every cached result by key, skipping
+        those which another process removed since they were listed """
+        stats = {}
+        for key in self.keys():
+            try:
+                stats[key] = os.stat(self.__path(key))
+            except FileNotFoundError:
+                continue
+        return(stats)
+
+    def __evict(self):
+        """ removes least recently used results until under max_bytes """
+        entries = sorted((st.st_mtime, st.st_size, key)
+                         for key, st in self.__stats().items())
+        total = sum(e[1] for e in entries)
+        while total > self.max_bytes and len(entries) > 0:
+            mtime, size, key = entries.pop(0)
+            self.invalidate(key)
+            total -= size
+
+
+def hash_files(paths : list, extra : str = '', strip : str = '') -> str:
+    """
+    returns a sha256 hex digest of the contents of files, in order
+
+    Parameters
+    ----------
+
+    paths : list(str)
+        paths to the files to hash
+    extra : str, optional
+        additional text included in the hash, e.g. a version
+    strip : str, optional
+        a regular expression of text removed from every file before
+        hashing, e.g. per-object suffixes
+    """
+    h = hashlib.sha256(extra.encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if strip != '':
+            data = re.sub(strip.encode(), b'', data)
+        h.update(hashlib.sha256(data).digest())
+    return(h.hexdigest())
+
+
+class model_store:
+    """
+    a shared, content-addressed directory of COMETS model files
+
+    Each model is written to <directory>/<hash>/<model id>.cmd, where hash is
+    model.get_content_hash(). It is only written if that file is not there
+    yet, so a model which did not change since an earlier run, or which is
+    identical to another model, is neither serialized nor written again.
+
+    The files are reference-counted by the model objects using them, in all
+    processes using the directory: each process holding a file marks it
+    with a <model id>.cmd.<pid>.ref file. A file is removed when the last
+    model using it is released, is garbage-collected or changed, or when
+    python exits, and no other process holds it. The directory itself is
+    kept. Where fcntl is unavailable, e.g. on Windows, only the threads of
+    one process are synchronized, so processes should not share a
+    directory there.
+
+    Parameters
+    ----------
+
+    directory : str
+        the directory holding the model files. Created when needed.
+
+    Attributes
+    ----------
+
+    writes : int
+        the number of model files this process wrote so far
+
+    Examples
+    --------
+
+    >>> from cometspy.cache import get_model_store
+    >>> store = get_model_store("./models/")
+    >>> path = store.add(model) # writes the model file
+    >>> path == store.add(model) # finds it
+    True
+    >>> store.release(model) # removes it, unless something else uses it
+
+    """
+    def __init__(self, directory : str):
+        self.directory = directory
+        self.writes = 0
+        self.__lock = threading.RLock()
+        self.__depth = 0  # of nested __locked blocks
+        self.__reset()
+
+    def __reset(self):
+        """ forgets the references, e.g. those inherited from a parent
+        process, which this process does not hold """
+        self.__pid = os.getpid()
+        self.__refs = {}  # path: number of models of this process using it
+        self.__held = {}  # id(model): (path, finalizer releasing it)
+
+    @contextlib.contextmanager
+    def __locked(self):
+        """ holds the lock of the directory, across threads and processes """
+        with self.__lock:
+            if self.__pid != os.getpid():
+                self.__reset()
+            if self.__depth > 0 or fcntl is None:
+                self.__depth += 1
+                try:
+                    yield
+                finally:
+                    self.__depth -= 1
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self.__depth += 1
+                yield
+            finally:
+                self.__depth -= 1
+                os.close(fd)  # which releases the lock
+
+    def add(self, model) -> str:
+        """
+        returns the path of the file of model, writing it if needed
+
+        Parameters
+        ----------
+
+        model : cometspy.model
+            the model. Its file is kept until it is released
+        """
+        path = os.path.join(self.directory, model.get_content_hash(),
+                            model.id + '.cmd')
+        with self.__locked():
+            held = self.__held.get(id(model))
+            if held is None or held[0] != path:
+                if held is not None:
+                    held[1]()  # the model changed since it was added
+                self.__acquire(path)
+                self.__held[id(model)] = (path, weakref.finalize(
+                    model, self.__release, id(model), path))
+            if not os.path.isfile(path):
+                tmp = path + '.' + str(os.getpid())
+                with open(tmp, 'w') as f:
+                    model.write_comets_model(buffer = f)
+                os.replace(tmp, path)
+                self.writes += 1
+        return(path)
+
+    def release(self, model):
+        """
+        drops the reference of model to its file, if any
+
+        Parameters
+        ----------
+
+        model : cometspy.model
+            a model added before
+        """
+        held = self.__held.get(id(model))
+        if held is not None:
+            held[1]()
+
+    def references(self, path : str) -> int:
+        """ returns the number of models of this process using the file at
+        path """
+        return(self.__refs.get(path, 0))
+
+    def __marker(self, path : str) -> str:
+        """ the file marking path as held by this process """
+        return(path + '.' + str(os.getpid()) + '.ref')
+
+    def __acquire(self, path : str):
+        """ adds one reference to path, marking it when it is the first """
+        if self.__refs.get(path, 0) == 0:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(self.__marker(path), 'w').close()
+        self.__refs[path] = self.__refs.get(path, 0) + 1
+
+    def __release(self, key : int, path : str):
+        """ drops one reference to path, and removes the file, and then its
+        empty directory, when no process holds it any more """
+        with self.__locked():
+            if self.__held.get(key, (None,))[0] == path:
+                del self.__held[key]
+            if path not in self.__refs:  # e.g. inherited from a parent process
+                return
+            self.__refs[path] -= 1
+            if self.__refs[path] > 0:
+                return
+            del self.__refs[path]
+            if os.path.isfile(self.__marker(path)):
+                os.remove(self.__marker(path))
+            directory, name = os.path.split(path)
+            if any(f.startswith(name + '.') and f.endswith('.ref')
+                   for f in os.listdir(directory)):
+                return  # held by another process
+            if os.path.isfile(path):
+                os.remove(path)
+            try:
+                os.rmdir(directory)
+            except OSError:  # other models with the same hash
+                pass
+
+
+# the model_store of each directory, shared within the process
+_model_stores = {}
+
+
+def get_model_store(directory : str) -> model_store:
+    """
+    returns the model_store of directory, the same one for every caller
+
+    Parameters
+    ----------
+
+    directory : str
+        the directory holding the model files
+    """
+    directory = os.path.abspath(directory)
+    return(_model_stores.setdefault(directory, model_store(directory)))
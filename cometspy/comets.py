@@ -9,13 +9,29 @@ any saved data (e.g. total_biomass) can be accessed from the object.
 
 '''
 
-import re
 import subprocess as sp
+import asyncio
+import contextlib
+import copy
+import inspect
+import io
+import json
+import logging
+import threading
 import pandas as pd
 import os
 import glob
 import numpy as np
 import platform
+import signal
+import sys
+import time
+
+from cometspy.cache import hash_files, get_model_store
+from cometspy import synthetic
+from cometspy.progress import progress_tracker, parse_cycle_times
+from cometspy import parsers
+from cometspy.store import log_dataset, _dataset_writer, _write_tables
 
 __author__ = "Djordje Bajic, Jean Vila, Jeremy Chacon"
 __copyright__ = "Copyright 2019, The COMETS Consortium"
@@ -30,11 +46,267 @@ __email__ = "djordje.bajic@yale.edu"
 __status__ = "Beta"
 
 
-def _readlines_file(filename):
-    f = open(filename, 'r')
-    f_lines = f.readlines()
-    f.close()
-    return f_lines
+# resolved classpaths, keyed by (COMETS_HOME, GUROBI_HOME). also kept on disk
+_classpath_cache = {}
+
+
+def _classpath_cache_file() -> str:
+    """ the file where resolved classpaths persist between sessions """
+    cache_dir = os.environ.get('COMETSPY_CACHE_DIR')
+    if cache_dir is None:
+        cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                                os.path.expanduser('~/.cache')),
+                                 'cometspy')
+    return(os.path.join(cache_dir, 'classpath.json'))
+
+
+def _install_stamp(comets_home : str, gurobi_home : str) -> list:
+    """ modification times of the directories searched for the classpath.
+    Adding, removing or replacing libraries changes at least one of them """
+    dirs = [comets_home + '/bin', comets_home + '/lib']
+    if gurobi_home != '':  # not '/lib', which changes with system updates
+        dirs.append(gurobi_home + '/lib')
+    if os.path.isdir(comets_home + '/lib'):
+        dirs += sorted(e.path for e in os.scandir(comets_home + '/lib')
+                       if e.is_dir())
+    return([[d, os.stat(d).st_mtime_ns if os.path.isdir(d) else None]
+            for d in dirs])
+
+
+def _get_cached_classpath(comets_home : str, gurobi_home : str):
+    """ returns the cached {'VERSION', 'classpath_pieces'} of this install, or
+    None if there is none or the install changed since it was cached """
+    key = comets_home + os.pathsep + gurobi_home
+    entry = _classpath_cache.get(key)
+    if entry is None:
+        try:
+            with open(_classpath_cache_file()) as f:
+                entry = json.load(f).get(key)
+        except (OSError, ValueError):
+            return(None)
+    if entry is None or entry['stamp'] != _install_stamp(comets_home, gurobi_home):
+        return(None)
+    # pieces missing when cached, e.g. gurobi when it is not installed, may
+    # stay missing; the others must still be there
+    if not all(os.path.isfile(v) for k, v in entry['classpath_pieces'].items()
+               if k not in entry.get('missing', [])):
+        return(None)
+    _classpath_cache[key] = entry
+    return(entry)
+
+
+def _set_cached_classpath(comets_home : str, gurobi_home : str,
+                          version : str, classpath_pieces : dict):
+    """ stores a resolved classpath in memory and, if possible, on disk """
+    key = comets_home + os.pathsep + gurobi_home
+    entry = {'stamp': _install_stamp(comets_home, gurobi_home),
+             'VERSION': version,
+             'classpath_pieces': dict(classpath_pieces),
+             'missing': sorted(k for k, v in classpath_pieces.items()
+                               if not os.path.isfile(v))}
+    _classpath_cache[key] = entry
+    path = _classpath_cache_file()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path) as f:
+                on_disk = json.load(f)
+        except (OSError, ValueError):
+            on_disk = {}
+        on_disk[key] = entry
+        tmp = path + '.' + str(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(on_disk, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # e.g. a read-only home; the in-memory cache still works
+
+
+_logger = logging.getLogger(__name__)
+
+# the number of values parsed at once when streaming a log to disk
+_STREAM_CHUNK_VALUES = 2**22
+
+# seconds between checks for timeouts and cancellation while COMETS runs
+_STOP_POLL_INTERVAL = 0.1
+
+# the longest line of COMETS std_out run_async can read, in bytes
+_STDOUT_LINE_LIMIT = 2**24
+
+
+class CometsStoppedError(RuntimeError):
+    """
+    raised when a COMETS simulation is stopped before it finished
+
+    Attributes
+    ----------
+
+    reason : str
+        why the simulation was stopped: 'cancelled', 'timeout' or
+        'max_wall_time'
+    elapsed : float
+        the number of seconds the simulation ran for
+    run_output : str
+        the std_out of COMETS until it was stopped
+    """
+    def __init__(self, reason : str, elapsed : float, run_output : str = ''):
+        self.reason = reason
+        self.elapsed = elapsed
+        self.run_output = run_output
+        super().__init__(f"COMETS simulation was stopped ({reason}) "
+                         f"after {elapsed:.1f} s")
+
+    def __reduce__(self):
+        # keep the attributes when sent between processes, e.g. by batch
+        return((self.__class__, (self.reason, self.elapsed, self.run_output)))
+
+
+class CometsTimeoutError(CometsStoppedError):
+    """ raised when a COMETS simulation exceeds its timeout or max_wall_time.
+    See CometsStoppedError for its attributes """
+    pass
+
+
+_CGROUP_MEMORY_LIMITS = ['/sys/fs/cgroup/memory.max',  # cgroup v2
+                         '/sys/fs/cgroup/memory/memory.limit_in_bytes']
+
+
+def _physical_memory_mb() -> int:
+    """ the memory available to this process in MB: the physical memory of
+    this machine, or the memory limit of its container (cgroup) if lower.
+    None if unknown, e.g. on Windows """
+    try:
+        memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return(None)
+    for path in _CGROUP_MEMORY_LIMITS:
+        try:
+            with open(path) as f:
+                limit = f.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit():  # 'max' when unlimited
+            memory = min(memory, int(limit))
+        break
+    return(memory // 2**20)
+
+
+def _estimate_heap_mb(layout) -> int:
+    """ a generous estimate, in MB, of the java heap COMETS needs for layout:
+    a base for the JVM and COMETS itself, a few copies (current, next and
+    diffusion buffers) of the media and biomass on every grid cell, and the
+    FBA problem of every model """
+    cells = int(np.prod(layout.grid))
+    grids = 4 * 8 * cells * (len(layout.media) + len(layout.models))
+    fba = sum(256 * (m.S.nnz + len(m.reactions) + len(m.metabolites))
+              for m in layout.models)
+    return(256 + 2 * (grids + fba) // 2**20)
+
+
+def _kill_process_tree(pid : int):
+    """ kills a process started in its own session or process group, along
+    with all its children, e.g. the JVM started by a shell """
+    if platform.system() == 'Windows':
+        sp.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+               stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass  # already gone
+
+
+def _flux_frame(values : np.array, reaction_names : list) -> pd.DataFrame:
+    """ turns one model's flux array (see parsers.iter_flux_chunks) into a
+    DataFrame with integer cycle, x and y columns and one column per
+    reaction """
+    frame = pd.DataFrame(values[:, 3:], columns = reaction_names)
+    for j, col in enumerate(["cycle", "x", "y"]):
+        frame.insert(j, col, values[:, j].astype('int64'))
+    return(frame)
+
+
+def _scatter_cube(first, second, x, y, values, grid : list) -> tuple:
+    """ scatters long-format log columns into a dense 4d array
+
+    returns (cube, first_labels, second_labels), where cube has the shape
+    (len(first_labels), len(second_labels), grid[0], grid[1]) and holds each
+    value at [first, second, x - 1, y - 1]. Labels are sorted. """
+    first_idx, first_labels = pd.factorize(first, sort=True)
+    second_idx, second_labels = pd.factorize(second, sort=True)
+    cube = np.zeros((len(first_labels), len(second_labels), grid[0], grid[1]))
+    cube[first_idx, second_idx, np.asarray(x) - 1, np.asarray(y) - 1] = values
+    return((cube, np.asarray(first_labels), np.asarray(second_labels)))
+
+
+def _scatter_stack(row_cycles, x, y, values, cycles, grid : list) -> np.array:
+    """ scatters long-format log columns into a 3d array [cycle, x, y],
+    with the cycles in the given order. Rows of other cycles are ignored """
+    cycles = np.asarray(cycles)
+    keep = np.isin(row_cycles, cycles)
+    positions = np.searchsorted(np.sort(cycles), row_cycles[keep])
+    positions = np.argsort(cycles)[positions]
+    stack = np.zeros((len(cycles), grid[0], grid[1]))
+    stack[positions, np.asarray(x)[keep] - 1,
+          np.asarray(y)[keep] - 1] = np.asarray(values)[keep]
+    return(stack)
+
+
+class _log_tail:
+    """ follows a log file that COMETS is still appending to
+
+    Each poll() reads only the bytes added since the previous poll, parses the
+    complete lines among them with reader, and appends the result to frame.
+    If the log starts with a header line, it is kept and put in front of every
+    new chunk so that reader sees a well-formed file. Chunks are combined with
+    merge(frame, chunk), which defaults to concatenating DataFrames.
+    """
+    def __init__(self, path : str, reader, header : bool = False,
+                 merge = None):
+        self.path = path
+        self.reader = reader
+        self.merge = merge
+        self.has_header = header
+        self.header = ''
+        self.offset = 0
+        self.remainder = b''
+        self.frame = None
+
+    def poll(self, final : bool = False) -> bool:
+        """ parses newly appended lines. returns True if frame grew. If final
+        is True, a trailing line without a newline is parsed too. """
+        if not os.path.isfile(self.path):
+            return(False)
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+        data = self.remainder + data
+        cut = len(data) if final else data.rfind(b'\n') + 1
+        self.remainder = data[cut:]
+        text = data[:cut].decode()
+        if self.has_header and self.header == '':
+            if '\n' not in text:
+                self.remainder = data[:cut] + self.remainder
+                return(False)
+            split = text.index('\n') + 1
+            self.header, text = text[:split], text[split:]
+        if text.strip() == '':
+            return(False)
+        chunk = self.reader(io.StringIO(self.header + text))
+        if self.frame is None:
+            self.frame = chunk
+        elif self.merge is not None:
+            self.frame = self.merge(self.frame, chunk)
+        else:
+            self.frame = pd.concat([self.frame, chunk], ignore_index=True)
+        return(True)
+
+
+def _merge_flux_arrays(arrays : dict, chunk : dict) -> dict:
+    """ appends the per-model flux arrays of chunk to those of arrays """
+    return({model_num: np.concatenate([arrays[model_num], chunk[model_num]])
+            for model_num in arrays})
 
 
 class comets:
@@ -52,6 +324,39 @@ class comets:
     when one is to run multiple simulations simultaneously, otherwise
     temporary files may overwrite each other.
 
+    The java classpath found for a COMETS installation is cached, both in
+    memory and on disk (in ~/.cache/cometspy, or $COMETSPY_CACHE_DIR if set),
+    so that creating many comets objects does not search the installation
+    every time. It is searched again automatically when the installation
+    changes.
+
+    Model files are written to working_dir for every run, and removed after
+    it. If comets.model_dir is set, for the process or for one object, they
+    are instead written to that shared directory under the hash of their
+    contents (see cometspy.cache.model_store), so that a model which did
+    not change since an earlier run is not written again. Such files outlive
+    the run, whatever delete_files: each is removed once no model object
+    uses it any more, e.g. after release_model_files(), and at the latest
+    when python exits. cometspy.batch shares one such directory between all
+    its simulations.
+
+    Options for the java virtual machine are taken from
+    comets.default_jvm_options, which applies to every comets object in the
+    process, updated with the jvm_options of each object. The keys are:
+
+        'Xmx', 'Xms' : maximum and initial heap, e.g. '8g', or an int in MB.
+            'auto' sizes the heap from the grid, metabolites and models of
+            the layout, between a quarter and three quarters of the
+            memory available (that of the machine, or the limit of its
+            container); where that is unknown, e.g. on Windows, no flag is
+            passed. None leaves it to java. Default: None
+        'gc' : the garbage collector, e.g. 'G1', 'Parallel' or 'Serial'
+        'TieredStopAtLevel' : e.g. 1, which makes short runs start faster
+        'extra' : a list of any other flags, e.g. ['-XX:+AlwaysPreTouch']
+
+    On Windows, where COMETS is started by a script, they are passed in the
+    JAVA_TOOL_OPTIONS environment variable.
+
     Parameters
     ----------
 
@@ -61,6 +366,11 @@ class comets:
         a cometspy.params containing specified simulation parameters
     relative_dir : str, optional
         a directory to place temporary simulation files.
+    engine : str, optional
+        'comets' to run the COMETS java program, or 'synthetic' to run the
+        stand-in from cometspy.synthetic, which needs neither java, COMETS nor
+        Gurobi and writes made-up logs, e.g. for tests and benchmarks.
+        Default is the environment variable COMETSPY_ENGINE, or 'comets'
 
     Attributes
     ----------
@@ -71,6 +381,15 @@ class comets:
         the params containing simulation and default biological parameters
     working_dir : str
         the directory at which to save temporary sim files
+    engine : str
+        'comets' or 'synthetic', the program run by run()
+    models_written : bool
+        if True, the model files are already in working_dir, as
+        <model id>.cmd, so run() neither writes nor removes them, nor uses
+        model_dir. Default is False
+    model_dir : str
+        the directory of shared model files, see above. Default is None,
+        or the value of comets.model_dir
     GUROBI_HOME : str
         the directory where GUROBI exists on the system
     COMETS_HOME : str
@@ -81,6 +400,8 @@ class comets:
         classpath separated into library name (key) and location (value)
     JAVA_CLASSPATH : str
         a generated (overwritable) string containing the java classpath
+    jvm_options : dict
+        JVM options of this object, overriding comets.default_jvm_options
     run_output : str
         generated object containing text from COMETS sim's std_out
     run_errors : str
@@ -95,8 +416,30 @@ class comets:
         generated object containing spatially-explicit media from sim
     fluxes_by_species : dict{model_id : pandas.DataFrame}
         generated object containing each species' spatial-explicit fluxes
+    fluxes : pandas.DataFrame
+        generated object with all species' fluxes in the raw COMETS layout,
+        built from fluxes_by_species the first time it is used
     genotypes : pandas.DataFrame
         generated object containing genotypes if an evolution sim was run
+    cycle_times : pandas.DataFrame
+        generated object with the seconds each cycle took, if
+        params showCycleTime was True. See get_cycle_profile
+    cache_key : str
+        generated object with the hash of the sim inputs, if run with a cache
+    run_status : str
+        generated object with the outcome of the last run: 'finished',
+        'cached', 'failed', 'cancelled', 'timeout' or 'max_wall_time'
+    progress : cometspy.progress.progress_tracker
+        generated object following the cycles of the current or last run,
+        with its speed, ETA and whether it stalled
+    timings : dict
+        generated object describing where the time of the last run went.
+        timings['seconds'] holds the duration of each phase (write_layout,
+        write_params, cache_lookup, jvm_startup, simulation, read_<log>,
+        cache_store and total), and timings['bytes_written'] and
+        timings['bytes_read'] the size of each file written or read. They
+        are also logged to the 'cometspy.comets' logger, and passed to
+        comets.timings_hook if it is set
 
     Examples
     --------
@@ -113,15 +456,94 @@ class comets:
     >>> im = sim.get_biomass_image(layout.models[0].id, 4000)
     >>> from matplotlib import pyplot as plt
     >>> plt.imshow(im / np.max(im))
+    >>> # give every simulation in this session 16 GB, and this one G1
+    >>> c.comets.default_jvm_options["Xmx"] = "16g"
+    >>> sim.jvm_options["gc"] = "G1"
 
 
     """
 
+    # process-wide JVM options, see the class docstring
+    default_jvm_options = {'Xmx': None, 'Xms': None, 'gc': None,
+                           'TieredStopAtLevel': None, 'extra': []}
+
+    # process-wide function called with every comets object after its run,
+    # e.g. to collect timings
+    timings_hook = None
+
+    # process-wide directory of shared model files, see the class docstring.
+    # None writes the model files to working_dir for each run
+    model_dir = None
+
     def __init__(self, layout,
-                 parameters, relative_dir : str =''):
+                 parameters, relative_dir : str ='', engine : str = None):
 
         # define instance variables
         self.working_dir = os.getcwd() + '/' + relative_dir
+        if engine is None:
+            engine = os.environ.get('COMETSPY_ENGINE', 'comets')
+        if engine not in ['comets', 'synthetic']:
+            raise ValueError("engine must be 'comets' or 'synthetic', not " +
+                             str(engine))
+        self.engine = engine
+        if engine == 'synthetic':
+            # nothing to find, the stand-in only needs python
+            self.GUROBI_HOME = ''
+            self.COMETS_HOME = os.environ.get('COMETS_HOME', '')
+            self.VERSION = 'synthetic'
+            self.classpath_pieces = {}
+            self.JAVA_CLASSPATH = ''
+        else:
+            self.__find_comets()
+
+        # check to see if user has the libraries where expected
+
+        self.layout = layout
+        self.parameters = parameters
+
+        # dealing with output files
+        self.parameters.set_param("useLogNameTimeStamp", False)
+        self.parameters.set_param("TotalBiomassLogName",
+                                  self.parameters.all_params['TotalBiomassLogName'] + '_' + hex(id(self)))
+        self.parameters.set_param("BiomassLogName",
+                                  self.parameters.all_params['BiomassLogName'] + '_' + hex(id(self)))
+        self.parameters.set_param("FluxLogName",
+                                  self.parameters.all_params['FluxLogName'] + '_' + hex(id(self)))
+        self.parameters.set_param("MediaLogName",
+                                  self.parameters.all_params['MediaLogName'] + '_' + hex(id(self)))
+        self.parameters.set_param("SpecificMediaLogName",
+                                  self.parameters.all_params['SpecificMediaLogName'] + '_' + hex(id(self)))
+
+        # logs followed while COMETS runs, see run(live = True)
+        self.__live_tails = {}
+        self.__live_thread = None
+
+        # JVM options of this object, overriding comets.default_jvm_options
+        self.jvm_options = {}
+
+        # whether the model files are managed outside this object, e.g. by
+        # cometspy.transfer, which writes them once for many runs
+        self.models_written = False
+        # the model files of the last run, and their shared directory
+        self.__model_paths = []
+        self.__model_dir = None
+
+        # whether COMETS is running, and if cancel() was called meanwhile
+        self.__running = False
+        self.__cancel_requested = False
+        # when the last run started, see __report_timings
+        self.__run_start = None
+
+        # wide flux frame, built from fluxes_by_species on request
+        self.__fluxes = None
+
+        # dense arrays built from logs on request, see get_media_cube
+        self.__media_cube = None
+        self.__biomass_cube = None
+
+    def __find_comets(self):
+        """ sets GUROBI_HOME, COMETS_HOME, VERSION and the classpath from
+        the environment and the COMETS installation """
         try:
             self.GUROBI_HOME = os.environ['GUROBI_COMETS_HOME']
             os.environ['GUROBI_HOME'] = self.GUROBI_HOME
@@ -140,30 +562,22 @@ class comets:
                     print("       e.g.   import os")
                     print("              os.environ['GUROBI_HOME'] = 'C:\\\\gurobi902\\\\win64'")
         self.COMETS_HOME = os.environ['COMETS_HOME']
-        self.VERSION = os.path.splitext(os.listdir(os.environ['COMETS_HOME'] +
-                                                   '/bin')[0])[0]
 
-        # set default classpaths, which users may change
-        self.__build_default_classpath_pieces()
+        # set default classpaths, which users may change. Finding them means
+        # walking the COMETS install, so they are cached per install
+        cached = _get_cached_classpath(self.COMETS_HOME, self.GUROBI_HOME)
+        if cached is not None:
+            self.VERSION = cached['VERSION']
+            self.classpath_pieces = dict(cached['classpath_pieces'])
+        else:
+            self.VERSION = os.path.splitext(os.listdir(os.environ['COMETS_HOME'] +
+                                                       '/bin')[0])[0]
+            self.__build_default_classpath_pieces()
+            _set_cached_classpath(self.COMETS_HOME, self.GUROBI_HOME,
+                                  self.VERSION, self.classpath_pieces)
         self.__build_and_set_classpath()
         self.__test_classpath_pieces()
 
-        # check to see if user has the libraries where expected
-
-        self.layout = layout
-        self.parameters = parameters
-
-        # dealing with output files
-        self.parameters.set_param("useLogNameTimeStamp", False)
-        self.parameters.set_param("TotalBiomassLogName",
-                                  self.parameters.all_params['TotalBiomassLogName'] + '_' + hex(id(self)))
-        self.parameters.set_param("BiomassLogName",
-                                  self.parameters.all_params['BiomassLogName'] + '_' + hex(id(self)))
-        self.parameters.set_param("FluxLogName",
-                                  self.parameters.all_params['FluxLogName'] + '_' + hex(id(self)))
-        self.parameters.set_param("MediaLogName",
-                                  self.parameters.all_params['MediaLogName'] + '_' + hex(id(self)))
-
     def __build_default_classpath_pieces(self):
         """
         sets up what it thinks the classpath should be
@@ -315,7 +729,10 @@ class comets:
         self.classpath_pieces[libraryname] = path
         self.__build_and_set_classpath()
 
-    def run(self, delete_files : bool = True):
+    def run(self, delete_files : bool = True, live : bool = False,
+            live_interval : float = 1., cache = None, stream_to : str = None,
+            timeout : float = None, max_wall_time : float = None,
+            progress = None):
         """
         run a COMETS simulation
 
@@ -331,11 +748,61 @@ class comets:
         If the optional delete_files is set to False, then temporary files and
         data log files are not deleted. They are deleted by default.
 
+        If a cometspy.cache.result_cache is given, a simulation whose layout,
+        models, params and COMETS version are identical to a previously cached
+        one is not run again; its stored results are loaded instead.
+
+        If live is True, the total biomass, biomass, media and flux logs are
+        followed while COMETS is still writing them. Every live_interval
+        seconds, newly written lines are parsed and appended to total_biomass,
+        biomass, media and fluxes, so these grow during the simulation and
+        can be inspected from another thread. The parsing is thereby spread
+        over the run instead of happening all at once at its end.
+
+        If stream_to is given, the media, biomass and flux logs are never
+        loaded into memory as a whole. They are read in bounded chunks, which
+        are appended to datasets partitioned by cycle below the stream_to
+        directory (media/, biomass/ and fluxes/<model_id>/). media, biomass
+        and the values of fluxes_by_species are then cometspy.store.log_dataset
+        handles, which load only the cycles asked for. stream_to cannot be
+        combined with live or cache.
+
+        A run can be stopped early: if COMETS prints nothing for timeout
+        seconds (e.g. a hung JVM), if it runs longer than max_wall_time
+        seconds in total, or if cancel() is called from another thread.
+        Then the whole process group of COMETS, including the JVM, is killed,
+        the temporary files (and, if delete_files is True, the logs) are
+        removed, run_status records why, and a CometsTimeoutError (or, when
+        cancelled, a CometsStoppedError) is raised.
+
+        While COMETS runs, the cycles it prints are followed by the progress
+        attribute (see cometspy.progress.progress_tracker), which can be
+        polled from another thread. If a progress function is given, it is
+        called with progress whenever a new cycle started (at most every
+        0.1 s) and when the simulation stalls.
+
         Parameters
         ----------
 
         delete_files : bool, optional
             Whether to delete simulation and log files. The default is True.
+        live : bool, optional
+            Whether to parse logs while the simulation runs. Default is False.
+        live_interval : float, optional
+            Seconds between reads of the logs when live. Default is 1.
+        cache : cometspy.cache.result_cache, optional
+            If given, the simulation inputs are hashed into cache_key. If the
+            cache holds results for that key, they are used and COMETS is not
+            run. Otherwise, the results of this run are added to the cache.
+        stream_to : str, optional
+            If given, the directory in which to store the media, biomass and
+            flux logs as on-disk datasets, instead of in memory.
+        timeout : float, optional
+            Seconds without any output from COMETS after which it is stopped.
+        max_wall_time : float, optional
+            Seconds after which COMETS is stopped, regardless of its output.
+        progress : callable, optional
+            called with the progress attribute as the simulation advances
 
         Examples
         --------
@@ -344,10 +811,388 @@ class comets:
         >>> sim.run(delete_files = True)
         >>> print(sim.run_output)
         >>> print(sim.total_biomass)
+        >>> # follow a long run from a separate thread
+        >>> import threading
+        >>> t = threading.Thread(target = sim.run, kwargs = {"live" : True})
+        >>> t.start()
+        >>> print(sim.total_biomass.tail()) # exists once cycles are logged
+        >>> # a huge run whose media log does not fit in memory
+        >>> sim.run(stream_to = "./big_run/")
+        >>> last = sim.media.read(cycles = [sim.media.cycles[-1]])
+        >>> # give up on runs which take more than a day
+        >>> try:
+        >>>     sim.run(max_wall_time = 24 * 3600)
+        >>> except c.CometsTimeoutError as e:
+        >>>     print(e.reason, e.elapsed)
+        >>> # report speed and ETA as the simulation goes
+        >>> sim.run(progress = print)
+
+        """
+        if self.__prepare_run(delete_files, live, live_interval, cache,
+                              stream_to):
+            self.__report_timings()
+            print('Done! (results loaded from cache)')
+            return
+
+        # a new session lets the shell and the JVM be killed together
+        launched = time.perf_counter()
+        p = sp.Popen(self.cmd,
+                     cwd = self.working_dir,
+                     shell=True, stdout=sp.PIPE, stderr=sp.STDOUT,
+                     env = self.__jvm_environment(),
+                     start_new_session = True)
+
+        # std_out is read in a thread, so that the run can be stopped
+        # even while COMETS prints nothing
+        out_lines = []
+        last_output = [time.monotonic()]
+        first_output = [None]
+        progress_seen = 0
+
+        def read_output():
+            for line in iter(p.stdout.readline, b''):
+                if first_output[0] is None:
+                    first_output[0] = time.perf_counter()
+                out_lines.append(line)
+                last_output[0] = time.monotonic()
+                self.progress.feed(line.decode(errors = 'replace'))
+        reader = threading.Thread(target = read_output, daemon = True)
+        reader.start()
+        start = time.monotonic()
+        reason = None
+        self.__running = True
+        try:
+            while True:
+                reader.join(_STOP_POLL_INTERVAL)
+                if not reader.is_alive():
+                    break
+                if progress is not None and self.__progress_due(progress_seen):
+                    progress_seen = self.progress.updates
+                    progress(self.progress)
+                reason = self.__stop_reason(start, last_output[0], timeout,
+                                            max_wall_time)
+                if reason is not None:
+                    _kill_process_tree(p.pid)
+                    break
+            p.wait()
+            reader.join()
+            self.__record_process_timings(launched, first_output[0],
+                                          time.perf_counter())
+            if progress is not None and self.progress.updates != progress_seen:
+                progress(self.progress)
+        except BaseException:  # e.g. KeyboardInterrupt: never leave a JVM behind
+            _kill_process_tree(p.pid)
+            p.wait()
+            self.__remove_run_files(logs = delete_files)
+            raise
+        finally:
+            self.__stop_live()
+            self.__running = False
+            self.__cancel_requested = False
+        self.run_output = b''.join(out_lines).decode(errors = 'replace')
+        self.run_errors = "STDERR empty."
+        if reason is not None:
+            self.__stopped(reason, time.monotonic() - start, delete_files)
+
+        self.__finish_run(delete_files, cache, stream_to)
+        self.__report_timings()
+        print('Done!')
 
+    def release_model_files(self):
         """
+        releases the models of the layout from the shared model directory
+
+        If model_dir was set for the last run, the model files are removed
+        unless other models use them. They are written again by the next
+        run().
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> sim.release_model_files()
+
+        """
+        if self.__model_dir is None:
+            return
+        store = get_model_store(self.__model_dir)
+        for m in self.layout.models:
+            store.release(m)
+
+    def cancel(self):
+        """
+        stops a simulation which is running in another thread
+
+        This is safe to call from any thread. The running run() or
+        run_async() kills COMETS, cleans up its files and raises a
+        CometsStoppedError with reason 'cancelled'. If no simulation is
+        running, this does nothing.
+
+        Examples
+        --------
+
+        >>> import threading
+        >>> t = threading.Thread(target = sim.run)
+        >>> t.start()
+        >>> sim.cancel() # changed our mind
+        >>> t.join()
+        >>> print(sim.run_status) # 'cancelled'
+
+        """
+        if self.__running:
+            self.__cancel_requested = True
+
+    def __progress_due(self, seen : int) -> bool:
+        """ whether the progress function should be called: if cycles
+        started since it was called at seen updates, or if the simulation
+        just stalled """
+        return(self.progress.updates != seen or self.progress.check_stall())
+
+    def __stop_reason(self, start : float, last_output : float,
+                      timeout : float, max_wall_time : float) -> str:
+        """ returns why a running simulation should be stopped, or None """
+        now = time.monotonic()
+        if self.__cancel_requested:
+            return('cancelled')
+        if timeout is not None and now - last_output > timeout:
+            return('timeout')
+        if max_wall_time is not None and now - start > max_wall_time:
+            return('max_wall_time')
+        return(None)
+
+    def __stopped(self, reason : str, elapsed : float, delete_files : bool):
+        """ cleans up after a run was stopped early, and raises """
+        self.run_status = reason
+        self.__live_tails = {}
+        self.__remove_run_files(logs = delete_files)
+        self.__report_timings()
+        print('COMETS simulation was stopped (' + reason + ')')
+        if reason == 'cancelled':
+            raise CometsStoppedError(reason, elapsed, self.run_output)
+        raise CometsTimeoutError(reason, elapsed, self.run_output)
+
+    async def run_async(self, delete_files : bool = True,
+                        stdout_callback = None, live : bool = False,
+                        live_interval : float = 1., cache = None,
+                        stream_to : str = None, timeout : float = None,
+                        max_wall_time : float = None, progress = None):
+        """
+        run a COMETS simulation without blocking an asyncio event loop
+
+        This is the coroutine version of run(). COMETS is started with
+        asyncio.create_subprocess_exec, and its std_out is read line by line
+        as it is printed. Each line can be handed to stdout_callback, which
+        may be a normal function or a coroutine function. Once the
+        simulation is complete, run_output and the simulation logs are read
+        exactly as in run(). It takes the same options as run(), plus
+        stdout_callback.
+
+        If the task running this coroutine is cancelled, the java process is
+        killed, the temporary files (and, if delete_files is True, the logs)
+        are removed and the cancellation is re-raised. timeout, max_wall_time
+        and cancel() stop the simulation as in run(), and progress is
+        followed as in run(), except that the progress function is called
+        for every new cycle.
+
+        Parameters
+        ----------
+
+        delete_files : bool, optional
+            Whether to delete simulation and log files. The default is True.
+        stdout_callback : callable, optional
+            called with each line (str) of COMETS std_out as it is printed
+        live : bool, optional
+            Whether to parse logs while the simulation runs, see run()
+        live_interval : float, optional
+            Seconds between reads of the logs when live. Default is 1.
+        cache : cometspy.cache.result_cache, optional
+            a cache of results to use and add to, see run()
+        stream_to : str, optional
+            the directory in which to store big logs on disk, see run()
+        timeout : float, optional
+            Seconds without any output from COMETS after which it is stopped.
+        max_wall_time : float, optional
+            Seconds after which COMETS is stopped, regardless of its output.
+        progress : callable, optional
+            called with the progress attribute as the simulation advances.
+            May be a coroutine function.
+
+        Examples
+        --------
+
+        >>> import asyncio
+        >>> sims = [c.comets(layout, p) for p in many_params]
+        >>> async def main():
+        >>>     await asyncio.gather(*[sim.run_async() for sim in sims])
+        >>> asyncio.run(main())
+        >>> print(sims[0].total_biomass)
+
+        """
+        # writing, hashing, pickling and parsing files block: they run in
+        # the default executor, so that other tasks go on meanwhile
+        loop = asyncio.get_running_loop()
+        if await loop.run_in_executor(None, self.__prepare_run, delete_files,
+                                      live, live_interval, cache, stream_to):
+            self.__report_timings()
+            print('Done! (results loaded from cache)')
+            return
+
+        launched = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(*self.__build_command_args(),
+                                                    cwd = self.working_dir,
+                                                    stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.STDOUT,
+                                                    env = self.__jvm_environment(),
+                                                    start_new_session = True,
+                                                    limit = _STDOUT_LINE_LIMIT)
+        out_lines = []
+        start = last_output = time.monotonic()
+        first_output = None
+        progress_seen = 0
+        reason = None
+        self.__running = True
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(proc.stdout.readline(),
+                                                  _STOP_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    line = None
+                if line == b'':
+                    break
+                if line is not None:
+                    if first_output is None:
+                        first_output = time.perf_counter()
+                    last_output = time.monotonic()
+                    line = line.decode(errors = 'replace')
+                    out_lines.append(line)
+                    self.progress.feed(line)
+                    if stdout_callback is not None:
+                        res = stdout_callback(line)
+                        if inspect.isawaitable(res):
+                            await res
+                if progress is not None and self.__progress_due(progress_seen):
+                    progress_seen = self.progress.updates
+                    res = progress(self.progress)
+                    if inspect.isawaitable(res):
+                        await res
+                reason = self.__stop_reason(start, last_output, timeout,
+                                            max_wall_time)
+                if reason is not None:
+                    _kill_process_tree(proc.pid)
+                    break
+            await proc.wait()
+            self.__record_process_timings(launched, first_output,
+                                          time.perf_counter())
+        except BaseException:  # e.g. CancelledError: never leave a JVM behind
+            if proc.returncode is None:
+                _kill_process_tree(proc.pid)
+                await proc.wait()
+            self.__stop_live()
+            self.__live_tails = {}
+            self.__remove_run_files(logs = delete_files)
+            raise
+        finally:
+            self.__running = False
+            self.__cancel_requested = False
+        self.__stop_live()
+
+        self.run_output = ''.join(out_lines)
+        self.run_errors = "STDERR empty."
+        if reason is not None:
+            self.__stopped(reason, time.monotonic() - start, delete_files)
+
+        await loop.run_in_executor(None, self.__finish_run, delete_files,
+                                   cache, stream_to)
+        self.__report_timings()
+        print('Done!')
+
+    def __prepare_run(self, delete_files : bool, live : bool,
+                      live_interval : float, cache, stream_to : str) -> bool:
+        """ checks the options of run() and writes the files of the run.
+        Returns True if its results were found in cache, in which case they
+        are loaded and there is nothing left to run. Otherwise, readies
+        progress and, if asked, live logs for the COMETS process """
+        if stream_to is not None and (live or cache is not None):
+            raise ValueError("stream_to cannot be combined with live or cache")
         print('\nRunning COMETS simulation ...')
 
+        self.__run_start = time.perf_counter()
+        self.timings = {'seconds': {}, 'bytes_written': {}, 'bytes_read': {}}
+        self.__write_run_files()
+        if cache is not None:
+            with self.__timed('cache_lookup'):
+                self.cache_key = self.__hash_run_files()
+                results = cache.get(self.cache_key)
+            if results is not None:
+                self.__fluxes = None
+                for key, value in results.items():
+                    setattr(self, key, value)
+                if delete_files:
+                    self.__remove_run_files()
+                self.run_status = 'cached'
+                return(True)
+
+        self.__live_tails = {}
+        if live:
+            self.__start_live(live_interval)
+        self.progress = progress_tracker(self.parameters.all_params['maxCycles'])
+        return(False)
+
+    def __finish_run(self, delete_files : bool, cache, stream_to : str):
+        """ checks the output of a COMETS process which ran to its end, reads
+        its logs and adds them to cache """
+        # Raise RuntimeError if simulation had nonzero exit
+        self.run_status = 'failed'
+        self.__analyze_run_output()
+
+        self.__read_output(delete_files, stream_to)
+        if cache is not None:
+            with self.__timed('cache_store'):
+                cache.put(self.cache_key, {key: getattr(self, key)
+                                           for key in self.__result_attributes()})
+        self.run_status = 'finished'
+
+    @contextlib.contextmanager
+    def __timed(self, phase : str, written : list = None, read : str = None):
+        """ adds the time spent in the with block to timings['seconds'][phase],
+        along with the size of the file read before, and of the files
+        written in the block """
+        if read is not None and os.path.isfile(read):
+            self.timings['bytes_read'][os.path.basename(read)] = os.path.getsize(read)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = self.timings['seconds']
+            seconds[phase] = seconds.get(phase, 0.) + time.perf_counter() - start
+            for path in written or []:
+                if os.path.isfile(path):
+                    self.timings['bytes_written'][os.path.basename(path)] = os.path.getsize(path)
+
+    def __record_process_timings(self, launched : float, first_output : float,
+                                 exited : float):
+        """ splits the time COMETS ran into starting the JVM (until its first
+        line of output) and the simulation itself """
+        if first_output is None:
+            first_output = exited
+        self.timings['seconds']['jvm_startup'] = first_output - launched
+        self.timings['seconds']['simulation'] = exited - first_output
+
+    def __report_timings(self):
+        """ completes timings, logs them and hands them to timings_hook """
+        self.timings['seconds']['total'] = time.perf_counter() - self.__run_start
+        _logger.info('COMETS run timings (s): ' +
+                     ', '.join(phase + ' %.3f' % seconds for phase, seconds
+                               in self.timings['seconds'].items()),
+                     extra = {'timings': self.timings})
+        if comets.timings_hook is not None:
+            comets.timings_hook(self)
+
+    def __write_run_files(self):
+        """ writes the layout, model, params and script files COMETS needs
+        into working_dir, and builds the command used to start COMETS """
+
         # If evolution is true, write the biomass but not the total biomass log
         if self.parameters.all_params['evolution']:
             self.parameters.all_params['writeTotalBiomassLog'] = False
@@ -359,171 +1204,421 @@ class comets:
         c_package = self.working_dir + '.current_package' + to_append
         c_script = self.working_dir + '.current_script' + to_append
 
-        self.layout.write_necessary_files(self.working_dir, to_append)
+        c_layout = self.working_dir + '.current_layout' + to_append
+        self.__model_dir = None
+        if self.models_written:
+            self.__model_paths = [self.working_dir + m.id + '.cmd'
+                                  for m in self.layout.models]
+            with self.__timed('write_layout', written = [c_layout]):
+                self.layout.write_necessary_files(
+                    self.working_dir, to_append,
+                    ['./' + m.id + '.cmd' for m in self.layout.models])
+        elif self.model_dir is None:
+            self.__model_paths = [self.working_dir + m.id + '.cmd'
+                                  for m in self.layout.models]
+            with self.__timed('write_layout',
+                              written = [c_layout] + self.__model_paths):
+                self.layout.write_necessary_files(self.working_dir, to_append)
+        else:
+            self.__model_dir = self.model_dir
+            store = get_model_store(self.__model_dir)
+            written = [c_layout]
+            with self.__timed('write_layout', written = written):
+                # only models which changed since they were added are written
+                self.__model_paths = []
+                for m in self.layout.models:
+                    writes = store.writes
+                    self.__model_paths.append(store.add(m))
+                    if store.writes > writes:
+                        written.append(self.__model_paths[-1])
+                self.layout.write_necessary_files(
+                    self.working_dir, to_append,
+                    ['./' + os.path.relpath(path, self.working_dir)
+                     for path in self.__model_paths])
 
         # self.layout.write_layout(self.working_dir + '.current_layout')
-        self.parameters.write_params(c_global, c_package)
-
-        if os.path.isfile(c_script):
-            os.remove(c_script)
-        with open(c_script, 'a') as f:
-            f.write('load_comets_parameters ' + '.current_global' + to_append + '\n')
-            f.writelines('load_package_parameters ' + '.current_package' + to_append + '\n')
-            f.writelines('load_layout ' + '.current_layout' + to_append)
-
-        if platform.system() == 'Windows':
+        with self.__timed('write_params', written = [c_global, c_package, c_script]):
+            self.parameters.write_params(c_global, c_package)
+
+            if os.path.isfile(c_script):
+                os.remove(c_script)
+            with open(c_script, 'a') as f:
+                f.write('load_comets_parameters ' + '.current_global' + to_append + '\n')
+                f.writelines('load_package_parameters ' + '.current_package' + to_append + '\n')
+                f.writelines('load_layout ' + '.current_layout' + to_append)
+
+        if self.engine == 'synthetic':
+            self.cmd = ('\"' + sys.executable + '\" \"' + synthetic.__file__ +
+                        '\" -script \"' + c_script + '\"')
+        elif platform.system() == 'Windows':
             self.cmd = ('\"' + self.COMETS_HOME +
                         '\\comets_scr' + '\" \"' +
                         c_script +
                         '\"')
         else:
             # simulate
-            self.cmd = ('java -classpath ' + self.JAVA_CLASSPATH +
+            self.cmd = ('java ' + ''.join(arg + ' ' for arg in self.get_jvm_args()) +
+                        '-classpath ' + self.JAVA_CLASSPATH +
                         # ' -Djava.library.path=' + self.D_JAVA_LIB_PATH +
                         ' edu.bu.segrelab.comets.Comets -loader' +
                         ' edu.bu.segrelab.comets.fba.FBACometsLoader' +
                         ' -script "' + c_script + '"')
 
-        p = sp.Popen(self.cmd,
-                     cwd = self.working_dir,
-                     shell=True, stdout=sp.PIPE, stderr=sp.STDOUT)
+    def __hash_run_files(self) -> str:
+        """ hashes the files written by __write_run_files, without the
+        per-object suffixes of file names, plus the COMETS version """
+        to_append = '_' + hex(id(self))
+        paths = [self.working_dir + '.current_global' + to_append,
+                 self.working_dir + '.current_package' + to_append,
+                 self.working_dir + '.current_layout' + to_append]
+        # log names carry the suffix of every comets object their params
+        # were given to, so all of them are removed
+        return(hash_files(paths, extra = self.VERSION +
+                          hash_files(self.__model_paths),
+                          strip = r'_0x[0-9a-f]+'))
+
+    def __result_attributes(self) -> list:
+        """ names of the attributes holding the output of the last run """
+        names = ['run_output', 'run_errors']
+        if self.parameters.all_params['writeTotalBiomassLog']:
+            names.append('total_biomass')
+        if self.parameters.all_params['writeFluxLog']:
+            names.append('fluxes_by_species')
+        if self.parameters.all_params['writeMediaLog']:
+            names.append('media')
+        if self.parameters.all_params['writeBiomassLog']:
+            names.append('biomass')
+        if self.parameters.all_params['evolution']:
+            names.append('genotypes')
+        if self.parameters.all_params['writeSpecificMediaLog']:
+            names.append('specific_media')
+        if self.parameters.all_params['showCycleTime']:
+            names.append('cycle_times')
+        return(names)
 
-        self.run_output, self.run_errors = p.communicate()
-        self.run_output = self.run_output.decode()
+    def get_jvm_args(self) -> list:
+        """
+        returns the options passed to the java virtual machine
 
-        if self.run_errors is not None:
-            self.run_errors = self.run_errors.decode()
-        else:
-            self.run_errors = "STDERR empty."
+        These are built from comets.default_jvm_options, updated with this
+        object's jvm_options; see the class docstring for the keys.
 
-        # Raise RuntimeError if simulation had nonzero exit
-        self.__analyze_run_output()
+        Returns
+        -------
 
+        list(str)
+            the JVM flags, e.g. ['-Xmx4096m', '-XX:+UseG1GC']
+
+        Examples
+        --------
+
+        >>> sim = c.comets(layout, params)
+        >>> sim.jvm_options["TieredStopAtLevel"] = 1 # a short run
+        >>> print(sim.get_jvm_args())
+
+        """
+        options = dict(comets.default_jvm_options)
+        options.update(self.jvm_options)
+        args = []
+        for name in ['Xms', 'Xmx']:
+            value = options.get(name)
+            if value == 'auto':
+                physical = _physical_memory_mb()
+                if physical is None:
+                    continue  # an unbounded estimate may be too small
+                value = _estimate_heap_mb(self.layout)
+                value = min(max(value, physical // 4), physical * 3 // 4)
+            if isinstance(value, (int, np.integer)):
+                value = str(value) + 'm'
+            if value is not None:
+                args.append('-' + name + value)
+        if options.get('gc') is not None:
+            args.append('-XX:+Use' + options['gc'] + 'GC')
+        if options.get('TieredStopAtLevel') is not None:
+            args.append('-XX:TieredStopAtLevel=' +
+                        str(options['TieredStopAtLevel']))
+        args += list(options.get('extra') or [])
+        return(args)
+
+    def __jvm_environment(self) -> dict:
+        """ the environment for COMETS. On Windows, where it is started by a
+        script, the JVM options go into JAVA_TOOL_OPTIONS. Elsewhere, they
+        are part of the command and the environment is inherited (None) """
+        if platform.system() != 'Windows':
+            return(None)
+        args = self.get_jvm_args()
+        if len(args) == 0:
+            return(None)
+        env = dict(os.environ)
+        env['JAVA_TOOL_OPTIONS'] = ' '.join([env.get('JAVA_TOOL_OPTIONS', '')] +
+                                            args).strip()
+        return(env)
+
+    def __build_command_args(self) -> list:
+        """ the same command as self.cmd, as a list of arguments that can be
+        run without a shell """
+        c_script = self.working_dir + '.current_script_' + hex(id(self))
+        if self.engine == 'synthetic':
+            return([sys.executable, synthetic.__file__, '-script', c_script])
+        if platform.system() == 'Windows':
+            return([self.COMETS_HOME + '\\comets_scr', c_script])
+        return(['java'] + self.get_jvm_args() + ['-classpath', self.JAVA_CLASSPATH,
+                'edu.bu.segrelab.comets.Comets', '-loader',
+                'edu.bu.segrelab.comets.fba.FBACometsLoader',
+                '-script', c_script])
+
+    def __remove_run_files(self, logs : bool = False):
+        """ removes the temporary files written for a run, ignoring those
+        which do not exist. if logs is True, the data logs are removed too """
+        to_append = '_' + hex(id(self))
+        to_remove = [self.working_dir + '.current_global' + to_append,
+                     self.working_dir + '.current_package' + to_append,
+                     self.working_dir + '.current_script' + to_append,
+                     self.working_dir + '.current_layout' + to_append,
+                     self.working_dir + 'COMETS_manifest.txt']  # todo: stop writing this in java
+        if not self.models_written and self.__model_dir is None:
+            to_remove += [self.working_dir + m.id + '.cmd'
+                          for m in self.layout.models]
+        if logs:
+            to_remove += [self.working_dir + self.parameters.all_params[name]
+                          for name in ['TotalBiomassLogName', 'BiomassLogName',
+                                       'FluxLogName', 'MediaLogName',
+                                       'SpecificMediaLogName']]
+            to_remove.append(self.working_dir + 'GENOTYPES_' +
+                             self.parameters.all_params['BiomassLogName'])
+        for path in to_remove:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def __start_live(self, interval : float):
+        """ starts a thread that reads the logs as COMETS writes them """
+        live_logs = [('writeTotalBiomassLog', 'TotalBiomassLogName',
+                      lambda src: parsers.read_total_biomass(
+                          src, self.layout.get_model_ids())),
+                     ('writeFluxLog', 'FluxLogName',
+                      lambda src: parsers.read_fluxes_by_species(
+                          src, self.__n_reactions())),
+                     ('writeMediaLog', 'MediaLogName', parsers.read_media),
+                     ('writeBiomassLog', 'BiomassLogName', parsers.read_biomass)]
+        for flag, log_name, reader in live_logs:
+            if self.parameters.all_params[flag]:
+                path = self.working_dir + self.parameters.all_params[log_name]
+                merge = _merge_flux_arrays if log_name == 'FluxLogName' else None
+                self.__live_tails[log_name] = _log_tail(path, reader,
+                                                        merge = merge)
+
+        stop = threading.Event()
+
+        def follow():
+            while not stop.wait(interval):
+                self.__poll_live()
+        self.__live_thread = (threading.Thread(target = follow, daemon = True),
+                              stop)
+        self.__live_thread[0].start()
+
+    def __stop_live(self):
+        """ stops the thread started by __start_live, if there is one """
+        if self.__live_thread is not None:
+            thread, stop = self.__live_thread
+            stop.set()
+            thread.join()
+            self.__live_thread = None
+
+    def __poll_live(self):
+        """ appends newly logged lines to the matching attributes """
+        attributes = {'TotalBiomassLogName': 'total_biomass',
+                      'MediaLogName': 'media',
+                      'BiomassLogName': 'biomass'}
+        for log_name, tail in list(self.__live_tails.items()):
+            if not tail.poll():
+                continue
+            if log_name == 'FluxLogName':
+                self.__build_readable_flux_object(tail.frame)
+            else:
+                setattr(self, attributes[log_name], tail.frame)
+
+    def __n_reactions(self) -> list:
+        """ the number of reactions of each model, in layout order """
+        return([len(m.reactions) for m in self.layout.models])
+
+    def __as_frame(self, log, cycles : list = None,
+                   columns : list = None) -> pd.DataFrame:
+        """ returns log as a DataFrame. If it is a log_dataset streamed to
+        disk, only the given cycles and columns (default all) are loaded """
+        if isinstance(log, log_dataset):
+            return(log.read(cycles = cycles, columns = columns))
+        return(log)
+
+    def __read_log(self, log_name : str, reader, *args) -> pd.DataFrame:
+        """ returns the parsed log whose file name is in params[log_name].
+        If the log was followed live, only its last lines are still parsed """
+        tail = self.__live_tails.pop(log_name, None)
+        if tail is not None:
+            tail.poll(final = True)
+            if tail.frame is not None:
+                return(tail.frame)
+        return(reader(self.working_dir + self.parameters.all_params[log_name],
+                      *args))
+
+    def __stream_log(self, directory : str, chunks,
+                     columns : list) -> log_dataset:
+        """ appends each DataFrame of chunks to a dataset in directory, and
+        returns its handle """
+        writer = _dataset_writer(directory, columns)
+        for chunk in chunks:
+            writer.append(chunk)
+        return(writer.close())
+
+    def __stream_fluxes(self, stream_to : str):
+        """ streams the flux log into one dataset per model below stream_to,
+        stored as the values of fluxes_by_species """
+        path = self.working_dir + self.parameters.all_params['FluxLogName']
+        n_reactions = self.__n_reactions()
+        chunk_lines = max(1, _STREAM_CHUNK_VALUES // (4 + max(n_reactions)))
+        writers = {}
+        for i, m in enumerate(self.layout.models):
+            writers[i + 1] = _dataset_writer(
+                os.path.join(stream_to, 'fluxes', m.id),
+                ['cycle', 'x', 'y'] + list(m.reactions.REACTION_NAMES))
+        for chunk in parsers.iter_flux_chunks(path, n_reactions, chunk_lines):
+            for model_num, values in chunk.items():
+                writers[model_num].append(_flux_frame(
+                    values, writers[model_num].columns[3:]))
+        self.fluxes_by_species = {m.id: writers[i + 1].close()
+                                  for i, m in enumerate(self.layout.models)}
+        self.__fluxes = None
+
+    def __read_output(self, delete_files : bool, stream_to : str = None):
+        """ reads the simulation logs requested in params into this object,
+        and optionally deletes them along with the other temporary files.
+        If stream_to is a directory, big logs are stored there instead """
         # '''----------- READ OUTPUT ---------------------------------------'''
         # Read total biomass output
         if self.parameters.all_params['writeTotalBiomassLog']:
-            tbmf = _readlines_file(
-                self.working_dir + self.parameters.all_params['TotalBiomassLogName'])
-            tbmf = [x.replace(",",".") for x in tbmf] # for systems that use commas as decimal place
-            self.total_biomass = pd.DataFrame([re.split(r'\t+', x.strip())
-                                               for x in tbmf],
-                                              columns=['cycle'] +
-                                              self.layout.get_model_ids())
-            self.total_biomass = self.total_biomass.astype('float')
-            self.total_biomass.cycle = self.total_biomass.cycle.astype('int')
+            with self.__timed('read_total_biomass', read = self.__log_path('TotalBiomassLogName')):
+                self.total_biomass = self.__read_log('TotalBiomassLogName',
+                                                     parsers.read_total_biomass,
+                                                     self.layout.get_model_ids())
             if delete_files:
                 os.remove(self.working_dir + self.parameters.all_params['TotalBiomassLogName'])
 
         # Read flux
         if self.parameters.all_params['writeFluxLog']:
-
-            max_rows = 4 + max([len(m.reactions) for m in self.layout.models])
-
-            self.fluxes = pd.read_csv(self.working_dir + self.parameters.all_params['FluxLogName'],
-                                      delim_whitespace=True,
-                                      header=None, names=range(max_rows))
-            # deal with commas-as-decimals
-            if any([isinstance(self.fluxes.iloc[0,i], str) for i in range(self.fluxes.shape[1])]):
-                self.fluxes = pd.read_csv(self.working_dir + self.parameters.all_params['FluxLogName'],
-                                      decimal = ",", delim_whitespace=True,
-                                      header=None, names=range(max_rows))
+            with self.__timed('read_fluxes', read = self.__log_path('FluxLogName')):
+                if stream_to is not None:
+                    self.__stream_fluxes(stream_to)
+                else:
+                    arrays = self.__read_log('FluxLogName',
+                                             parsers.read_fluxes_by_species,
+                                             self.__n_reactions())
+                    self.__build_readable_flux_object(arrays)
             if delete_files:
                 os.remove(self.working_dir + self.parameters.all_params['FluxLogName'])
-            self.__build_readable_flux_object()
 
         # Read media logs
         if self.parameters.all_params['writeMediaLog']:
-            self.media = pd.read_csv(self.working_dir + self.parameters.all_params[
-                'MediaLogName'], delim_whitespace=True, names=('metabolite',
-                                                               'cycle', 'x',
-                                                               'y',
-                                                               'conc_mmol'))
-            # deal with commas-as-decimals
-            if isinstance(self.media.loc[0, "conc_mmol"], str):
-                self.media = pd.read_csv(self.working_dir + self.parameters.all_params[
-                'MediaLogName'],
-                    decimal = ",", delim_whitespace=True, names=('metabolite',
-                                                               'cycle', 'x',
-                                                               'y',
-                                                               'conc_mmol'))
+            media_file = self.__log_path('MediaLogName')
+            with self.__timed('read_media', read = media_file):
+                if stream_to is not None:
+                    self.media = self.__stream_log(
+                        os.path.join(stream_to, 'media'),
+                        parsers.read_media(media_file,
+                                           chunksize = _STREAM_CHUNK_VALUES // 5),
+                        ['metabolite', 'cycle', 'x', 'y', 'conc_mmol'])
+                else:
+                    self.media = self.__read_log('MediaLogName', parsers.read_media)
             if delete_files:
-                os.remove(self.working_dir + self.parameters.all_params['MediaLogName'])
+                os.remove(media_file)
 
         # Read spatial biomass log
         if self.parameters.all_params['writeBiomassLog']:
-            self.biomass = pd.read_csv(self.working_dir + self.parameters.all_params[
-                'BiomassLogName'], header=None, delimiter=r'\s+', names=['cycle', 'x', 'y',
-                                                                         'species', 'biomass'])
-            # deal with commas-as-decimals
-            if isinstance(self.biomass.loc[0,"biomass"], str):
-                self.biomass = pd.read_csv(self.working_dir + self.parameters.all_params[
-                'BiomassLogName'], header=None,
-                    decimal = ",",
-                    delimiter=r'\s+', names=['cycle', 'x', 'y','species', 'biomass'])
-
-            # cut off extension added by toolbox
-            self.biomass['species'] = [sp[:-4] if '.cmd' in sp else sp for sp in self.biomass.species]
-
+            biomass_file = self.__log_path('BiomassLogName')
+            with self.__timed('read_biomass', read = biomass_file):
+                if stream_to is not None:
+                    self.biomass = self.__stream_log(
+                        os.path.join(stream_to, 'biomass'),
+                        parsers.read_biomass(biomass_file,
+                                             chunksize = _STREAM_CHUNK_VALUES // 5),
+                        ['cycle', 'x', 'y', 'species', 'biomass'])
+                else:
+                    self.biomass = self.__read_log('BiomassLogName', parsers.read_biomass)
             if delete_files:
-                os.remove(self.working_dir + self.parameters.all_params['BiomassLogName'])
+                os.remove(biomass_file)
 
         # Read evolution-related logs
         if 'evolution' in list(self.parameters.all_params.keys()):
             if self.parameters.all_params['evolution']:
                 genotypes_out_file = 'GENOTYPES_' + self.parameters.all_params[
                     'BiomassLogName']
-                self.genotypes = pd.read_csv(genotypes_out_file,
-                                             header=None, delimiter=r'\s+',
-                                             names=['Ancestor',
-                                                    'Mutation',
-                                                    'Species'])
+                with self.__timed('read_genotypes',
+                                  read = self.working_dir + genotypes_out_file):
+                    self.genotypes = parsers.read_genotypes(self.working_dir +
+                                                            genotypes_out_file)
                 if delete_files:
                     os.remove(self.working_dir + genotypes_out_file)
 
         # Read specific media output
         if self.parameters.all_params['writeSpecificMediaLog']:
-            spec_med_file = self.working_dir + self.parameters.all_params['SpecificMediaLogName']
-            self.specific_media = pd.read_csv(spec_med_file, delimiter=r'\s+')
-            # deal with commas-as-decimals
-            if any([isinstance(self.specific_media.iloc[0,i], str) for i in range(3, self.specific_media.shape[1])]):
-                self.specific_media = pd.read_csv(spec_med_file, decimal = ",",delimiter=r'\s+')
+            spec_med_file = self.__log_path('SpecificMediaLogName')
+            with self.__timed('read_specific_media', read = spec_med_file):
+                self.specific_media = parsers.read_specific_media(spec_med_file)
 
             if delete_files:
-                os.remove(self.working_dir + self.parameters.all_params['SpecificMediaLogName'])
+                os.remove(spec_med_file)
+
+        # Read the duration of each cycle from std_out
+        if self.parameters.all_params['showCycleTime']:
+            self.cycle_times = parse_cycle_times(self.run_output)
 
         # clean workspace
         if delete_files:
-            self.layout.delete_model_files(self.working_dir)
-            os.remove(c_global)
-            os.remove(c_package)
-            os.remove(c_script)
-            os.remove(self.working_dir + '.current_layout' + to_append)
-            os.remove(self.working_dir + 'COMETS_manifest.txt')  # todo: stop writing this in java
-        print('Done!')
-
-    def __build_readable_flux_object(self):
-        """ comets.fluxes is an odd beast, where the column position has a
-        different meaning depending on what model the row is about. Therefore,
-        this function creates separate dataframes, stored in a dictionary with
-        model_id as a key, that are much more human-readable."""
-
-        self.fluxes_by_species = {}
-        for i in range(len(self.layout.models)):
-            model_num = i + 1
+            self.__remove_run_files()
 
-            model_id = self.layout.models[model_num - 1].id
-            model_rxn_names = list(self.layout.models[
-                model_num - 1].reactions.REACTION_NAMES)
-            model_rxn_len = len(model_rxn_names)
+    def __log_path(self, log_name : str) -> str:
+        """ the path of the log whose file name is in params[log_name] """
+        return(self.working_dir + self.parameters.all_params[log_name])
 
-            sub_df = self.fluxes.loc[self.fluxes[3] == model_num]
+    def __build_readable_flux_object(self, arrays : dict):
+        """ the flux log is an odd beast, where the column position has a
+        different meaning depending on what model the row is about. It is
+        therefore parsed into one array per model (see
+        parsers.read_fluxes_by_species), and this function turns those into
+        separate dataframes, stored in a dictionary with model_id as a key,
+        that are much more human-readable."""
 
-            # this tosses extraneous columns and the model num column
-            sub_df = sub_df.drop(sub_df.columns[model_rxn_len+4: len(sub_df.columns)],
-                                 axis=1)
-            sub_df = sub_df.drop(sub_df.columns[3], axis=1)
-            sub_df.columns = ["cycle", "x", "y"] + model_rxn_names
-            self.fluxes_by_species[model_id] = sub_df
+        self.fluxes_by_species = {}
+        for i, m in enumerate(self.layout.models):
+            self.fluxes_by_species[m.id] = _flux_frame(
+                arrays[i + 1], list(m.reactions.REACTION_NAMES))
+        self.__fluxes = None
+
+    @property
+    def fluxes(self) -> pd.DataFrame:
+        """ all models' fluxes in one DataFrame, laid out like the flux log:
+        columns 0 to 3 are cycle, x, y and model number (starting at 1), and
+        the following columns are that model's reaction fluxes, padded with
+        NaN. Built from fluxes_by_species the first time it is used. """
+        if self.__fluxes is None:
+            if not hasattr(self, 'fluxes_by_species'):
+                raise AttributeError("'comets' object has no attribute 'fluxes'")
+            frames = []
+            for i, m in enumerate(self.layout.models):
+                sub_df = self.__as_frame(self.fluxes_by_species[m.id])
+                frame = pd.DataFrame(sub_df.values[:, 3:],
+                                     columns = range(4, sub_df.shape[1] + 1))
+                frame.insert(0, 0, sub_df['cycle'].values)
+                frame.insert(1, 1, sub_df['x'].values)
+                frame.insert(2, 2, sub_df['y'].values)
+                frame.insert(3, 3, i + 1)
+                frames.append(frame)
+            fluxes = pd.concat(frames, ignore_index = True)
+            self.__fluxes = fluxes.sort_values([0, 1, 2, 3], kind = 'stable',
+                                               ignore_index = True)
+        return(self.__fluxes)
+
+    @fluxes.setter
+    def fluxes(self, value : pd.DataFrame):
+        self.__fluxes = value
 
     def __analyze_run_output(self):
         if "End of simulation" in self.run_output:
@@ -608,19 +1703,114 @@ class comets:
         >>> from matplotlib import pyplot as plt # may need to be installed
         >>> plt.imshow(im)
 
+        """
+        return(self.get_metabolite_stack(met, [cycle])[0])
+
+    def get_metabolite_stack(self, met : str, cycles : list = None) -> np.array:
+        """
+        returns images of metabolite concentrations at many cycles
+
+        Like get_metabolite_image, but for a list of cycles at once, which is
+        useful for making movies. If get_media_cube() has been called, the
+        images are sliced from the cube; otherwise they are scattered from
+        the media log in one vectorized pass.
+
+        Parameters
+        ----------
+
+        met : str
+            the name of the metabolite
+        cycles : list(int), optional
+            the cycles to get, in order. Default is every cycle in the log
+
+        Returns
+        -------
+
+            A 3d numpy array, [cycle, x, y]
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> stack = sim.get_metabolite_stack("ac_e")
+        >>> from matplotlib import pyplot as plt # may need to be installed
+        >>> for im in stack:
+        >>>     plt.imshow(im)
+        >>>     plt.show()
+
         """
         if not self.parameters.all_params['writeMediaLog']:
             raise ValueError("media log was not recorded during simulation")
         if met not in list(self.layout.media.metabolite):
             raise NameError("met " + met + " is not in layout.media.metabolite")
-        if cycle not in list(np.unique(self.media['cycle'])):
+        if self.__media_cube is not None and self.__media_cube[0] is self.media:
+            cube, logged_cycles, mets = self.__media_cube[1:]
+        elif isinstance(self.media, log_dataset):
+            cube = None
+            logged_cycles = np.asarray(self.media.cycles)
+        else:
+            cube = None
+            logged_cycles = np.sort(pd.unique(self.media['cycle'].values))
+        if cycles is None:
+            cycles = logged_cycles
+        cycles = np.asarray(cycles)
+        if not np.all(np.isin(cycles, logged_cycles)):
             raise ValueError('media was not saved at the desired cycle. try another.')
-        im = np.zeros((self.layout.grid[0], self.layout.grid[1]))
-        aux = self.media.loc[np.logical_and(self.media['cycle'] == cycle,
-                                            self.media['metabolite'] == met)]
-        for index, row in aux.iterrows():
-            im[int(row['x']-1), int(row['y']-1)] = row['conc_mmol']
-        return(im)
+
+        if cube is not None:
+            stack = np.zeros((len(cycles), self.layout.grid[0], self.layout.grid[1]))
+            if met in mets:
+                stack[:] = cube[np.searchsorted(logged_cycles, cycles),
+                                mets.index(met)]
+            return(stack)
+
+        # no cube: scatter only the rows of met at the requested cycles
+        media = self.__as_frame(self.media, cycles)
+        rows = media['metabolite'].values == met
+        return(_scatter_stack(media['cycle'].values[rows],
+                              media['x'].values[rows],
+                              media['y'].values[rows],
+                              media['conc_mmol'].values[rows],
+                              cycles, self.layout.grid))
+
+    def get_media_cube(self) -> tuple:
+        """
+        returns the whole media log as one dense 4d array
+
+        The array is built once, in a single vectorized pass, and kept until
+        the media log changes. Afterwards, get_metabolite_image and
+        get_metabolite_stack are answered by slicing it. Note that the cube
+        takes 8 bytes * cycles * metabolites * grid[0] * grid[1] of memory.
+
+        Returns
+        -------
+
+        tuple (numpy.array, numpy.array, list)
+            the 4d array [cycle, metabolite, x, y], the logged cycles in the
+            order of its first axis, and the metabolites in the order of
+            its second axis
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> cube, cycles, mets = sim.get_media_cube()
+        >>> total_glucose = cube[:, mets.index("glc__D_e")].sum(axis = (1, 2))
+
+        """
+        if not self.parameters.all_params['writeMediaLog']:
+            raise ValueError("media log was not recorded during simulation")
+        if self.__media_cube is None or self.__media_cube[0] is not self.media:
+            media = self.__as_frame(self.media)
+            cube, cycles, mets = _scatter_cube(media['cycle'].values,
+                                               media['metabolite'].values,
+                                               media['x'].values,
+                                               media['y'].values,
+                                               media['conc_mmol'].values,
+                                               self.layout.grid)
+            self.__media_cube = (self.media, cube, cycles, list(mets))
+        return(tuple(self.__media_cube[1:]))
+
 
     def get_biomass_image(self, model_id : str, cycle : int) -> np.array:
         """
@@ -655,19 +1845,102 @@ class comets:
         >>> from matplotlib import pyplot as plt # may need to be installed
         >>> plt.imshow(im)
 
+        """
+        return(self.get_biomass_stack(model_id, [cycle])[0])
+
+    def get_biomass_stack(self, model_id : str, cycles : list = None) -> np.array:
+        """
+        returns images of one model's biomass at many cycles
+
+        Like get_biomass_image, but for a list of cycles at once, which is
+        useful for animations and for following colony growth. The images
+        are sliced from the array returned by get_biomass_cube(), unless the
+        biomass log was streamed to disk (see run), in which case only the
+        requested cycles are loaded.
+
+        Parameters
+        ----------
+
+        model_id : str
+            the id of the model to get biomass data on
+        cycles : list(int), optional
+            the cycles to get, in order. Default is every cycle in the log
+
+        Returns
+        -------
+
+            A 3d numpy array, [cycle, x, y]
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> stack = sim.get_biomass_stack("iJO1366")
+        >>> colony_area = (stack > 0).sum(axis = (1, 2))
+
+        """
+        if isinstance(self.biomass, log_dataset):
+            # streamed to disk: only load the requested cycles
+            if model_id not in [m.id for m in self.layout.models]:
+                raise NameError("model " + model_id + " is not one of the model ids")
+            if cycles is None:
+                cycles = self.biomass.cycles
+            if not np.all(np.isin(cycles, self.biomass.cycles)):
+                raise ValueError('biomass was not saved at the desired cycle. try another.')
+            biomass = self.biomass.read(cycles = cycles)
+            rows = biomass['species'].values == model_id
+            return(_scatter_stack(biomass['cycle'].values[rows],
+                                  biomass['x'].values[rows],
+                                  biomass['y'].values[rows],
+                                  biomass['biomass'].values[rows],
+                                  cycles, self.layout.grid))
+        cube, species, logged_cycles = self.get_biomass_cube()
+        if model_id not in species:
+            raise NameError("model " + model_id + " is not one of the model ids")
+        if cycles is None:
+            cycles = logged_cycles
+        cycles = np.asarray(cycles)
+        if not np.all(np.isin(cycles, logged_cycles)):
+            raise ValueError('biomass was not saved at the desired cycle. try another.')
+        return(cube[species.index(model_id),
+                    np.searchsorted(logged_cycles, cycles)])
+
+    def get_biomass_cube(self) -> tuple:
+        """
+        returns the whole spatial biomass log as one dense 4d array
+
+        The array is built once, in a single vectorized pass, and kept until
+        the biomass log changes. get_biomass_image and get_biomass_stack are
+        answered by slicing it.
+
+        Returns
+        -------
+
+        tuple (numpy.array, list, numpy.array)
+            the 4d array [species, cycle, x, y], the model ids in the order
+            of its first axis, and the logged cycles in the order of its
+            second axis
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> cube, species, cycles = sim.get_biomass_cube()
+        >>> total = cube.sum(axis = (2, 3)) # [species, cycle]
+
         """
         if not self.parameters.all_params['writeBiomassLog']:
             raise ValueError("biomass log was not recorded during simulation")
-        if model_id not in list(np.unique(self.biomass['species'])):
-            raise NameError("model " + model.id + " is not one of the model ids")
-        if cycle not in list(np.unique(self.biomass['cycle'])):
-            raise ValueError('biomass was not saved at the desired cycle. try another.')
-        im = np.zeros((self.layout.grid[0], self.layout.grid[1]))
-        aux = self.biomass.loc[np.logical_and(self.biomass['cycle'] == cycle,
-                                    self.biomass['species'] == model_id), :]
-        for index, row in aux.iterrows():
-            im[int(row['x']-1), int(row['y']-1)] = row['biomass']
-        return(im)
+        if self.__biomass_cube is None or self.__biomass_cube[0] is not self.biomass:
+            biomass = self.__as_frame(self.biomass)
+            cube, species, cycles = _scatter_cube(biomass['species'].values,
+                                                  biomass['cycle'].values,
+                                                  biomass['x'].values,
+                                                  biomass['y'].values,
+                                                  biomass['biomass'].values,
+                                                  self.layout.grid)
+            self.__biomass_cube = (self.biomass, cube, list(species), cycles)
+        return(tuple(self.__biomass_cube[1:]))
 
     def get_flux_image(self, model_id : str,
                        reaction_id : str, cycle : int) -> np.array:
@@ -712,16 +1985,301 @@ class comets:
             raise NameError("model " + model_id + " is not one of the model ids")
         im = np.zeros((self.layout.grid[0], self.layout.grid[1]))
         temp_fluxes = self.fluxes_by_species[model_id]
-        if cycle not in list(np.unique(temp_fluxes['cycle'])):
+        if isinstance(temp_fluxes, log_dataset):
+            # streamed to disk: only load the requested cycle and reaction
+            temp_fluxes = temp_fluxes.read([cycle], [col for col in temp_fluxes.columns
+                                                     if col in ['cycle', 'x', 'y', reaction_id]])
+        rows = temp_fluxes['cycle'].values == cycle
+        if not rows.any():
             raise ValueError('flux was not saved at the desired cycle. try another.')
-        if reaction_id not in list(temp_fluxes.columns):
+        if reaction_id not in temp_fluxes.columns:
             raise NameError("reaction_id " + reaction_id +
                             " is not a reaction in the desired model")
-        aux = temp_fluxes.loc[temp_fluxes['cycle'] == cycle, :]
-        for index, row in aux.iterrows():
-            im[int(row['x']-1), int(row['y']-1)] = row[reaction_id]
+        im[temp_fluxes['x'].values[rows] - 1,
+           temp_fluxes['y'].values[rows] - 1] = temp_fluxes[reaction_id].values[rows]
         return(im)
 
+    def to_layout(self, cycle : int = -1):
+        """
+        returns a new layout holding the state of the simulation at a cycle
+
+        The new layout is a copy of this simulation's layout, whose models'
+        initial_pop is the biomass at cycle, and whose media is the media at
+        cycle, set as local media at each location. Static metabolites keep
+        their static values. Both the biomass and the media log must have
+        been written at cycle, e.g. by setting:
+
+            params.set_param("writeBiomassLog", True)
+            params.set_param("writeMediaLog", True)
+
+        with the same BiomassLogRate and MediaLogRate.
+
+        Parameters
+        ----------
+
+        cycle : int, optional
+            the cycle to take the state from. Default is -1, the last cycle
+            logged in both the biomass and media logs
+
+        Returns
+        -------
+
+        cometspy.layout
+            a layout to start a new simulation from
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> new_layout = sim.to_layout()
+        >>> new_layout.set_specific_metabolite("glc__D_e", 0.01) # feed more
+        >>> sim2 = c.comets(new_layout, params)
+        >>> sim2.run()
+
+        """
+        if not hasattr(self, 'biomass') or not hasattr(self, 'media'):
+            raise ValueError("to_layout needs the biomass and media logs. set "
+                             "params writeBiomassLog and writeMediaLog to True")
+        cycles = set(self.__log_cycles(self.biomass))
+        cycles = sorted(cycles.intersection(self.__log_cycles(self.media)))
+        if cycle == -1 and len(cycles) > 0:
+            cycle = cycles[-1]
+        if cycle not in cycles:
+            raise ValueError("cycle " + str(cycle) + " is not in both the "
+                             "biomass and media logs. use the same "
+                             "BiomassLogRate and MediaLogRate")
+        biomass = self.__as_frame(self.biomass, [cycle])
+        biomass = biomass.loc[(biomass['cycle'] == cycle) &
+                              (biomass['biomass'] > 0)]
+        media = self.__as_frame(self.media, [cycle])
+        media = media.loc[media['cycle'] == cycle]
+
+        layout = copy.deepcopy(self.layout)
+        for m in layout.models:
+            founders = biomass.loc[biomass['species'] == m.id]
+            if len(founders) == 0:
+                m.initial_pop = [[0, 0, 0.0]]
+                continue
+            # logs are 1-ordered, layouts are 0-ordered
+            m.initial_pop = [[x - 1, y - 1, b] for x, y, b in
+                             zip(founders['x'], founders['y'],
+                                 founders['biomass'])]
+        layout.update_models()
+
+        static = set(layout.media.loc[layout.media['g_static'] == 1,
+                                      'metabolite'])
+        layout.media.loc[~layout.media['metabolite'].isin(static),
+                         'init_amount'] = 0.
+        layout.local_media = {}
+        media = media.loc[media['metabolite'].isin(layout.all_exchanged_mets) &
+                          ~media['metabolite'].isin(static) &
+                          (media['conc_mmol'] != 0)]
+        for met, x, y, conc in zip(media['metabolite'], media['x'],
+                                   media['y'], media['conc_mmol']):
+            layout.set_specific_metabolite_at_location(met, (x - 1, y - 1), conc)
+        return(layout)
+
+    def continue_run(self, extra_cycles : int, cycle : int = -1, **kwargs):
+        """
+        runs a new simulation starting from the state of this one at a cycle
+
+        The new simulation uses the layout returned by to_layout(cycle) and a
+        copy of these params, with maxCycles set to extra_cycles. Its cycles
+        are counted from 0, the state it started from. This makes it possible
+        to run a long simulation in chunks, or to extend a finished one.
+
+        Parameters
+        ----------
+
+        extra_cycles : int
+            the number of cycles to run
+        cycle : int, optional
+            the cycle to continue from. Default is -1, the last cycle logged
+            in both the biomass and media logs. See to_layout
+        **kwargs
+            passed to run(), e.g. delete_files or timeout
+
+        Returns
+        -------
+
+        cometspy.comets
+            the new, finished simulation
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> more = sim.continue_run(1000)
+        >>> more.total_biomass.plot(x = "cycle")
+
+        """
+        layout = self.to_layout(cycle)
+        parameters = copy.deepcopy(self.parameters)
+        # drop the suffix this object added to the log names
+        to_append = '_' + hex(id(self))
+        for log_name in ['TotalBiomassLogName', 'BiomassLogName', 'FluxLogName',
+                         'MediaLogName', 'SpecificMediaLogName']:
+            name = parameters.all_params[log_name]
+            if name.endswith(to_append):
+                parameters.set_param(log_name, name[:-len(to_append)])
+        parameters.set_param('maxCycles', extra_cycles)
+        sim = comets(layout, parameters, engine = self.engine)
+        sim.working_dir = self.working_dir
+        sim.jvm_options = copy.deepcopy(self.jvm_options)
+        sim.run(**kwargs)
+        return(sim)
+
+    def __log_cycles(self, log) -> list:
+        """ the cycles in a log, whether a DataFrame or a log_dataset """
+        if isinstance(log, log_dataset):
+            return(log.cycles)
+        return(pd.unique(log['cycle']).tolist())
+
+    def save_results(self, path : str):
+        """
+        saves the output of the last run in a memory-mappable columnar format
+
+        total_biomass, biomass, media, specific_media, genotypes,
+        cycle_times and fluxes_by_species are written to the directory path, whichever were
+        produced by the run. Open them again with cometspy.load_results(path);
+        see cometspy.store.stored_results for details.
+
+        Parameters
+        ----------
+
+        path : str
+            the directory to write to. Created if needed
+
+        Examples
+        --------
+
+        >>> for i, sim in enumerate(sims):
+        >>>     sim.run()
+        >>>     sim.save_results("./results/run_" + str(i))
+        >>> # later, e.g. in another session
+        >>> import cometspy as c
+        >>> runs = [c.load_results("./results/run_" + str(i)) for i in range(1000)]
+
+        """
+        tables = {}
+        for name in ['total_biomass', 'biomass', 'media', 'specific_media',
+                     'genotypes', 'cycle_times']:
+            if hasattr(self, name):
+                tables[name] = self.__as_frame(getattr(self, name))
+        if hasattr(self, 'fluxes_by_species'):
+            for model_id, fluxes in self.fluxes_by_species.items():
+                tables['fluxes_by_species/' + model_id] = self.__as_frame(fluxes)
+        if len(tables) == 0:
+            raise ValueError("there are no results to save. run the simulation first")
+        os.makedirs(path, exist_ok = True)
+        _write_tables(path, tables)
+
+    def get_cycle_profile(self) -> pd.DataFrame:
+        """
+        returns the duration of each cycle along with what may explain it
+
+        The seconds each cycle took are joined with the total biomass (if
+        the total biomass log was written) and, for cycles in the biomass
+        log, with the number of occupied grid cells and of species present.
+        This requires the following parameter to have been set:
+
+            params.set_param("showCycleTime", True)
+
+        Returns
+        -------
+
+        pandas.DataFrame
+            with columns cycle, cycle_time (s) and, when logged,
+            total_biomass, occupied_cells and n_species
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> profile = sim.get_cycle_profile()
+        >>> profile.plot(x = "total_biomass", y = "cycle_time")
+
+        """
+        if not hasattr(self, 'cycle_times'):
+            raise ValueError("cycle times were not printed during simulation. "
+                             "set params showCycleTime to True")
+        profile = self.cycle_times.copy()
+        if hasattr(self, 'total_biomass'):
+            total = pd.DataFrame({'cycle': self.total_biomass['cycle'],
+                                  'total_biomass': self.total_biomass.drop(
+                                      columns = 'cycle').sum(axis = 1)})
+            profile = profile.merge(total, on = 'cycle', how = 'left')
+        if hasattr(self, 'biomass'):
+            if isinstance(self.biomass, log_dataset):
+                frames = (frame for cycle, frame in self.biomass.iter_cycles())
+            else:
+                frames = [self.biomass]
+            counts = []
+            for frame in frames:
+                present = frame.loc[frame['biomass'] > 0]
+                counts.append(pd.DataFrame({
+                    'occupied_cells': present.drop_duplicates(
+                        ['cycle', 'x', 'y']).groupby('cycle').size(),
+                    'n_species': present.groupby('cycle')['species'].nunique()}))
+            if len(counts) > 0:
+                counts = pd.concat(counts).rename_axis('cycle').reset_index()
+                profile = profile.merge(counts, on = 'cycle', how = 'left')
+        return(profile)
+
+    def get_cycle_time_summary(self, superlinear_above : float = 1.1) -> pd.DataFrame:
+        """
+        returns how the duration of a cycle scales with what it depends on
+
+        For each of total_biomass, occupied_cells and n_species in
+        get_cycle_profile(), a power law cycle_time ~ value ** exponent is
+        fit (in log-log space). An exponent above superlinear_above means
+        that cycles become disproportionately slower as that quantity grows,
+        e.g. because of too many diffusion steps per cycle (numDiffPerStep),
+        a short timeStep or a fine grid.
+
+        Parameters
+        ----------
+
+        superlinear_above : float, optional
+            the exponent above which a slowdown is flagged. Default is 1.1
+
+        Returns
+        -------
+
+        pandas.DataFrame
+            indexed by quantity, with columns exponent, r_squared, n_cycles
+            and superlinear (bool)
+
+        Examples
+        --------
+
+        >>> sim.run()
+        >>> summary = sim.get_cycle_time_summary()
+        >>> print(summary[summary.superlinear])
+
+        """
+        profile = self.get_cycle_profile()
+        rows = {}
+        for quantity in ['total_biomass', 'occupied_cells', 'n_species']:
+            if quantity not in profile.columns:
+                continue
+            data = profile[[quantity, 'cycle_time']].dropna()
+            data = data.loc[(data[quantity] > 0) & (data['cycle_time'] > 0)]
+            x = np.log(data[quantity].values.astype(float))
+            y = np.log(data['cycle_time'].values)
+            if len(data) < 3 or np.ptp(x) == 0:
+                continue  # nothing to fit
+            exponent, intercept = np.polyfit(x, y, 1)
+            residuals = y - (exponent * x + intercept)
+            total = np.sum((y - y.mean()) ** 2)
+            r_squared = 1. - np.sum(residuals ** 2) / total if total > 0 else 1.
+            rows[quantity] = {'exponent': exponent, 'r_squared': r_squared,
+                              'n_cycles': len(data),
+                              'superlinear': exponent > superlinear_above}
+        return(pd.DataFrame.from_dict(rows, orient = 'index',
+                                      columns = ['exponent', 'r_squared',
+                                                 'n_cycles', 'superlinear']))
+
     def get_metabolite_time_series(self, upper_threshold : float = 1000.) -> pd.DataFrame:
         """
         returns a pandas DataFrame containing extracellular metabolite time series
@@ -732,7 +2290,7 @@ class comets:
         upper_threshold : float (optional)
             metabolites ever above this are not returned
         """
-        total_media = self.media.groupby(by = ["metabolite", "cycle"]).agg(func = sum).reset_index().drop(columns = ["x", "y"])
+        total_media = self.__as_frame(self.media).groupby(by = ["metabolite", "cycle"]).agg(func = sum).reset_index().drop(columns = ["x", "y"])
         total_media = total_media.pivot(columns = "metabolite", values = "conc_mmol", index = ["cycle"]).reset_index().fillna(0.)
         exceeded_threshold = [x for x in total_media.min().index[total_media.min() > upper_threshold] if x != "cycle"]
         total_media = total_media.drop(columns = exceeded_threshold)
@@ -750,7 +2308,7 @@ class comets:
         threshold : float (optional)
             abs(flux) must exceed this to be returned
         """
-        fluxes = self.fluxes_by_species[model_id].copy()
+        fluxes = self.__as_frame(self.fluxes_by_species[model_id]).copy()
         fluxes = fluxes.groupby(by = "cycle").agg(func = sum).reset_index().drop(columns = ["x", "y"])
         not_exch = [x for x in fluxes.columns if "EX_" not in x and x != "cycle"]
         fluxes = fluxes.drop(columns =not_exch)
@@ -526,14 +526,14 @@ class layout:
             region_map_data = []
             for i in range(lin_substrate+1, lin_substrate_end):
                 region_map_data.append([int(x) for x in f_lines[i].split()])
-                region_map_data = np.array(region_map_data, dtype=int)
-                if region_map_data.shape != tuple(self.grid):
-                    print('\nWarning: Some substrate_layout lines are ' +
-                          ' longer or shorter than the grid width, or there are more' +
-                          ' lines than the grid length. Check your layout file.' +
-                          'Check your layout file.')
-                self.__region_flag = True
-                self.region_map = region_map_data
+            region_map_data = np.array(region_map_data, dtype=int)
+            if region_map_data.shape != tuple(self.grid):
+                print('\nWarning: Some substrate_layout lines are ' +
+                      ' longer or shorter than the grid width, or there are more' +
+                      ' lines than the grid length. Check your layout file.' +
+                      'Check your layout file.')
+            self.__region_flag = True
+            self.region_map = region_map_data
 
         if 'SUBSTRATE_DIFFUSIVITY' in filedata_string.upper():
             lin_substrate = re.split('SUBSTRATE_DIFFUSIVITY',
@@ -610,7 +610,8 @@ class layout:
         ids = [x.id for x in self.models]
         return(ids)
 
-    def write_necessary_files(self, working_dir : str, to_append = ""):
+    def write_necessary_files(self, working_dir : str, to_append = "",
+                              model_files : list = None):
         """
         writes the layout and the model files to file
         
@@ -628,11 +629,16 @@ class layout:
             The directory where the files will be written.
         to_append : str, 
             String to append to written filenames
+        model_files : list(str), optional
+            paths, relative to working_dir, of model files written already,
+            one per model, e.g. by a cometspy.cache.model_store. If given,
+            the layout refers to them and no model files are written.
 
         """
         self.__check_if_initial_pops_in_range()
-        self.write_layout(working_dir, to_append)
-        self.write_model_files(working_dir)
+        self.write_layout(working_dir, to_append, model_files)
+        if model_files is None:
+            self.write_model_files(working_dir)
 
     def write_model_files(self, working_dir=""):
         '''writes each model file'''
@@ -861,7 +867,7 @@ class layout:
         if met not in self.all_exchanged_mets:
             raise Exception('met is not in the list of exchangeable mets')
         self.__local_media_flag = True
-        if location not in list(self.local_media.keys()):
+        if location not in self.local_media:
             self.local_media[location] = {}
         self.local_media[location][met] = amount
 
@@ -1025,7 +1031,8 @@ class layout:
                                        axis=0, sort=False)
         self.media = self.media.reset_index(drop=True)
 
-    def write_layout(self, working_dir : str, to_append = ""):
+    def write_layout(self, working_dir : str, to_append = "",
+                     model_files : list = None):
         """
         writes just the COMETS layout file to the supplied path
 
@@ -1033,6 +1040,11 @@ class layout:
         ----------
         working_dir : str
             the path to the directory where .current_layout will be written
+        to_append : str, optional
+            String to append to the filename
+        model_files : list(str), optional
+            paths of the model files, relative to working_dir, one per model.
+            Default is ./<model id>.cmd for each model
 
 
         """
@@ -1045,7 +1057,7 @@ class layout:
             os.remove(outfile)
 
         lyt = open(outfile, 'a')
-        self.__write_models_and_world_grid_chunk(lyt)
+        self.__write_models_and_world_grid_chunk(lyt, model_files)
         self.__write_media_chunk(lyt)
         self.__write_diffusion_chunk(lyt)
         self.__write_local_media_chunk(lyt)
@@ -1060,11 +1072,12 @@ class layout:
         self.__write_ext_rxns_chunk(lyt)
         lyt.close()
 
-    def __write_models_and_world_grid_chunk(self, lyt):
+    def __write_models_and_world_grid_chunk(self, lyt, model_files = None):
         """ writes the top 3 lines  to the open lyt file"""
 
-        model_file_line = "{}.cmd".format(".cmd ".join(self.get_model_ids())).split(" ")
-        model_file_line = "".join(["./" + _ + " " for _ in model_file_line])
+        if model_files is None:
+            model_files = ["./" + _ + ".cmd" for _ in self.get_model_ids()]
+        model_file_line = "".join([_ + " " for _ in model_files])
         model_file_line = "model_file " + model_file_line + "\n"
         lyt.write(model_file_line)
         lyt.write('  model_world\n')
@@ -1415,7 +1428,8 @@ class layout:
         """
         for m in self.models:
             for founder in m.initial_pop:
-                if (founder[0] < 0) or (founder[1] > (self.grid[1]-1)):
+                if not (0 <= founder[0] < self.grid[0] and
+                        0 <= founder[1] < self.grid[1]):
                     message = "the initial pop of a model is outside of layout.grid."
                     message += f" Either increase layout.grid or adjust {m.id}'s initial_pop"
                     raise ValueError(message)
@@ -1,9 +1,10 @@
 import pandas as pd
 import os
+import hashlib
 import numpy as np
-import re
+from scipy import sparse
 import cobra
-import io
+from cobra.util.solver import linear_reaction_coefficients
 
 
 class model:
@@ -34,8 +35,13 @@ class model:
             the name of the model. should be unique. 
         reactions : pandas.DataFrame
             DataFrame containing reaction information including boundaries. 
+        S : scipy.sparse.csr_matrix
+            the stoichiometric matrix, metabolites x reactions, in the order of
+            metabolites and reactions. This is how the matrix is stored
         smat : pandas.DataFrame
-            DataFrame containing the stoichiometric matrix
+            the stoichiometric matrix in long format, with columns metabolite,
+            rxn (both starting at 1) and s_coef. It is built from S when first
+            used, and changes to it, or assigning a new one, update S
         metabolites : pandas.DataFrame
             single-column DataFrame containing the names of the metabolites
         signals : pandas.Dataframe
@@ -77,9 +83,10 @@ class model:
                                                'LB', 'UB', 'EXCH',
                                                'EXCH_IND', 'V_MAX',
                                                'KM', 'HILL'])
-        self.smat = pd.DataFrame(columns=['metabolite',
-                                          'rxn',
-                                          's_coef'])
+        # the stoichiometric matrix, see the S and smat properties
+        self.__S = sparse.csr_matrix((0, 0))
+        self.__smat = None
+        self.__smat_digest = None  # of smat when it last matched S
         self.metabolites = pd.DataFrame(columns=['METABOLITE_NAMES'])
         self.signals = pd.DataFrame(columns=['REACTION_NUMBER',
                                              'EXCH_IND',
@@ -116,6 +123,131 @@ class model:
                 else:
                     self.read_cobra_model(model, randomtag)
 
+    @property
+    def S(self) -> sparse.csr_matrix:
+        """ the stoichiometric matrix, metabolites x reactions """
+        if self.__smat is not None:
+            # smat was handed out or assigned, and may have been changed
+            digest = self.__digest_smat()
+            if digest != self.__smat_digest:
+                self.__set_S(self.__smat['metabolite'].values,
+                             self.__smat['rxn'].values,
+                             self.__smat['s_coef'].values, keep_smat = True)
+                self.__smat_digest = digest
+        return(self.__S)
+
+    @property
+    def smat(self) -> pd.DataFrame:
+        """ the stoichiometric matrix in long format, sorted by metabolite
+        and rxn """
+        if self.__smat is None:
+            self.__smat = self.__smat_frame()
+            self.__smat_digest = self.__digest_smat()
+        return(self.__smat)
+
+    @smat.setter
+    def smat(self, smat : pd.DataFrame):
+        self.__smat = smat
+        self.__smat_digest = None
+
+    def __digest_smat(self) -> bytes:
+        """ a hash of the contents of smat, to tell whether it changed """
+        h = hashlib.blake2b(digest_size = 16)
+        h.update(str(len(self.__smat)).encode())
+        for column, dtype in [('metabolite', 'int64'), ('rxn', 'int64'),
+                              ('s_coef', 'float64')]:
+            h.update(np.ascontiguousarray(self.__smat[column].values,
+                                          dtype = dtype).tobytes())
+        return(h.digest())
+
+    def __smat_frame(self) -> pd.DataFrame:
+        """ builds the long format of S, without keeping it """
+        coo = self.S.tocoo()
+        return(pd.DataFrame({'metabolite': coo.row.astype('int64') + 1,
+                             'rxn': coo.col.astype('int64') + 1,
+                             's_coef': coo.data}))
+
+    def __set_S(self, metabolite, rxn, s_coef, keep_smat : bool = False):
+        """ sets S from 1-ordered (metabolite, rxn, s_coef) triplets.
+        Repeated pairs are summed """
+        metabolite = np.asarray(metabolite, dtype='int64') - 1
+        rxn = np.asarray(rxn, dtype='int64') - 1
+        shape = (max(len(self.metabolites),
+                     metabolite.max() + 1 if len(metabolite) > 0 else 0),
+                 max(len(self.reactions),
+                     rxn.max() + 1 if len(rxn) > 0 else 0))
+        S = sparse.csr_matrix((np.asarray(s_coef, dtype=float),
+                               (metabolite, rxn)), shape=shape)
+        S.sort_indices()
+        self.__S = S
+        if not keep_smat:
+            self.__smat = None
+            self.__smat_digest = None
+
+    def get_reaction_coefficients(self, reaction : str) -> pd.Series:
+        """ returns the stoichiometry of a reaction, i.e. its column of S
+
+            Parameters
+            ----------
+
+            reaction : str
+                name of the reaction
+
+            Returns
+            -------
+
+            pandas.Series
+                the coefficient of each metabolite of the reaction, indexed
+                by metabolite name
+
+            Example
+            -------
+
+            >>> model.get_reaction_coefficients("PGI")
+
+        """
+        j = self.__position(self.reactions['REACTION_NAMES'], reaction)
+        column = self.S.getcol(j).tocoo()
+        order = np.argsort(column.row)
+        return(pd.Series(column.data[order], name=reaction,
+                         index=self.metabolites['METABOLITE_NAMES'].values[
+                             column.row[order]]))
+
+    def get_metabolite_coefficients(self, metabolite : str) -> pd.Series:
+        """ returns the reactions of a metabolite, i.e. its row of S
+
+            Parameters
+            ----------
+
+            metabolite : str
+                name of the metabolite
+
+            Returns
+            -------
+
+            pandas.Series
+                the coefficient of the metabolite in each of its reactions,
+                indexed by reaction name
+
+            Example
+            -------
+
+            >>> model.get_metabolite_coefficients("glc__D_e")
+
+        """
+        i = self.__position(self.metabolites['METABOLITE_NAMES'], metabolite)
+        row = self.S.getrow(i)
+        return(pd.Series(row.data, name=metabolite,
+                         index=self.reactions['REACTION_NAMES'].values[
+                             row.indices]))
+
+    def __position(self, names : pd.Series, name : str) -> int:
+        """ the 0-ordered position of name in names """
+        position = np.flatnonzero(names.values == name)
+        if len(position) == 0:
+            raise ValueError(name + ' is not in the model')
+        return(int(position[0]))
+
     def get_reaction_names(self) -> list:
         """ returns a list of reaction names"""
         return(list(self.reactions['REACTION_NAMES']))
@@ -324,11 +456,10 @@ class model:
 
     def get_exchange_metabolites(self) -> list:
         """ returns a list of the names of the exchange metabolites """
-        exchmets = pd.merge(self.reactions.loc[self.reactions['EXCH'], 'ID'],
-                            self.smat,
-                            left_on='ID', right_on='rxn',
-                            how='inner')['metabolite']
-        exchmets = self.metabolites.iloc[exchmets-1]
+        exch = self.reactions.loc[self.reactions['EXCH'], 'ID'].values - 1
+        S = self.S.tocsc()[:, exch]
+        S.sort_indices()
+        exchmets = self.metabolites.iloc[S.indices]
         return(exchmets.METABOLITE_NAMES)
 
     def change_bounds(self, reaction : str, lower_bound : float, upper_bound : float):
@@ -483,44 +614,41 @@ class model:
 
         # reactions and their features
         reaction_list = curr_m.reactions
-        self.reactions['REACTION_NAMES'] = [str(x).split(':')[0] for
-                                            x in reaction_list]
-        self.reactions['ID'] = [k for k in
-                                range(1, len(reaction_list)+1)]
-        self.reactions['LB'] = [x.lower_bound for x in reaction_list]
-        self.reactions['UB'] = [x.upper_bound for x in reaction_list]
-
-        self.reactions['EXCH'] = [True if (len(k.metabolites) == 1) &
-                                  (list(k.metabolites.
-                                        values())[0] == (-1)) &
-                                  ('DM_' not in k.id)
-                                  else False for k in reaction_list]
-
-        exch = self.reactions.loc[self.reactions['EXCH'], 'ID'].tolist()
-        self.reactions['EXCH_IND'] = [exch.index(x)+1
-                                      if x in exch else 0
-                                      for x in self.reactions['ID']]
-
-        self.reactions['V_MAX'] = [k.Vmax
-                                   if hasattr(k, 'Vmax')
-                                   else float('NaN')
-                                   for k in reaction_list]
+        names = [x.id.split(':')[0] for x in reaction_list]
+        # the stoichiometry of each reaction, read once (cobra copies it)
+        stoich = [x.metabolites for x in reaction_list]
+        n_mets = np.array([len(k) for k in stoich], dtype=int)
+        coefs = np.fromiter((coef for k in stoich for coef in k.values()),
+                            dtype=float, count=n_mets.sum())
+        self.reactions = pd.DataFrame({
+            'REACTION_NAMES': names,
+            'ID': np.arange(1, len(reaction_list) + 1),
+            'LB': [x.lower_bound for x in reaction_list],
+            'UB': [x.upper_bound for x in reaction_list]},
+            columns=self.reactions.columns)
+
+        # exchanges have a single metabolite, with coefficient -1
+        first = np.minimum(np.cumsum(n_mets) - n_mets, max(len(coefs) - 1, 0))
+        first_coef = coefs[first] if len(coefs) > 0 else np.zeros(len(n_mets))
+        exch = ((n_mets == 1) & (first_coef == -1) &
+                np.array(['DM_' not in k for k in names], dtype=bool))
+        self.reactions['EXCH'] = exch
+        self.reactions['EXCH_IND'] = np.where(exch, np.cumsum(exch), 0)
+
+        self.reactions['V_MAX'] = np.array([getattr(k, 'Vmax', np.nan)
+                                            for k in reaction_list], dtype=float)
 
         if not self.reactions.V_MAX.isnull().all():
             self.vmax_flag = True
 
-        self.reactions['KM'] = [k.Km
-                                if hasattr(k, 'Km')
-                                else float('NaN')
-                                for k in reaction_list]
+        self.reactions['KM'] = np.array([getattr(k, 'Km', np.nan)
+                                         for k in reaction_list], dtype=float)
 
         if not self.reactions.KM.isnull().all():
             self.km_flag = True
 
-        self.reactions['HILL'] = [k.Hill
-                                  if hasattr(k, 'Hill')
-                                  else float('NaN')
-                                  for k in reaction_list]
+        self.reactions['HILL'] = np.array([getattr(k, 'Hill', np.nan)
+                                           for k in reaction_list], dtype=float)
 
         if not self.reactions.HILL.isnull().all():
             self.hill_flag = True
@@ -539,36 +667,23 @@ class model:
 
         # Metabolites
         metabolite_list = curr_m.metabolites
-        self.metabolites['METABOLITE_NAMES'] = [str(x) for
-                                                x in metabolite_list]
-
-        # S matrix
-        for index, row in self.reactions.iterrows():
-            rxn = curr_m.reactions.get_by_id(
-                row['REACTION_NAMES'])
-            rxn_num = row['ID']
-            rxn_mets = [1+list(self.metabolites[
-                'METABOLITE_NAMES']).index(
-                x.id) for x in rxn.metabolites]
-            met_s_coefs = list(rxn.metabolites.values())
-
-            cdf = pd.DataFrame({'metabolite': rxn_mets,
-                                'rxn': [rxn_num]*len(rxn_mets),
-                                's_coef': met_s_coefs})
-            cdf = cdf.sort_values('metabolite')
-            self.smat = pd.concat([self.smat, cdf])
-
-        self.smat = self.smat.sort_values(by=['metabolite', 'rxn'])
+        self.metabolites = pd.DataFrame({'METABOLITE_NAMES':
+                                         [x.id for x in metabolite_list]})
+
+        # S matrix, built at once from (metabolite, rxn, s_coef) triplets
+        met_index = {x.id: i for i, x in enumerate(metabolite_list, 1)}
+        mets = np.fromiter((met_index[met.id] for k in stoich for met in k),
+                           dtype=int, count=len(coefs))
+        self.__set_S(mets, np.repeat(self.reactions['ID'].values, n_mets), coefs)
 
         # The rest of stuff
         if hasattr(curr_m, 'default_bounds'):
             self.default_bounds = curr_m.default_bounds
 
-        obj = [str(x).split(':')[0]
-               for x in reaction_list
-               if x.objective_coefficient != 0][0]
-        self.objective = int(self.reactions[self.reactions.
-                                            REACTION_NAMES == obj]['ID'])
+        # reading objective_coefficient of each reaction asks the solver
+        objective = linear_reaction_coefficients(curr_m)
+        self.objective = [i for i, x in enumerate(reaction_list, 1)
+                          if objective.get(x, 0) != 0][0]
 
         if hasattr(curr_m, 'comets_optimizer'):
             self.optimizer = curr_m.comets_optimizer
@@ -601,224 +716,118 @@ class model:
         if randomtag:
             self.id = self.id + '_' + hex(id(self))
 
-        # in this way, its robust to empty lines:
-        m_f_lines = [s for s in _read_file(path).splitlines() if s]
-        m_filedata_string = os.linesep.join(m_f_lines)
-        ends = []
-        for k in range(0, len(m_f_lines)):
-            if '//' in m_f_lines[k]:
-                ends.append(k)
+        # one pass over the file, indexing every section by its keyword
+        sections = _read_sections(_read_file(path))
 
         # '''----------- S MATRIX ------------------------------'''
-        lin_smat = re.split('SMATRIX',
-                            m_filedata_string)[0].count('\n')
-        lin_smat_end = next(x for x in ends if x > lin_smat)
-
-        self.smat = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-            lin_smat:lin_smat_end])),
-                           delimiter=r'\s+',
-                           skipinitialspace=True)
-        self.smat.columns = ['metabolite', 'rxn', 's_coef']
+        smat = _numeric_block(sections['SMATRIX'][1], 3)
 
         # '''----------- REACTIONS AND BOUNDS-------------------'''
-        lin_rxns = re.split('REACTION_NAMES',
-                            m_filedata_string)[0].count('\n')
-        lin_rxns_end = next(x for x in
-                            ends if x > lin_rxns)
-
-        rxn = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-            lin_rxns:lin_rxns_end])),
-                          delimiter=r'\s+',
-                          skipinitialspace=True)
-
-        rxn['ID'] = range(1, len(rxn)+1)
-
-        lin_bnds = re.split('BOUNDS',
-                            m_filedata_string)[0].count('\n')
-        lin_bnds_end = next(x for x in ends if x > lin_bnds)
-
-        bnds = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-            lin_bnds:lin_bnds_end])),
-                           delimiter=r'\s+',
-                           skipinitialspace=True)
-
-        default_bounds = [float(bnds.columns[1]),
-                          float(bnds.columns[2])]
-
-        bnds.columns = ['ID', 'LB', 'UB']
-        reactions = pd.merge(rxn, bnds,
-                             left_on='ID', right_on='ID',
-                             how='left')
-        reactions.LB.fillna(default_bounds[0], inplace=True)
-        reactions.UB.fillna(default_bounds[1], inplace=True)
+        rxn_names = [s.strip() for s in sections['REACTION_NAMES'][1]]
+        n_rxns = len(rxn_names)
+        reactions = pd.DataFrame({'REACTION_NAMES': rxn_names,
+                                  'ID': np.arange(1, n_rxns + 1)})
+
+        header, lines = sections['BOUNDS']
+        self.default_bounds = [_number(header[1]), _number(header[2])]
+        bnds = _numeric_block(lines, 3)
+        lb = np.full(n_rxns, self.default_bounds[0], dtype=float)
+        ub = np.full(n_rxns, self.default_bounds[1], dtype=float)
+        ids = bnds[:, 0].astype(int) - 1
+        lb[ids] = bnds[:, 1]
+        ub[ids] = bnds[:, 2]
+        reactions['LB'] = lb
+        reactions['UB'] = ub
 
         # '''----------- METABOLITES ---------------------------'''
-        lin_mets = re.split('METABOLITE_NAMES',
-                            m_filedata_string)[0].count('\n')
-        lin_mets_end = next(x for x in ends if x > lin_mets)
-
-        metabolites = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-            lin_mets:lin_mets_end])),
-                                  delimiter=r'\s+',
-                                  skipinitialspace=True)
+        metabolites = pd.DataFrame({'METABOLITE_NAMES': [
+            s.strip() for s in sections['METABOLITE_NAMES'][1]]})
 
         # '''----------- EXCHANGE RXNS -------------------------'''
-        lin_exch = re.split('EXCHANGE_REACTIONS',
-                            m_filedata_string)[0].count('\n')+1
-        exch = [int(k) for k in re.findall(r'\S+',
-                                           m_f_lines[lin_exch].
-                                           strip())]
-
-        reactions['EXCH'] = [True if x in exch else False
-                             for x in reactions['ID']]
-        reactions['EXCH_IND'] = [exch.index(x)+1
-                                 if x in exch else 0
-                                 for x in reactions['ID']]
-
-        # '''----------- VMAX VALUES --------------------------'''
-        if 'VMAX_VALUES' in m_filedata_string:
-            self.vmax_flag = True
-            lin_vmax = re.split('VMAX_VALUES',
-                                m_filedata_string)[0].count('\n')
-            lin_vmax_end = next(x for x in ends if x > lin_vmax)
-
-            Vmax = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-                lin_vmax:lin_vmax_end])),
-                               delimiter=r'\s+',
-                               skipinitialspace=True)
-
-            Vmax.columns = ['EXCH_IND', 'V_MAX']
-
-            reactions = pd.merge(reactions, Vmax,
-                                 left_on='EXCH_IND',
-                                 right_on='EXCH_IND',
-                                 how='left')
-            self.default_vmax = float(m_f_lines[lin_vmax-1].split()[1])
-        else:
-            reactions['V_MAX'] = np.NaN
-
-        # '''----------- VMAX VALUES --------------------------'''
-        if 'KM_VALUES' in m_filedata_string:
-            self.km_flag = True
-            lin_km = re.split('KM_VALUES',
-                              m_filedata_string)[0].count('\n')
-            lin_km_end = next(x for x in ends if x > lin_km)
-
-            Km = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-                lin_km:lin_km_end])),
-                             delimiter=r'\s+',
-                             skipinitialspace=True)
-            Km.columns = ['EXCH_IND', 'KM']
-
-            reactions = pd.merge(reactions, Km,
-                                 left_on='EXCH_IND',
-                                 right_on='EXCH_IND',
-                                 how='left')
-            self.default_km = float(m_f_lines[lin_km-1].split()[1])
-        else:
-            reactions['KM'] = np.NaN
-
-        # '''----------- VMAX VALUES --------------------------'''
-        if 'HILL_COEFFICIENTS' in m_filedata_string:
-            self.hill_flag = True
-            lin_hill = re.split('HILL_COEFFICIENTS',
-                                m_filedata_string)[0].count('\n')
-            lin_hill_end = next(x for x in ends if x > lin_hill)
-
-            Hill = pd.read_csv(io.StringIO('\n'.join(m_f_lines[
-                lin_hill:lin_hill_end])),
-                               delimiter=r'\s+',
-                               skipinitialspace=True)
-            Hill.columns = ['EXCH_IND', 'HILL']
-
-            reactions = pd.merge(reactions, Hill,
-                                 left_on='EXCH_IND',
-                                 right_on='EXCH_IND',
-                                 how='left')
-            self.default_hill = float(m_f_lines[lin_hill-1].split()[1])
-        else:
-            reactions['HILL'] = np.NaN
+        exch = _numeric_block(sections['EXCHANGE_REACTIONS'][1], 1)
+        exch = exch[:, 0].astype(int)
+        exch_ind = np.zeros(n_rxns, dtype=int)
+        # the first position of each exchange reaction wins
+        exch_ind[exch[::-1] - 1] = np.arange(len(exch), 0, -1)
+        reactions['EXCH'] = exch_ind > 0
+        reactions['EXCH_IND'] = exch_ind
+
+        # '''----------- VMAX, KM AND HILL VALUES -------------'''
+        # HILL_VALUES is what write_comets_model writes
+        for column, keys, flag, default in [
+                ('V_MAX', ['VMAX_VALUES'], 'vmax_flag', 'default_vmax'),
+                ('KM', ['KM_VALUES'], 'km_flag', 'default_km'),
+                ('HILL', ['HILL_COEFFICIENTS', 'HILL_VALUES'],
+                 'hill_flag', 'default_hill')]:
+            key = next((k for k in keys if k in sections), None)
+            if key is None:
+                reactions[column] = np.NaN
+                continue
+            header, lines = sections[key]
+            values = _numeric_block(lines, 2)
+            reactions[column] = reactions['EXCH_IND'].map(
+                dict(zip(values[:, 0].astype(int), values[:, 1])))
+            setattr(self, flag, True)
+            if len(header) > 1:
+                setattr(self, default, _number(header[1]))
 
         # '''----------- OBJECTIVE -----------------------------'''
-        lin_obj = re.split('OBJECTIVE',
-                           m_filedata_string)[0].count('\n')+1
-        self.objective = int(m_f_lines[lin_obj].strip())
+        self.objective = int(sections['OBJECTIVE'][1][0].split()[0])
 
         # '''----------- OBJECTIVE STYLE -----------------------'''
-        if 'OBJECTIVE_STYLE' in m_filedata_string:
-            lin_obj_st = re.split('OBJECTIVE_STYLE',
-                                  m_filedata_string)[0].count(
-                                      '\n')+1
-            self.obj_style = m_f_lines[lin_obj_st].strip()
+        if 'OBJECTIVE_STYLE' in sections:
+            self.obj_style = sections['OBJECTIVE_STYLE'][1][0].strip()
 
         # '''----------- OPTIMIZER -----------------------------'''
-        if 'OPTIMIZER' in m_filedata_string:
-            lin_opt = re.split('OPTIMIZER',
-                               m_filedata_string)[0].count('\n')
-            self.optimizer = m_f_lines[lin_opt].split()[1]
+        if 'OPTIMIZER' in sections:
+            self.optimizer = sections['OPTIMIZER'][0][1]
 
         # '''--------------neutral drift------------------------'''
-        if "neutralDrift" in m_filedata_string:
-            lin_obj_st = re.split('neutralDrift',
-                                  m_filedata_string)[0].count(
-                                      '\n')
-            if "TRUE" == m_f_lines[lin_obj_st].strip().split()[1].upper():
+        if 'neutralDrift' in sections:
+            if "TRUE" == sections['neutralDrift'][0][1].upper():
                 self.neutral_drift_flag = True
                 self.neutralDriftSigma = 0.
-        if "neutralDriftsigma" in m_filedata_string:
-            lin_opt = re.split('neutralDriftsigma',
-                               m_filedata_string)[0].count('\n')
-            self.neutralDriftSigma = float(m_f_lines[lin_opt].split()[1])
+        # write_comets_model writes neutralDriftSigma
+        for key in ['neutralDriftsigma', 'neutralDriftSigma']:
+            if key in sections:
+                self.neutralDriftSigma = float(sections[key][0][1])
 
         # '''--------------convection---------------------------'''
         for parm in ['packedDensity', 'elasticModulus',
                      'frictionConstant', 'convDiffConstant']:
-            if parm in m_filedata_string:
-                lin_obj_st = re.split(parm,
-                                      m_filedata_string)[0].count(
-                                          '\n')
-                parm_value = float(m_f_lines[lin_obj_st].strip().split()[1])
-                try:
-                    self.convection_parameters[parm] = parm_value
-                except:  # TODO change bare except statements to ifelse
+            if parm in sections:
+                parm_value = float(sections[parm][0][1])
+                if not self.convection_flag:
                     self.convection_flag = True
                     self.convection_parameters = {'packedDensity': 1.,
                                                   'elasticModulus': 1.,
                                                   'frictionConstant': 1.,
                                                   'convDiffConstant': 1.}
-                    self.convection_parameters[parm] = parm_value
+                self.convection_parameters[parm] = parm_value
 
         # '''--------------non-linear diffusion---------------------------'''
         for parm in ['convNonLinDiffZero', 'convNonlinDiffN', 'convNonlinDiffExponent',
                      'convNonlinDiffHillN', 'convNonlinDiffHillK']:
-            if parm in m_filedata_string:
-                lin_obj_st = re.split(parm,
-                                      m_filedata_string)[0].count(
-                                          '\n')
-                parm_value = float(m_f_lines[lin_obj_st].strip().split()[1])
-                try:
-                    self.nonlinear_diffusion_parameters[parm] = parm_value
-                except:  # TODO change bare except statements to ifelse
+            if parm in sections:
+                parm_value = float(sections[parm][0][1])
+                if not self.nonlinear_diffusion_flag:
                     self.nonlinear_diffusion_flag = True
                     self.nonlinear_diffusion_parameters = {'convNonLinDiffZero': 1.,
                                                            'convNonlinDiffN': 1.,
                                                            'convNonlinDiffExponent': 1.,
                                                            'convNonlinDiffHillN': 10.,
                                                            'convNonlinDiffHillK': .9}
-                    self.nonlinear_diffusion_parameters[parm] = parm_value
-                    
-        # '''-----------noise variance-----------------'''
-        if 'noiseVariance' in m_filedata_string:
-            lin_obj_st = re.split('noiseVariance',
-                                  m_filedata_string)[0].count(
-                                      '\n')
-            noiseVariance = float(m_f_lines[lin_obj_st].strip().split()[1])
+                self.nonlinear_diffusion_parameters[parm] = parm_value
 
+        # '''-----------noise variance-----------------'''
+        if 'noiseVariance' in sections:
             self.noise_variance_flag = True
-            self.noise_variance = noiseVariance
+            self.noise_variance = float(sections['noiseVariance'][0][1])
         # assign the dataframes we just built
         self.reactions = reactions
         self.metabolites = metabolites
+        self.__set_S(smat[:, 0].astype(int), smat[:, 1].astype(int),
+                     smat[:, 2])
 
     def delete_comets_model(self, working_dir = None):
         """ deletes a file version of this model if it exists.
@@ -836,7 +845,45 @@ class model:
         path_to_delete = path_to_delete + self.id + '.cmd'
         os.remove(path_to_delete)
         
-    def write_comets_model(self, working_dir : str = None):
+    def get_content_hash(self) -> str:
+        """ returns a hash of everything write_comets_model writes
+
+            Two models with the same hash have the same model file, so it
+            identifies the file without writing it. It is computed from S,
+            the reactions, metabolites and signals tables and the other
+            attributes of the model file, and changes whenever one of them
+            does.
+
+            Example
+            -------
+
+            >>> same = model.get_content_hash() == other.get_content_hash()
+
+        """
+        h = hashlib.sha256()
+        S = self.S
+        for array in [S.shape, S.indptr, S.indices]:
+            h.update(np.asarray(array, dtype='int64').tobytes())
+        h.update(np.asarray(S.data, dtype='float64').tobytes())
+        for table in [self.reactions, self.metabolites]:
+            h.update(repr(list(table.columns)).encode())
+            h.update(pd.util.hash_pandas_object(table, index=False).values.tobytes())
+        h.update(repr([self.signals.values.tolist(), self.light,
+                       self.default_bounds, self.objective, self.obj_style,
+                       self.optimizer, self.vmax_flag, self.default_vmax,
+                       self.km_flag, self.default_km, self.hill_flag,
+                       self.default_hill, self.light_flag,
+                       self.convection_flag,
+                       getattr(self, 'convection_parameters', None),
+                       self.nonlinear_diffusion_flag,
+                       getattr(self, 'nonlinear_diffusion_parameters', None),
+                       self.noise_variance_flag,
+                       getattr(self, 'noise_variance', None),
+                       self.neutral_drift_flag,
+                       getattr(self, 'neutralDriftSigma', None)]).encode())
+        return(h.hexdigest())
+
+    def write_comets_model(self, working_dir : str = None, buffer = None):
         """ writes the COMETS model object to a file 
             
             This writes the current model object in COMETS format to file, either
@@ -849,162 +896,177 @@ class model:
             ----------
             working_dir : str, optional
                 a directory path to put COMETS files.  for example "./data_files/"
+            buffer : file-like, optional
+                an open text buffer, e.g. io.StringIO(), to write the model to
+                instead of a file. working_dir is then ignored
+                
+            Example
+            -------
+            
+            >>> import io
+            >>> buffer = io.StringIO()
+            >>> model.write_comets_model(buffer = buffer)
+            >>> text = buffer.getvalue()
                 
         """
+        reactions = self.reactions
+        parts = []
+
+        parts.append('SMATRIX  ' + str(len(self.metabolites)) +
+                     '  ' + str(len(reactions)) + '\n')
+        parts.append(_format_rows(self.__smat_frame()))
+        parts.append('//\n')
+
+        parts.append('BOUNDS ' +
+                     str(self.default_bounds[0]) + ' ' +
+                     str(self.default_bounds[1]) + '\n')
+        parts.append(_format_rows(reactions.loc[
+            (reactions['LB'] != self.default_bounds[0]) |
+            (reactions['UB'] != self.default_bounds[1]),
+            ['ID', 'LB', 'UB']]))
+        parts.append('//\n')
+
+        parts.append('OBJECTIVE\n' +
+                     '    ' + str(self.objective) + '\n')
+        parts.append('//\n')
+
+        parts.append('METABOLITE_NAMES\n')
+        parts.append(_format_rows(self.metabolites[['METABOLITE_NAMES']]))
+        parts.append('//\n')
+
+        parts.append('REACTION_NAMES\n')
+        parts.append(_format_rows(reactions[['REACTION_NAMES']]))
+        parts.append('//\n')
+
+        parts.append('EXCHANGE_REACTIONS\n')
+        parts.append(' ' + ' '.join(reactions.loc[reactions.EXCH, 'ID'].astype(str)) +
+                     '\n')
+        parts.append('//\n')
+
+        # optional fields (vmax,km, hill)
+        for flag, keyword, default, column in [
+                (self.vmax_flag, 'VMAX_VALUES', self.default_vmax, 'V_MAX'),
+                (self.km_flag, 'KM_VALUES', self.default_km, 'KM'),
+                (self.hill_flag, 'HILL_VALUES', self.default_hill, 'HILL')]:
+            if flag:
+                parts.append(keyword + ' ' + str(default) + '\n')
+                parts.append(_format_rows(reactions.loc[
+                    reactions[column].notnull(), ['EXCH_IND', column]]))
+                parts.append('//\n')
+
+        if self.light_flag:
+            parts.append('LIGHT\n')
+            for lrxn in self.light:
+                lrxn_ind = reactions['ID'].iloc[self.__position(
+                    reactions['REACTION_NAMES'], lrxn[0])]
+                parts.append('    {} {} {}\n'.format(lrxn_ind,
+                                                     lrxn[1], lrxn[2]))
+            parts.append('//\n')
+
+        if self.signals.size > 0:
+            parts.append('MET_REACTION_SIGNAL\n')
+            for rxn_num, exch_ind, bound, function, parms in zip(
+                    self.signals['REACTION_NUMBER'], self.signals['EXCH_IND'],
+                    self.signals['BOUND'], self.signals['FUNCTION'],
+                    self.signals['PARAMETERS']):
+                if rxn_num != 'death':
+                    rxn_num = str(int(rxn_num))
+                parts.append(' '.join(str(x) for x in [rxn_num, exch_ind, bound,
+                                                       function] + list(parms)) +
+                             '\n')
+            parts.append('//\n')
+
+        if self.convection_flag:
+            for key, value in self.convection_parameters.items():
+                parts.append(key + ' ' + str(value) + '\n')
+                parts.append('//\n')
+
+        if self.nonlinear_diffusion_flag:
+            for key, value in self.nonlinear_diffusion_parameters.items():
+                parts.append(key + ' ' + str(value) + '\n')
+                parts.append('//\n')
+
+        if self.noise_variance_flag:
+            parts.append('noiseVariance' + ' ' +
+                         str(self.noise_variance) + '\n')
+            parts.append('//\n')
+
+        if self.neutral_drift_flag:
+            parts.append("neutralDrift true\n//\n")
+            parts.append("neutralDriftSigma " + str(self.neutralDriftSigma) + "\n//\n")
+
+        parts.append('OBJECTIVE_STYLE\n' + self.obj_style + '\n')
+        parts.append('//\n')
+
+        parts.append('OPTIMIZER ' + self.optimizer + '\n')
+        parts.append('//\n')
+
+        if buffer is not None:
+            buffer.write(''.join(parts))
+            return
         path_to_write = ""
         if working_dir is not None:
             path_to_write = working_dir
         path_to_write = path_to_write + self.id + '.cmd'
+        with open(path_to_write, 'w') as f:
+            f.write(''.join(parts))
 
-        # format variables for writing comets model
-        bnd = self.reactions.loc[(self.reactions['LB']
-                                  != self.default_bounds[0]) |
-                                 (self.reactions['UB'] !=
-                                  self.default_bounds[1]),
-                                 ['ID', 'LB', 'UB']].astype(
-                                     str).apply(lambda x: '   '.join(x),
-                                                axis=1)
-        bnd = '    ' + bnd.astype(str)
-
-        rxn_n = '    ' + self.reactions['REACTION_NAMES'].astype(str)
-
-        met_n = '    ' + self.metabolites.astype(str)
 
-        smat = self.smat.astype(str).apply(lambda x:
-                                           '   '.join(x), axis=1)
-        smat = '    ' + smat.astype(str)
+def _format_rows(frame : pd.DataFrame) -> str:
+    """ helper function to format the rows of a table as lines of a COMETS
+    model file, i.e. four spaces and the values separated by three spaces.
+    """
+    if len(frame) == 0:
+        return ''
+    lines = '    ' + frame.iloc[:, 0].astype(str)
+    for column in range(1, frame.shape[1]):
+        lines = lines + '   ' + frame.iloc[:, column].astype(str)
+    return '\n'.join(lines) + '\n'
+
+
+def _read_sections(text : str) -> dict:
+    """ helper function to split the text of a COMETS model file into its
+    sections, in one pass.
+
+    A section starts with a line whose first word is its keyword, e.g.
+    SMATRIX or OPTIMIZER, and ends with a // line. Returns
+    {keyword: (words of the first line, [following lines])}, with the
+    first section of each keyword.
+    """
+    sections = {}
+    header = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == '':
+            continue
+        if stripped.startswith('//'):
+            header = None
+        elif header is None:
+            header = stripped.split()
+            lines = []
+            sections.setdefault(header[0], (header, lines))
+        else:
+            lines.append(line)
+    return sections
 
-        exch_r = ' '.join([str(x) for x in
-                           self.reactions.loc[self.reactions.EXCH, 'ID']])
 
-        # optional fields (vmax,km, hill)
-        if self.vmax_flag:
-            Vmax = self.reactions.loc[self.reactions['V_MAX'].notnull(),
-                                      ['EXCH_IND', 'V_MAX']]
-            Vmax = Vmax.astype(str).apply(lambda x:
-                                          '   '.join(x), axis=1)
-            Vmax = '    ' + Vmax.astype(str)
+def _numeric_block(lines : list, n_columns : int) -> np.ndarray:
+    """ helper function to convert the lines of a numeric section to a
+    float array with n_columns columns, at once.
+    """
+    return np.array(' '.join(lines).split(),
+                    dtype=float).reshape(-1, n_columns)
 
-        if self.km_flag:
-            Km = self.reactions.loc[self.reactions['KM'].notnull(),
-                                    ['EXCH_IND', 'KM']]
-            Km = Km.astype(str).apply(lambda x:
-                                      '   '.join(x), axis=1)
-            Km = '    ' + Km.astype(str)
 
-        if self.hill_flag:
-            Hill = self.reactions.loc[self.reactions['HILL'].notnull(),
-                                      ['EXCH_IND', 'HILL']]
-            Hill = Hill.astype(str).apply(lambda x:
-                                          '   '.join(x), axis=1)
-            Hill = '    ' + Hill.astype(str)
-
-        if os.path.isfile(path_to_write):
-            os.remove(path_to_write)
-
-        with open(path_to_write, 'a') as f:
-
-            f.write('SMATRIX  ' + str(len(self.metabolites)) +
-                    '  ' + str(len(self.reactions)) + '\n')
-            smat.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-            f.write(r'//' + '\n')
-
-            f.write('BOUNDS ' +
-                    str(self.default_bounds[0]) + ' ' +
-                    str(self.default_bounds[1]) + '\n')
-            bnd.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-            f.write(r'//' + '\n')
-
-            f.write('OBJECTIVE\n' +
-                    '    ' + str(self.objective) + '\n')
-            f.write(r'//' + '\n')
-
-            f.write('METABOLITE_NAMES\n')
-            met_n.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-            f.write(r'//' + '\n')
-
-            f.write('REACTION_NAMES\n')
-            rxn_n.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-            f.write(r'//' + '\n')
-
-            f.write('EXCHANGE_REACTIONS\n')
-            f.write(' ' + exch_r + '\n')
-            f.write(r'//' + '\n')
-
-            if self.vmax_flag:
-                f.write('VMAX_VALUES ' +
-                        str(self.default_vmax) + '\n')
-                Vmax.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-                f.write(r'//' + '\n')
-
-            if self.km_flag:
-                f.write('KM_VALUES ' +
-                        str(self.default_km) + '\n')
-                Km.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-                f.write(r'//' + '\n')
-
-            if self.hill_flag:
-                f.write('HILL_VALUES ' +
-                        str(self.default_hill) + '\n')
-                Hill.to_csv(f, mode='a', line_terminator = '\n', header=False, index=False)
-                f.write(r'//' + '\n')
-
-            if self.light_flag:
-                f.write('LIGHT\n')
-                for lrxn in self.light:
-                    lrxn_ind = str(int(self.reactions.ID[
-                        self.reactions['REACTION_NAMES'] == lrxn[0]]))
-                    f.write('    {} {} {}\n'.format(lrxn_ind,
-                                                    lrxn[1], lrxn[2]))
-                f.write(r'//' + '\n')
-
-            if self.signals.size > 0:
-                f.write('MET_REACTION_SIGNAL\n')
-                sub_signals = self.signals.drop(['REACTION_NAMES', 'EXCH'],
-                                                axis='columns')
-                col_names = list(self.signals.drop(['REACTION_NAMES',
-                                                    'EXCH', 'PARAMETERS'],
-                                                   axis='columns').columns)
-                for idx in sub_signals.index:
-                    row = sub_signals.drop(['PARAMETERS'], axis='columns').iloc[idx, :]
-                    n_parms = len(sub_signals.PARAMETERS[idx])
-                    curr_col_names = col_names + [str(i) for i in range(n_parms)]
-                    temp_df = pd.DataFrame(columns=curr_col_names)
-                    if row.loc['REACTION_NUMBER'] != 'death':
-                        row.loc['REACTION_NUMBER'] = str(int(row.loc['REACTION_NUMBER']))
-                    temp_df.loc[0, 'REACTION_NUMBER'] = row.loc['REACTION_NUMBER']
-                    temp_df.loc[0, 'EXCH_IND'] = row.loc['EXCH_IND']
-                    temp_df.loc[0, 'BOUND'] = row.loc['BOUND']
-                    temp_df.loc[0, 'FUNCTION'] = row.loc['FUNCTION']
-                    for i in range(n_parms):
-                        temp_df.loc[0, str(i)] = sub_signals.PARAMETERS[idx][i]
-                    temp_df.to_csv(f, mode='a', line_terminator = '\n', sep=' ', header=False, index=False)
-                f.write(r'//' + '\n')
-
-            if self.convection_flag:
-                for key, value in self.convection_parameters.items():
-                    f.write(key + ' ' + str(value) + '\n')
-                    f.write(r'//' + '\n')
-
-            if self.nonlinear_diffusion_flag:
-                for key, value in self.nonlinear_diffusion_parameters.items():
-                    f.write(key + ' ' + str(value) + '\n')
-                    f.write(r'//' + '\n')
-
-            if self.noise_variance_flag:
-                f.write('noiseVariance' + ' ' +
-                        str(self.noise_variance) + '\n')
-                f.write(r'//' + '\n')
-
-            if self.neutral_drift_flag:
-                f.write("neutralDrift true\n//\n")
-                f.write("neutralDriftSigma " + str(self.neutralDriftSigma) + "\n//\n")
-
-            f.write('OBJECTIVE_STYLE\n' + self.obj_style + '\n')
-            f.write(r'//' + '\n')
-
-            f.write('OPTIMIZER ' + self.optimizer + '\n')
-            f.write(r'//' + '\n')
+def _number(token : str):
+    """ helper function to read a number of a section header. Numbers
+    written as ints are read as ints, so that they are written back the same
+    way.
+    """
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
 
 
 def _read_file(filename: str) -> str:
@@ -0,0 +1,289 @@
+'''
+The parsers module reads the logs written by COMETS into pandas DataFrames
+and numpy arrays.
+
+COMETS writes numbers using the decimal separator of the system locale, so on
+some systems they look like 0,001 instead of 0.001. Each reader here first
+looks at a few lines of its log to find out which separator is used, and then
+parses the whole log exactly once with pandas' C engine and explicit dtypes.
+
+Every reader accepts either a path or an open text buffer (e.g. io.StringIO)
+holding lines of the log.
+'''
+
+import io
+import re
+import itertools
+import numpy as np
+import pandas as pd
+
+# a number written with a decimal comma, e.g. 0,25 or -1,5E-4
+_COMMA_NUMBER = re.compile(r'^[-+]?\d*,\d+(?:[eE][-+]?\d+)?$')
+
+
+def _head(source, n_lines : int) -> list:
+    """ returns the first n_lines lines of source, leaving a buffer rewound """
+    lines = []
+    if hasattr(source, 'readline'):
+        start = source.tell()
+        for i in range(n_lines):
+            line = source.readline()
+            if line == '':
+                break
+            lines.append(line)
+        source.seek(start)
+    else:
+        with open(source, 'r') as f:
+            for i in range(n_lines):
+                line = f.readline()
+                if line == '':
+                    break
+                lines.append(line)
+    return(lines)
+
+
+def sniff_decimal(source, n_lines : int = 5, skip : int = 0) -> str:
+    """
+    returns the decimal separator ('.' or ',') used in a COMETS log
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+    n_lines : int, optional
+        the number of lines to look at. Default is 5.
+    skip : int, optional
+        the number of header lines at the top of the log. Default is 0.
+    """
+    for line in _head(source, n_lines + skip)[skip:]:
+        if any(_COMMA_NUMBER.match(token) for token in line.split()):
+            return(',')
+    return('.')
+
+
+def read_total_biomass(source, model_ids : list) -> pd.DataFrame:
+    """
+    reads a total biomass log
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+    model_ids : list(str)
+        ids of the models in the simulation, in layout order
+
+    Returns
+    -------
+
+    pandas.DataFrame
+        with columns cycle and one column per model id
+    """
+    columns = ['cycle'] + list(model_ids)
+    dtypes = {col: 'float64' for col in model_ids}
+    dtypes['cycle'] = 'int64'
+    return(pd.read_csv(source, sep=r'\s+', header=None, names=columns,
+                       dtype=dtypes, decimal=sniff_decimal(source),
+                       engine='c'))
+
+
+def read_media(source, chunksize : int = None) -> pd.DataFrame:
+    """
+    reads a spatial media log
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+    chunksize : int, optional
+        if given, an iterator over DataFrames of up to chunksize rows is
+        returned instead, so that the log is never in memory as a whole
+
+    Returns
+    -------
+
+    pandas.DataFrame
+        with columns metabolite, cycle, x, y and conc_mmol
+    """
+    return(pd.read_csv(source, sep=r'\s+', header=None,
+                       names=['metabolite', 'cycle', 'x', 'y', 'conc_mmol'],
+                       dtype={'metabolite': 'object', 'cycle': 'int64',
+                              'x': 'int64', 'y': 'int64',
+                              'conc_mmol': 'float64'},
+                       decimal=sniff_decimal(source), engine='c',
+                       chunksize=chunksize))
+
+
+def read_biomass(source, chunksize : int = None) -> pd.DataFrame:
+    """
+    reads a spatial biomass log
+
+    The '.cmd' extension COMETS adds to model names is removed, so that the
+    species column holds model ids.
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+    chunksize : int, optional
+        if given, an iterator over DataFrames of up to chunksize rows is
+        returned instead, so that the log is never in memory as a whole
+
+    Returns
+    -------
+
+    pandas.DataFrame
+        with columns cycle, x, y, species and biomass
+    """
+    biomass = pd.read_csv(source, sep=r'\s+', header=None,
+                          names=['cycle', 'x', 'y', 'species', 'biomass'],
+                          dtype={'cycle': 'int64', 'x': 'int64', 'y': 'int64',
+                                 'species': 'object', 'biomass': 'float64'},
+                          decimal=sniff_decimal(source), engine='c',
+                          chunksize=chunksize)
+    if chunksize is not None:
+        return(_strip_model_extension(chunk) for chunk in biomass)
+    return(_strip_model_extension(biomass))
+
+
+def _strip_model_extension(biomass : pd.DataFrame) -> pd.DataFrame:
+    """ removes '.cmd' from the species column of a biomass log """
+    # cut off extension added by toolbox, once per distinct species
+    species = {sp: sp[:-4] if '.cmd' in sp else sp
+               for sp in pd.unique(biomass['species'])}
+    biomass['species'] = biomass['species'].map(species)
+    return(biomass)
+
+
+def iter_flux_chunks(source, n_reactions : list,
+                     chunk_lines : int = 10000):
+    """
+    reads a flux log in chunks, split by model
+
+    Rows of a flux log belong to different models, with different numbers of
+    reactions. Each chunk of up to chunk_lines lines is routed by its model
+    number column, and the lines of each model are then parsed in bulk into
+    an array sized to that model's reactions. The model number column
+    itself is dropped.
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+    n_reactions : list(int)
+        the number of reactions of each model, in layout order
+    chunk_lines : int, optional
+        the maximum number of lines held in memory at once. Default is 10000.
+
+    Yields
+    ------
+
+    dict{int : numpy.array}
+        for each model number (starting at 1), a float array whose columns
+        are cycle, x, y and then one per reaction
+    """
+    decimal = sniff_decimal(source)
+    f = source if hasattr(source, 'readline') else open(source, 'r')
+    try:
+        while True:
+            lines = list(itertools.islice(f, chunk_lines))
+            if len(lines) == 0:
+                break
+            if len(n_reactions) == 1:
+                groups = {1: lines}
+            else:
+                groups = {i + 1: [] for i in range(len(n_reactions))}
+                for line in lines:
+                    parts = line.split(None, 4)
+                    if len(parts) > 3:
+                        groups[int(parts[3])].append(line)
+            chunk = {}
+            for model_num, group in groups.items():
+                n_cols = 4 + n_reactions[model_num - 1]
+                if len(group) == 0:
+                    chunk[model_num] = np.empty((0, n_cols - 1))
+                    continue
+                values = pd.read_csv(io.StringIO(''.join(group)), sep=r'\s+',
+                                     header=None, names=range(n_cols),
+                                     dtype='float64', decimal=decimal,
+                                     engine='c').values
+                chunk[model_num] = np.delete(values, 3, axis=1)
+            yield(chunk)
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_fluxes_by_species(source, n_reactions : list) -> dict:
+    """
+    reads a flux log into one array per model
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+    n_reactions : list(int)
+        the number of reactions of each model, in layout order
+
+    Returns
+    -------
+
+    dict{int : numpy.array}
+        for each model number (starting at 1), a float array whose columns
+        are cycle, x, y and then one per reaction. See iter_flux_chunks.
+    """
+    parts = {i + 1: [np.empty((0, 3 + n))] for i, n in enumerate(n_reactions)}
+    for chunk in iter_flux_chunks(source, n_reactions):
+        for model_num, values in chunk.items():
+            parts[model_num].append(values)
+    return({model_num: np.concatenate(values)
+            for model_num, values in parts.items()})
+
+
+def read_specific_media(source) -> pd.DataFrame:
+    """
+    reads a specific media log, whose first line names its columns
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+
+    Returns
+    -------
+
+    pandas.DataFrame
+        with columns cycle, x, y and one column per logged metabolite
+    """
+    columns = _head(source, 1)[0].split()
+    dtypes = {col: 'float64' for col in columns[3:]}
+    dtypes.update({col: 'int64' for col in columns[:3]})
+    return(pd.read_csv(source, sep=r'\s+', header=0, dtype=dtypes,
+                       decimal=sniff_decimal(source, skip=1), engine='c'))
+
+
+def read_genotypes(source) -> pd.DataFrame:
+    """
+    reads the genotypes log of an evolution simulation
+
+    Parameters
+    ----------
+
+    source : str or text buffer
+        path to the log, or a buffer holding its lines
+
+    Returns
+    -------
+
+    pandas.DataFrame
+        with columns Ancestor, Mutation and Species
+    """
+    return(pd.read_csv(source, sep=r'\s+', header=None,
+                       names=['Ancestor', 'Mutation', 'Species'],
+                       dtype='object', engine='c'))
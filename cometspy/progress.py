@@ -0,0 +1,219 @@
+'''
+The progress module follows the std_out of a running COMETS simulation.
+
+When params showCycleCount is True (the default), COMETS prints a line such
+as "Cycle 10" at the start of every cycle, and when showCycleTime is True it
+also prints how long each cycle took. A progress_tracker is fed these lines
+as they are printed (see comets.run(progress = ...)), and from them estimates
+how fast the simulation goes, when it will finish, and whether it stalled.
+'''
+
+import re
+import time
+import collections
+import pandas as pd
+
+# the line COMETS prints at the start of every cycle
+_CYCLE = re.compile(r'^\s*Cycle\s+(\d+)\s*$')
+# the line COMETS prints with the duration of a cycle, in ms unless noted
+_CYCLE_TIME = re.compile(r'cycle\s*time\D*?(\d+(?:[.,]\d+)?(?:[eE][-+]?\d+)?)'
+                         r'\s*(ms|s|sec|seconds)?\b', re.IGNORECASE)
+
+
+def parse_cycle_line(line : str):
+    """
+    reads one line of COMETS std_out
+
+    Parameters
+    ----------
+
+    line : str
+        a line printed by COMETS
+
+    Returns
+    -------
+
+    tuple (str, float) or None
+        ('cycle', number) for the start of a cycle, ('cycle_time', seconds)
+        for the duration of a cycle, or None for any other line
+    """
+    match = _CYCLE.match(line)
+    if match is not None:
+        return(('cycle', int(match.group(1))))
+    match = _CYCLE_TIME.search(line)
+    if match is not None:
+        seconds = float(match.group(1).replace(',', '.'))
+        if match.group(2) is None or match.group(2).lower() == 'ms':
+            seconds = seconds / 1000.
+        return(('cycle_time', seconds))
+    return(None)
+
+
+def parse_cycle_times(run_output : str) -> pd.DataFrame:
+    """
+    reads the duration of every cycle from the std_out of COMETS
+
+    This needs params showCycleTime to have been True. Each duration is
+    assigned to the cycle printed last before it.
+
+    Parameters
+    ----------
+
+    run_output : str
+        everything COMETS printed, e.g. comets.run_output
+
+    Returns
+    -------
+
+    pandas.DataFrame
+        with columns cycle and cycle_time (in seconds)
+    """
+    cycles, times = [], []
+    cycle = 0
+    for line in run_output.splitlines():
+        parsed = parse_cycle_line(line)
+        if parsed is None:
+            continue
+        if parsed[0] == 'cycle':
+            cycle = parsed[1]
+        else:
+            cycles.append(cycle)
+            times.append(parsed[1])
+    return(pd.DataFrame({'cycle': pd.Series(cycles, dtype='int64'),
+                         'cycle_time': pd.Series(times, dtype='float64')}))
+
+
+class progress_tracker:
+    """
+    follows the progress of a running COMETS simulation
+
+    A comets object creates a progress_tracker for each run, available as
+    comets.progress, and feeds it every line COMETS prints. Its attributes
+    can be polled from another thread at any time, or a function can be
+    given to comets.run(progress = ...) to be called with the tracker
+    whenever a new cycle starts or the simulation stalls.
+
+    Parameters
+    ----------
+
+    max_cycles : int
+        the number of cycles the simulation will run, i.e. params maxCycles
+    window : int, optional
+        the number of recent cycles over which the rate is measured.
+        Default is 20.
+
+    Attributes
+    ----------
+
+    max_cycles : int
+        the number of cycles the simulation will run
+    cycle : int
+        the cycle the simulation is at, 0 before the first one
+    cycle_time : float
+        seconds the last cycle took, if COMETS prints it (showCycleTime)
+    stalled : bool
+        True if no cycle started during the last stall_after seconds
+    stall_after : float
+        seconds without a new cycle after which the run counts as stalled.
+        Default is 60.
+    updates : int
+        the number of cycles seen so far, which grows on each new cycle
+
+    Examples
+    --------
+
+    >>> def report(progress):
+    >>>     if progress.stalled:
+    >>>         print("stalled at cycle", progress.cycle)
+    >>>     else:
+    >>>         print(progress)
+    >>> sim.run(progress = report)
+    >>> # or, from another thread while sim.run() is running
+    >>> print(sim.progress.cycles_per_second, sim.progress.eta)
+
+    """
+    stall_after = 60.
+
+    def __init__(self, max_cycles : int, window : int = 20):
+        self.max_cycles = max_cycles
+        self.cycle = 0
+        self.cycle_time = None
+        self.stalled = False
+        self.updates = 0
+        self.started = time.monotonic()
+        self.last_cycle_at = self.started
+        self.__recent = collections.deque(maxlen=window)
+
+    def __repr__(self) -> str:
+        rate = self.cycles_per_second
+        eta = self.eta
+        return(f"cycle {self.cycle}/{self.max_cycles} "
+               f"({100. * self.fraction_done:.0f}%), {rate:.3g} cycles/s, "
+               f"ETA {'?' if eta is None else f'{eta:.0f} s'}" +
+               (", stalled" if self.stalled else ""))
+
+    def feed(self, line : str) -> bool:
+        """
+        reads one line of COMETS std_out. returns True if a cycle started
+
+        Parameters
+        ----------
+
+        line : str
+            a line printed by COMETS
+        """
+        parsed = parse_cycle_line(line)
+        if parsed is None:
+            return(False)
+        kind, value = parsed
+        if kind == 'cycle_time':
+            self.cycle_time = value
+            return(False)
+        now = time.monotonic()
+        self.cycle = value
+        self.last_cycle_at = now
+        self.stalled = False
+        self.__recent.append((now, value))
+        self.updates += 1
+        return(True)
+
+    def check_stall(self) -> bool:
+        """ returns True if the simulation has just become stalled, i.e. no
+        cycle started for stall_after seconds """
+        if self.stalled:
+            return(False)
+        if time.monotonic() - self.last_cycle_at > self.stall_after:
+            self.stalled = True
+            return(True)
+        return(False)
+
+    @property
+    def elapsed(self) -> float:
+        """ seconds since the simulation started """
+        return(time.monotonic() - self.started)
+
+    @property
+    def fraction_done(self) -> float:
+        """ the fraction of max_cycles done so far """
+        if self.max_cycles <= 0:
+            return(1.)
+        return(min(1., self.cycle / self.max_cycles))
+
+    @property
+    def cycles_per_second(self) -> float:
+        """ the recent speed of the simulation, over the last window cycles """
+        if len(self.__recent) >= 2:
+            (t0, c0), (t1, c1) = self.__recent[0], self.__recent[-1]
+            if t1 > t0:
+                return((c1 - c0) / (t1 - t0))
+        if self.cycle > 0 and self.elapsed > 0:
+            return(self.cycle / self.elapsed)
+        return(0.)
+
+    @property
+    def eta(self) -> float:
+        """ the estimated seconds until the last cycle, or None if unknown """
+        rate = self.cycles_per_second
+        if rate <= 0:
+            return(None)
+        return(max(0, self.max_cycles - self.cycle) / rate)
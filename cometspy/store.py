@@ -0,0 +1,392 @@
+'''
+The store module keeps COMETS logs and results on disk.
+
+Spatial media, biomass and flux logs of long runs on large grids can be larger
+than memory. When comets.run() is given stream_to, each of these logs is read
+in bounded chunks, and every chunk is appended to a dataset on disk instead of
+being collected into one DataFrame. The comets object then holds a log_dataset,
+a lazy handle which loads only the cycles and columns asked for.
+
+A dataset is a directory with a meta.json naming its columns and their dtypes,
+and one uncompressed .npz file per cycle and chunk, named
+cycle_<cycle>_<part>.npz, holding one array per column.
+
+Finished simulations can also be saved with comets.save_results() and opened
+again with load_results(). Their tables are stored column by column as .npy
+files, which are memory-mapped when loaded, so that reading one column of
+many saved simulations only touches the bytes of that column.
+'''
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+class log_dataset:
+    """
+    a lazy handle on a COMETS log stored on disk, partitioned by cycle
+
+    Nothing is read when the handle is created, apart from the names of the
+    partition files. DataFrames are only built by read() and iter_cycles(),
+    from the requested cycles and columns.
+
+    Parameters
+    ----------
+
+    directory : str
+        the directory of the dataset, as written by comets.run(stream_to = ...)
+
+    Attributes
+    ----------
+
+    directory : str
+        the directory of the dataset
+    columns : list(str)
+        the columns of the log
+    dtypes : dict{str : str}
+        the dtype of each column
+
+    Examples
+    --------
+
+    >>> sim.run(stream_to = "./big_run/")
+    >>> sim.media # a log_dataset, nothing loaded yet
+    >>> last = sim.media.read(cycles = [sim.media.cycles[-1]])
+    >>> for cycle, frame in sim.media.iter_cycles(columns = ["conc_mmol"]):
+    >>>     print(cycle, frame.conc_mmol.sum())
+
+    """
+    def __init__(self, directory : str):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        self.columns = meta['columns']
+        self.dtypes = meta['dtypes']
+        self.__parts = {}
+        for name in sorted(os.listdir(directory)):
+            if name.startswith('cycle_') and name.endswith('.npz'):
+                cycle = int(name.split('_')[1])
+                self.__parts.setdefault(cycle, []).append(name)
+
+    def __repr__(self) -> str:
+        return("log_dataset('" + self.directory + "', " +
+               str(len(self.__parts)) + " cycles, columns " +
+               str(self.columns) + ")")
+
+    @property
+    def cycles(self) -> list:
+        """ the logged cycles, in increasing order """
+        return(sorted(self.__parts))
+
+    def read(self, cycles : list = None, columns : list = None) -> pd.DataFrame:
+        """
+        loads part of the log into a DataFrame
+
+        Parameters
+        ----------
+
+        cycles : list(int), optional
+            the cycles to load. Default is every logged cycle
+        columns : list(str), optional
+            the columns to load. Default is every column
+
+        Returns
+        -------
+
+        pandas.DataFrame
+            the rows of the requested cycles, in increasing cycle order
+        """
+        if cycles is None:
+            cycles = self.cycles
+        frames = [frame for cycle in sorted(set(cycles))
+                  for frame in self.__read_cycle(cycle, columns)]
+        if len(frames) == 0:
+            return(self.__empty(columns))
+        return(pd.concat(frames, ignore_index=True))
+
+    def iter_cycles(self, columns : list = None):
+        """
+        loads the log one cycle at a time
+
+        Parameters
+        ----------
+
+        columns : list(str), optional
+            the columns to load. Default is every column
+
+        Yields
+        ------
+
+        tuple (int, pandas.DataFrame)
+            a cycle and its rows
+        """
+        for cycle in self.cycles:
+            yield((cycle, self.read([cycle], columns)))
+
+    def __read_cycle(self, cycle : int, columns : list) -> list:
+        """ returns a DataFrame per partition file of cycle """
+        if columns is None:
+            columns = self.columns
+        frames = []
+        for name in self.__parts.get(cycle, []):
+            with np.load(os.path.join(self.directory, name)) as data:
+                frames.append(pd.DataFrame({col: self.__column(data[col], col)
+                                            for col in columns}))
+        return(frames)
+
+    def __column(self, values : np.array, col : str) -> np.array:
+        """ turns stored text columns back into python strings """
+        if self.dtypes[col] == 'object':
+            return(values.astype(object))
+        return(values)
+
+    def __empty(self, columns : list) -> pd.DataFrame:
+        """ an empty DataFrame with the dtypes of the log """
+        if columns is None:
+            columns = self.columns
+        return(pd.DataFrame({col: pd.Series(dtype=self.dtypes[col])
+                             for col in columns}))
+
+
+class _dataset_writer:
+    """ appends DataFrames to a log_dataset directory, one file per cycle
+    and chunk. Existing partitions in directory are removed first. close()
+    writes meta.json and returns the log_dataset. """
+    def __init__(self, directory : str, columns : list):
+        self.directory = directory
+        self.columns = list(columns)
+        self.dtypes = None
+        self.n_parts = {}
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.startswith('cycle_') and name.endswith('.npz'):
+                os.remove(os.path.join(directory, name))
+
+    def append(self, frame : pd.DataFrame):
+        if len(frame) == 0:
+            return
+        if self.dtypes is None:
+            self.dtypes = {col: str(frame[col].dtype) for col in self.columns}
+        values = {col: frame[col].values for col in self.columns}
+        for col in self.columns:
+            if self.dtypes[col] == 'object':
+                values[col] = values[col].astype(str)
+        # logs are written cycle by cycle, so each cycle is a run of rows
+        cycles = values['cycle']
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(cycles)) + 1])
+        ends = np.concatenate([starts[1:], [len(cycles)]])
+        for start, end in zip(starts, ends):
+            cycle = int(cycles[start])
+            part = self.n_parts.get(cycle, 0)
+            self.n_parts[cycle] = part + 1
+            name = 'cycle_%010d_%06d.npz' % (cycle, part)
+            np.savez(os.path.join(self.directory, name),
+                     **{col: values[col][start:end] for col in self.columns})
+
+    def close(self) -> log_dataset:
+        dtypes = self.dtypes
+        if dtypes is None:  # nothing was logged
+            dtypes = {col: 'float64' for col in self.columns}
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump({'columns': self.columns, 'dtypes': dtypes}, f)
+        return(log_dataset(self.directory))
+
+
+class stored_results:
+    """
+    the results of a finished simulation, as saved by comets.save_results
+
+    The saved tables are total_biomass, biomass, media, specific_media,
+    genotypes, cycle_times and fluxes_by_species, whichever the simulation produced. They
+    are available under the same attribute names as on a comets object, and
+    are only read from disk when first used. Text columns, such as
+    media.metabolite, come back as pandas Categoricals.
+
+    Float columns are stored contiguously, one after another, so column()
+    can return a single one of them as a memory-mapped view without
+    reading the rest of the table. This is the fastest way to pick the same
+    values out of many saved simulations.
+
+    Parameters
+    ----------
+
+    path : str
+        the directory given to comets.save_results
+    mmap : bool, optional
+        whether to memory-map the stored arrays instead of reading them into
+        memory. Default is True.
+
+    Attributes
+    ----------
+
+    path : str
+        the directory of the saved results
+    tables : list(str)
+        the names of the saved tables. Per-species fluxes are named
+        'fluxes_by_species/<model_id>'
+
+    Examples
+    --------
+
+    >>> import cometspy as c
+    >>> res = c.load_results("./run_0042/")
+    >>> res.total_biomass.plot(x = "cycle")
+    >>> conc = res.column("media", "conc_mmol") # memory-mapped
+    >>> glucose = conc[res.column("media", "metabolite") == "glc__D_e"]
+
+    """
+    def __init__(self, path : str, mmap : bool = True):
+        self.path = path
+        self.mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.__tables = json.load(f)['tables']
+        self.tables = list(self.__tables)
+        self.__frames = {}
+
+    def __repr__(self) -> str:
+        return("stored_results('" + self.path + "', tables " +
+               str(self.tables) + ")")
+
+    def __getattr__(self, name : str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name == 'fluxes_by_species':
+            prefix = 'fluxes_by_species/'
+            model_ids = [t[len(prefix):] for t in self.tables
+                         if t.startswith(prefix)]
+            if len(model_ids) > 0:
+                return({model_id: self.__frame(prefix + model_id)
+                        for model_id in model_ids})
+        elif name in self.tables:
+            return(self.__frame(name))
+        raise AttributeError("'stored_results' object has no attribute '" +
+                             name + "'")
+
+    def __frame(self, table : str) -> pd.DataFrame:
+        """ the whole table, read once and then kept """
+        if table not in self.__frames:
+            self.__frames[table] = self.read(table)
+        return(self.__frames[table])
+
+    def __load(self, table : str, name : str) -> np.array:
+        return(np.load(os.path.join(self.path, table, name),
+                       mmap_mode=self.mmap_mode))
+
+    def read(self, table : str, columns : list = None) -> pd.DataFrame:
+        """
+        returns some or all columns of a saved table as a DataFrame
+
+        Parameters
+        ----------
+
+        table : str
+            one of tables, e.g. 'media' or 'fluxes_by_species/iJO1366'
+        columns : list(str), optional
+            the columns to read. Default is every column
+        """
+        names = self.__tables[table]['columns']
+        if columns is None:
+            positions = range(len(names))
+        else:
+            positions = [names.index(col) for col in columns]
+        frame = pd.DataFrame({i: self.__column_at(table, position)
+                              for i, position in enumerate(positions)},
+                             columns=range(len(positions)))
+        frame.columns = [names[position] for position in positions]
+        return(frame)
+
+    def column(self, table : str, column : str):
+        """
+        returns one column of a saved table, without reading the others
+
+        Numeric columns are returned as (memory-mapped) numpy arrays, and
+        text columns as pandas Categoricals.
+
+        Parameters
+        ----------
+
+        table : str
+            one of tables, e.g. 'media' or 'fluxes_by_species/iJO1366'
+        column : str
+            the name of the column
+        """
+        return(self.__column_at(table,
+                                self.__tables[table]['columns'].index(column)))
+
+    def __column_at(self, table : str, position : int):
+        """ the column at position of a saved table, see column() """
+        info = self.__tables[table]
+        if position in info['values']:
+            return(self.__load(table, 'values.npy')[:, info['values'].index(position)])
+        values = self.__load(table, 'col_' + str(position) + '.npy')
+        if str(position) in info['categories']:
+            return(pd.Categorical.from_codes(values,
+                                             info['categories'][str(position)]))
+        return(values)
+
+
+def _write_tables(path : str, tables : dict):
+    """ writes DataFrames to path, in the layout read by stored_results.
+    Each table gets a directory, in which its float64 columns are stored
+    together as one column-major values.npy, and every other column as
+    col_<position>.npy. Text columns are stored as integer codes, with the
+    distinct strings kept in meta.json, which is written last. Columns are
+    found by position, so labels need not be unique strings; meta.json
+    keeps them as names. """
+    meta = {}
+    for table, frame in tables.items():
+        table_dir = os.path.join(path, table)
+        os.makedirs(table_dir, exist_ok=True)
+        columns = [str(col) for col in frame.columns]
+        values = [position for position, dtype in enumerate(frame.dtypes)
+                  if dtype == 'float64']
+        categories = {}
+        np.save(os.path.join(table_dir, 'values.npy'),
+                np.asfortranarray(frame.iloc[:, values].to_numpy(dtype='float64')))
+        for position in range(len(columns)):
+            if position in values:
+                continue
+            column = frame.iloc[:, position]
+            if column.dtype == 'object' or str(column.dtype) == 'category':
+                codes, uniques = pd.factorize(column)
+                categories[str(position)] = [str(u) for u in uniques]
+                column = codes.astype('int32')
+            np.save(os.path.join(table_dir, 'col_' + str(position) + '.npy'),
+                    np.asarray(column))
+        meta[table] = {'columns': columns, 'values': values,
+                       'categories': categories}
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'tables': meta}, f)
+
+
+def load_results(path : str, mmap : bool = True) -> stored_results:
+    """
+    opens the results of a simulation saved with comets.save_results
+
+    Parameters
+    ----------
+
+    path : str
+        the directory given to comets.save_results
+    mmap : bool, optional
+        whether to memory-map the stored arrays instead of reading them into
+        memory. Default is True.
+
+    Returns
+    -------
+
+    cometspy.store.stored_results
+        with the saved tables as attributes, e.g. total_biomass or media
+
+    Examples
+    --------
+
+    >>> import cometspy as c
+    >>> sim.run()
+    >>> sim.save_results("./run_0042/")
+    >>> res = c.load_results("./run_0042/")
+    >>> res.media.head()
+
+    """
+    return(stored_results(path, mmap))
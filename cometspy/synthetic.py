@@ -0,0 +1,265 @@
+'''
+The synthetic module is a stand-in for the COMETS java program.
+
+It reads the script, params, layout and model files that comets.run() writes,
+and writes the same logs COMETS would, in the same formats, with made-up but
+deterministic values: every founder of the initial_pop grows logistically in
+its grid cell, using up the media there. Nothing is simulated, so this is only
+useful to exercise cometspy itself, e.g. to test or benchmark the writing,
+parsing and orchestration of simulations on machines without java, COMETS or
+Gurobi.
+
+The size of the logs follows from the layout and params, as with COMETS: the
+grid, the initial_pop, the number of metabolites and reactions, maxCycles and
+the log rates.
+
+Select it for a comets object with comets(layout, params, engine =
+"synthetic"), or for every comets object by setting the environment variable
+COMETSPY_ENGINE=synthetic. Two more environment variables change its output:
+
+    COMETSPY_SYNTHETIC_DECIMAL : the decimal separator, '.' (default) or ','
+        as written by COMETS on systems with such a locale
+    COMETSPY_SYNTHETIC_DELAY : seconds to wait after every cycle, to mimic
+        the pace of a real simulation. Default is 0
+
+It is run as a script, e.g. python synthetic.py -script .current_script, and
+only uses the python standard library.
+'''
+
+import os
+import sys
+import math
+import time
+import decimal
+
+
+def _java_double(value : float) -> str:
+    """ formats a float as java's Double.toString does """
+    value = float(value)
+    if value == 0:
+        return('0.0')
+    if 1e-3 <= abs(value) < 1e7:
+        return(repr(value))
+    sign, digits, exponent = decimal.Decimal(repr(value)).as_tuple()
+    digits = ''.join(str(d) for d in digits)
+    exponent = exponent + len(digits) - 1
+    digits = digits.rstrip('0') or '0'
+    return(('-' if sign else '') + digits[0] + '.' + (digits[1:] or '0') +
+           'E' + str(exponent))
+
+
+def _read_params(path : str) -> dict:
+    """ reads a params file written by params.write_params """
+    values = {}
+    with open(path) as f:
+        for line in f:
+            if ' = ' in line:
+                key, value = line.split(' = ', 1)
+                values[key.strip()] = value.strip()
+    return(values)
+
+
+def _read_layout(path : str) -> dict:
+    """ reads the parts of a layout file the logs depend on """
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    layout = {'model_files': lines[0].split()[1:], 'media': [],
+              'local_media': {}, 'initial_pop': []}
+    block = None
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) == 0:
+            continue
+        if parts[0] == 'grid_size':
+            layout['grid'] = [int(x) for x in parts[1:3]]
+        elif parts[0] in ('world_media', 'media', 'initial_pop'):
+            block = parts[0]
+        elif parts[0] == '//':
+            block = None
+        elif block == 'world_media':
+            layout['media'].append((parts[0], float(parts[1])))
+        elif block == 'media':
+            layout['local_media'][(int(parts[0]), int(parts[1]))] = [
+                float(x) for x in parts[2:]]
+        elif block == 'initial_pop':
+            layout['initial_pop'].append((int(parts[0]), int(parts[1]),
+                                          [float(x) for x in parts[2:]]))
+        elif len(parts) > 1 and parts[1] in ('world_media', 'media',
+                                             'initial_pop'):
+            block = parts[1]
+    return(layout)
+
+
+def _n_reactions(path : str) -> int:
+    """ the number of reactions of a model file, from its SMATRIX line """
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[0] == 'SMATRIX':
+                return(int(parts[2]))
+    return(0)
+
+
+class _world:
+    """ the made-up state of the simulation at any cycle """
+    def __init__(self, layout : dict, params : dict, n_reactions : list):
+        self.grid = layout['grid']
+        self.mets = [met for met, amount in layout['media']]
+        self.time_step = float(params.get('timeStep', 0.1))
+        self.n_reactions = n_reactions
+        n_models = len(layout['model_files'])
+        # founders, as {(x, y): [biomass of each model]}
+        self.founders = {}
+        for x, y, biomass in layout['initial_pop']:
+            cell = self.founders.setdefault((x, y), [0.] * n_models)
+            for j, b in enumerate(biomass[:n_models]):
+                cell[j] += b
+        self.rates = [1. - 0.5 * j / max(1, n_models) for j in range(n_models)]
+        self.world_media = [amount for met, amount in layout['media']]
+        self.local_media = layout['local_media']
+
+    def biomass(self, cycle : int) -> dict:
+        """ {(x, y): [biomass of each model]} of the occupied cells """
+        hours = cycle * self.time_step
+        state = {}
+        for cell, founders in self.founders.items():
+            values = []
+            for b0, rate in zip(founders, self.rates):
+                if b0 <= 0:
+                    values.append(0.)
+                    continue
+                capacity = max(1e-3, 2 * b0)
+                values.append(capacity * b0 /
+                              (b0 + (capacity - b0) * math.exp(-rate * hours)))
+            state[cell] = values
+        return(state)
+
+    def media(self, cycle : int, biomass : dict) -> dict:
+        """ {(x, y): [amount of each metabolite]} of every cell """
+        state = {}
+        for x in range(self.grid[0]):
+            for y in range(self.grid[1]):
+                amounts = self.local_media.get((x, y), self.world_media)
+                grown = 0.
+                if (x, y) in biomass:
+                    grown = sum(biomass[(x, y)]) - sum(self.founders[(x, y)])
+                state[(x, y)] = [a / (1. + 100. * max(0., grown))
+                                 for a in amounts]
+        return(state)
+
+    def fluxes(self, cell : tuple, model : int, biomass : float) -> list:
+        """ the flux of each reaction of model in an occupied cell """
+        capacity = max(1e-3, 2 * self.founders[cell][model])
+        growth = self.rates[model] * max(0., 1. - biomass / capacity)
+        return([growth * ((k % 7) - 3) for k in range(self.n_reactions[model])])
+
+
+def run(script : str):
+    """ writes the logs of the simulation described by a COMETS script """
+    directory = os.path.dirname(script) or '.'
+    files = {}
+    with open(script) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2:
+                files[parts[0]] = os.path.join(directory, parts[1])
+    params = _read_params(files['load_comets_parameters'])
+    params.update(_read_params(files['load_package_parameters']))
+    layout = _read_layout(files['load_layout'])
+    model_files = [os.path.join(directory, m) for m in layout['model_files']]
+    names = [os.path.basename(m) for m in model_files]
+    world = _world(layout, params, [_n_reactions(m) for m in model_files])
+
+    dec = os.environ.get('COMETSPY_SYNTHETIC_DECIMAL', '.')
+    delay = float(os.environ.get('COMETSPY_SYNTHETIC_DELAY', '0'))
+    if dec == '.':
+        num = _java_double
+    else:
+        num = lambda value: _java_double(value).replace('.', dec)
+
+    def flag(name):
+        return(params.get(name) == 'true')
+
+    def log(name, rate):
+        """ the open log file and its rate, or None if not written """
+        if not flag('write' + name):
+            return(None)
+        return((open(os.path.join(directory, params[name + 'Name']), 'w'),
+                int(params[rate])))
+
+    logs = {'total': log('TotalBiomassLog', 'totalBiomassLogRate'),
+            'biomass': log('BiomassLog', 'BiomassLogRate'),
+            'media': log('MediaLog', 'MediaLogRate'),
+            'flux': log('FluxLog', 'FluxLogRate'),
+            'specific': log('SpecificMediaLog', 'specificMediaLogRate')}
+    specific = [m for m in params.get('specificMedia', '').split(',') if m != '']
+    if logs['specific'] is not None:
+        logs['specific'][0].write('cycle x y ' + ' '.join(specific) + '\n')
+    specific = [world.mets.index(m) if m in world.mets else None
+                for m in specific]
+
+    def due(name, cycle):
+        return(logs[name] is not None and cycle % logs[name][1] == 0)
+
+    try:
+        for cycle in range(int(params['maxCycles']) + 1):
+            start = time.monotonic()
+            if cycle > 0 and params.get('showCycleCount', 'true') == 'true':
+                print('Cycle ' + str(cycle), flush = True)
+            biomass = world.biomass(cycle)
+            if due('total', cycle):
+                totals = [sum(cell[j] for cell in biomass.values())
+                          for j in range(len(names))]
+                logs['total'][0].write('\t'.join([str(cycle)] +
+                                                 [num(t) for t in totals]) + '\n')
+            if cycle > 0:
+                cells = sorted(biomass)
+                if due('biomass', cycle):
+                    logs['biomass'][0].write(''.join(
+                        '%d %d %d %s %s\n' % (cycle, x + 1, y + 1, name, num(b))
+                        for x, y in cells
+                        for name, b in zip(names, biomass[(x, y)]) if b > 0))
+                if due('flux', cycle):
+                    logs['flux'][0].write(''.join(
+                        '%d %d %d %d %s\n' % (cycle, x + 1, y + 1, j + 1,
+                                              ' '.join(num(v) for v in world.fluxes(
+                                                  (x, y), j, biomass[(x, y)][j])))
+                        for x, y in cells
+                        for j in range(len(names)) if biomass[(x, y)][j] > 0))
+                if due('media', cycle) or due('specific', cycle):
+                    media = world.media(cycle, biomass)
+                    if due('media', cycle):
+                        logs['media'][0].write(''.join(
+                            '%s %d %d %d %s\n' % (met, cycle, x + 1, y + 1, num(a))
+                            for (x, y), amounts in sorted(media.items())
+                            for met, a in zip(world.mets, amounts) if a != 0))
+                    if due('specific', cycle):
+                        logs['specific'][0].write(''.join(
+                            '%d %d %d %s\n' % (cycle, x + 1, y + 1, ' '.join(
+                                num(0. if i is None else amounts[i])
+                                for i in specific))
+                            for (x, y), amounts in sorted(media.items())))
+                for handle in logs.values():
+                    if handle is not None:
+                        handle[0].flush()
+                time.sleep(delay)
+                if flag('showCycleTime'):
+                    print('Cycle time: ' + num(1000. * (time.monotonic() - start)) +
+                          ' ms', flush = True)
+    finally:
+        for handle in logs.values():
+            if handle is not None:
+                handle[0].close()
+    if flag('evolution'):
+        with open(os.path.join(directory, 'GENOTYPES_' +
+                               params['BiomassLogName']), 'w') as f:
+            for name in names:
+                f.write(name[:-4] + ' none ' + name[:-4] + '\n')
+    print('End of simulation', flush = True)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if '-script' not in args:
+        sys.exit('usage: python synthetic.py -script <COMETS script>')
+    run(args[args.index('-script') + 1])
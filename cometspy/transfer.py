@@ -0,0 +1,267 @@
+'''
+The transfer module runs serial-transfer experiments as a chain of COMETS
+simulations.
+
+COMETS itself can only dilute a batch culture by a fixed factor at fixed
+times (params batchDilution, dilFactor and dilTime). Here each growth period
+between two transfers is a separate COMETS run. Between runs, the final
+biomass and media are turned back into a layout (see comets.to_layout), and a
+python transfer function changes it in any way, e.g. by diluting it, replacing
+the media or inoculating species again. The next run starts from the result.
+
+The model files are written before the first run, and again only if a transfer
+function changed a model in a way its file holds (e.g. its bounds). Biomass is
+in the layout, which is written again for every run along with the params. The
+logs of each run are appended to one time series, after which the run itself
+is discarded.
+'''
+
+import copy
+import os
+import pandas as pd
+
+from cometspy.comets import comets
+
+
+def dilute(factor : float):
+    """
+    returns a transfer function which dilutes biomass and media
+
+    Parameters
+    ----------
+
+    factor : float
+        the fraction of biomass and media carried over, e.g. 0.01 for a 1:100
+        dilution. Static metabolites are left as they are
+
+    Examples
+    --------
+
+    >>> from cometspy.transfer import serial_transfer, dilute
+    >>> experiment = serial_transfer(layout, params, 10, dilute(0.01))
+
+    """
+    def transfer(layout, index : int):
+        for m in layout.models:
+            m.initial_pop = [[x, y, biomass * factor]
+                             for x, y, biomass in m.initial_pop]
+        static = layout.media['g_static'] == 1
+        layout.media.loc[~static, 'init_amount'] = (
+            layout.media.loc[~static, 'init_amount'] * factor)
+        static = set(layout.media.loc[static, 'metabolite'])
+        for amounts in layout.local_media.values():
+            for met in amounts:
+                if met not in static:
+                    amounts[met] = amounts[met] * factor
+        layout.update_models()
+    return(transfer)
+
+
+def replace_media(media : dict):
+    """
+    returns a transfer function which sets metabolites to fresh amounts
+
+    Parameters
+    ----------
+
+    media : dict{str : float}
+        the amount, in mmol per grid cell, of each metabolite to set
+
+    Examples
+    --------
+
+    >>> fresh = replace_media({"glc__D_e": 0.01, "nh4_e": 1000.})
+    >>> experiment = serial_transfer(layout, params, 10, [dilute(0.01), fresh])
+
+    """
+    def transfer(layout, index : int):
+        for met, amount in media.items():
+            layout.set_specific_metabolite(met, amount)
+            if met not in layout.all_exchanged_mets:
+                continue  # never in local media
+            for amounts in layout.local_media.values():
+                amounts[met] = amount
+    return(transfer)
+
+
+def reinoculate(model_id : str, biomass : float, location : tuple = (0, 0)):
+    """
+    returns a transfer function which adds biomass of a model
+
+    Parameters
+    ----------
+
+    model_id : str
+        the id of a model in the layout
+    biomass : float
+        the biomass to add, in gDW
+    location : tuple, optional
+        the 0-ordered grid cell to add it to. Default is (0, 0)
+
+    Examples
+    --------
+
+    >>> experiment = serial_transfer(layout, params, 10,
+    >>>                              [dilute(0.01), reinoculate("iJO1366", 1e-6)])
+
+    """
+    def transfer(layout, index : int):
+        models = [m for m in layout.models if m.id == model_id]
+        if len(models) == 0:
+            raise ValueError(model_id + " is not a model in the layout")
+        models[0].initial_pop.append([location[0], location[1], biomass])
+        layout.update_models()
+    return(transfer)
+
+
+class serial_transfer:
+    """
+    a serial-transfer experiment, run as one COMETS simulation per transfer
+
+    Every run lasts params maxCycles cycles. After each run but the last,
+    the final state is turned into a layout with comets.to_layout, passed
+    to the transfer function(s), and used to start the next run. The
+    biomass and media logs are therefore always written, and maxCycles
+    must be a multiple of BiomassLogRate and MediaLogRate.
+
+    Parameters
+    ----------
+
+    layout : cometspy.layout
+        the layout of the first run
+    parameters : cometspy.params
+        the params of every run. They are copied, not changed
+    n_transfers : int
+        the number of runs
+    transfer : function or list(function), optional
+        called as transfer(layout, index) before run number index (starting
+        at 1), to change the layout in place. A list of them is called in
+        order. It may change anything in the layout, including its models,
+        e.g. their bounds or kinetics. See dilute, replace_media and
+        reinoculate. Default is None, which continues each run unchanged
+    relative_dir : str, optional
+        a directory to place temporary simulation files.
+    engine : str, optional
+        the engine of every run, see comets. Default is None
+
+    Attributes
+    ----------
+
+    total_biomass, biomass, media, specific_media : pandas.DataFrame
+        generated objects with the logs of all runs, with a transfer column
+        (starting at 0) and cycles counted from the start of the first run.
+        Cycle 0 of each run, which follows the transfer, keeps its own row.
+        If a run or transfer fails, they hold the runs finished before
+    fluxes_by_species : dict{model_id : pandas.DataFrame}
+        generated object with each species' fluxes over all runs, as above
+    run_outputs : list(str)
+        generated object with the std_out of COMETS for each run
+    sim : cometspy.comets
+        generated object with the last run
+
+    Examples
+    --------
+
+    >>> from cometspy.transfer import serial_transfer, dilute, replace_media
+    >>> params.set_param("maxCycles", 240)
+    >>> experiment = serial_transfer(layout, params, 20,
+    >>>                              [dilute(0.01),
+    >>>                               replace_media({"glc__D_e": 0.01})])
+    >>> experiment.run()
+    >>> experiment.total_biomass.plot(x = "cycle")
+
+    """
+    def __init__(self, layout, parameters, n_transfers : int,
+                 transfer = None, relative_dir : str = '',
+                 engine : str = None):
+        self.layout = layout
+        self.parameters = copy.deepcopy(parameters)
+        self.parameters.set_param('writeBiomassLog', True)
+        self.parameters.set_param('writeMediaLog', True)
+        max_cycles = self.parameters.all_params['maxCycles']
+        for rate in ['BiomassLogRate', 'MediaLogRate']:
+            if max_cycles % self.parameters.all_params[rate] != 0:
+                raise ValueError("maxCycles must be a multiple of " + rate +
+                                 " so that the final state of each run is logged")
+        self.n_transfers = n_transfers
+        if transfer is None:
+            transfer = []
+        elif callable(transfer):
+            transfer = [transfer]
+        self.transfer = list(transfer)
+        self.relative_dir = relative_dir
+        self.engine = engine
+
+    def run(self, delete_files : bool = True, **kwargs):
+        """
+        runs the whole experiment
+
+        Parameters
+        ----------
+
+        delete_files : bool, optional
+            Whether to delete simulation and log files. The default is True.
+        **kwargs
+            passed to comets.run() for every run, e.g. timeout. stream_to is
+            not supported
+
+        """
+        if 'stream_to' in kwargs:
+            raise ValueError("serial_transfer does not support stream_to")
+        working_dir = os.getcwd() + '/' + self.relative_dir
+        written = {}  # model id : content hash of its file
+        frames = {}
+        fluxes = {}
+        self.run_outputs = []
+        layout = self.layout
+        offset = 0
+        try:
+            for index in range(self.n_transfers):
+                if index > 0:
+                    layout = self.sim.to_layout()
+                    for transfer in self.transfer:
+                        transfer(layout, index)
+                # initial_pop is in the layout, so model files are only
+                # written again if a transfer changed what they hold
+                for m in layout.models:
+                    content_hash = m.get_content_hash()
+                    if written.get(m.id) != content_hash:
+                        m.write_comets_model(working_dir)
+                        written[m.id] = content_hash
+                sim = comets(layout, copy.deepcopy(self.parameters),
+                             self.relative_dir, self.engine)
+                sim.models_written = True
+                sim.run(delete_files = delete_files, **kwargs)
+                self.sim = sim
+                self.run_outputs.append(sim.run_output)
+                for name in ['total_biomass', 'biomass', 'media',
+                             'specific_media']:
+                    if hasattr(sim, name):
+                        frames.setdefault(name, []).append(
+                            _shift(getattr(sim, name), index, offset))
+                for model_id, frame in getattr(sim, 'fluxes_by_species',
+                                               {}).items():
+                    fluxes.setdefault(model_id, []).append(
+                        _shift(frame, index, offset))
+                offset += self.parameters.all_params['maxCycles']
+        finally:
+            # keep the runs which finished, even if a later one failed
+            for name, parts in frames.items():
+                setattr(self, name, pd.concat(parts, ignore_index = True))
+            if len(fluxes) > 0:
+                self.fluxes_by_species = {model_id: pd.concat(parts, ignore_index = True)
+                                          for model_id, parts in fluxes.items()}
+            if delete_files:
+                for model_id in written:
+                    path = working_dir + model_id + '.cmd'
+                    if os.path.isfile(path):
+                        os.remove(path)
+
+
+def _shift(frame : pd.DataFrame, index : int, offset : int) -> pd.DataFrame:
+    """ returns a copy of one run's log with a transfer column, and cycles
+    counted from the start of the experiment """
+    frame = frame.copy()
+    frame['cycle'] = frame['cycle'] + offset
+    frame.insert(0, 'transfer', index)
+    return(frame)
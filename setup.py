@@ -15,6 +15,7 @@ setup(
     install_requires=[
         # I get to this in a second
         'numpy',
+        'scipy',
         'cobra',
         'pandas>=1.0.0'],
     classifiers=[
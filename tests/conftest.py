@@ -0,0 +1,110 @@
+'''
+Fixtures shared by the cometspy tests.
+
+Every test runs in its own temporary directory, with the synthetic engine
+(see cometspy.synthetic) standing in for COMETS, so that neither java, COMETS
+nor Gurobi are needed, and with the classpath cache kept out of the home
+directory.
+'''
+
+import copy
+import pytest
+import cobra
+
+import cometspy as c
+
+
+@pytest.fixture(autouse = True)
+def workdir(tmp_path, monkeypatch):
+    """ a fresh current directory and environment for every test """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('COMETSPY_ENGINE', 'synthetic')
+    monkeypatch.setenv('COMETSPY_CACHE_DIR', str(tmp_path / 'cometspy_cache'))
+    monkeypatch.delenv('COMETSPY_SYNTHETIC_DECIMAL', raising = False)
+    monkeypatch.delenv('COMETSPY_SYNTHETIC_DELAY', raising = False)
+    monkeypatch.setattr(c.comets, 'model_dir', None)
+    monkeypatch.setattr(c.comets, 'timings_hook', None)
+    return(tmp_path)
+
+
+def make_cobra_model(name : str = 'toy') -> cobra.Model:
+    """ a small cobra model which takes up glucose and ammonium, and makes
+    biomass and acetate """
+    m = cobra.Model(name)
+    glc_e, nh4_e, ac_e = [cobra.Metabolite(i + '_e', compartment = 'e')
+                          for i in ['glc__D', 'nh4', 'ac']]
+    glc_c, nh4_c, ac_c = [cobra.Metabolite(i + '_c', compartment = 'c')
+                          for i in ['glc__D', 'nh4', 'ac']]
+    reactions = []
+    for ext, cyt in [(glc_e, glc_c), (nh4_e, nh4_c), (ac_e, ac_c)]:
+        exchange = cobra.Reaction('EX_' + ext.id, lower_bound = -10.,
+                                  upper_bound = 1000.)
+        exchange.add_metabolites({ext: -1.})
+        transport = cobra.Reaction('T_' + ext.id, lower_bound = -1000.,
+                                   upper_bound = 1000.)
+        transport.add_metabolites({ext: -1., cyt: 1.})
+        reactions += [exchange, transport]
+    overflow = cobra.Reaction('OVERFLOW', lower_bound = 0., upper_bound = 1000.)
+    overflow.add_metabolites({glc_c: -1., ac_c: 3.})
+    biomass = cobra.Reaction('Biomass', lower_bound = 0., upper_bound = 1000.)
+    biomass.add_metabolites({glc_c: -1., nh4_c: -0.5})
+    m.add_reactions(reactions + [overflow, biomass])
+    m.objective = 'Biomass'
+    return(m)
+
+
+def make_model(name : str = 'toy', initial_pop = None) -> c.model:
+    """ a cometspy model of make_cobra_model with open exchanges """
+    model = c.model(make_cobra_model(name))
+    model.initial_pop = initial_pop if initial_pop is not None else [0, 0, 1.e-4]
+    model.open_exchanges()
+    return(model)
+
+
+def make_params(cycles : int = 5, log_rate : int = 1) -> c.params:
+    """ params writing every log every log_rate cycles """
+    params = c.params()
+    params.set_param('maxCycles', cycles)
+    for log in ['writeTotalBiomassLog', 'writeBiomassLog', 'writeMediaLog',
+                'writeFluxLog']:
+        params.set_param(log, True)
+    for rate in ['BiomassLogRate', 'MediaLogRate', 'FluxLogRate',
+                 'totalBiomassLogRate']:
+        params.set_param(rate, log_rate)
+    return(params)
+
+
+@pytest.fixture
+def model():
+    return(make_model())
+
+
+@pytest.fixture
+def layout(model):
+    """ a 3 x 3 layout with one founder in two corners """
+    model.initial_pop = [[0, 0, 1.e-4], [2, 2, 2.e-4]]
+    layout = c.layout([model])
+    layout.grid = [3, 3]
+    layout.set_specific_metabolite('glc__D_e', 0.01)
+    layout.set_specific_metabolite('nh4_e', 1000., static = True)
+    return(layout)
+
+
+@pytest.fixture
+def params():
+    return(make_params())
+
+
+@pytest.fixture
+def new_params(params):
+    """ a function returning a fresh copy of params. comets objects rename
+    the logs of the params they are given, so each needs its own """
+    return(lambda: copy.deepcopy(params))
+
+
+@pytest.fixture
+def sim(layout, new_params):
+    """ a finished simulation of layout, with its files deleted """
+    sim = c.comets(layout, new_params())
+    sim.run()
+    return(sim)
@@ -0,0 +1,41 @@
+import os
+import pandas as pd
+
+import cometspy as c
+from cometspy.batch import iter_batch, run_batch
+
+from conftest import make_params
+
+
+def test_run_batch_returns_sims_in_order(layout):
+    jobs = [(layout, make_params(cycles)) for cycles in [2, 3, 4]]
+    sims = run_batch(jobs, max_workers = 2)
+    assert [sim.total_biomass['cycle'].max() for sim in sims] == [2, 3, 4]
+    assert all(sim.run_status == 'finished' for sim in sims)
+
+
+def test_batch_matches_serial_run(layout, new_params):
+    serial = c.comets(layout, new_params())
+    serial.run()
+    sim, = run_batch([(layout, new_params())], max_workers = 1)
+    pd.testing.assert_frame_equal(sim.total_biomass, serial.total_biomass)
+    pd.testing.assert_frame_equal(sim.media, serial.media)
+
+
+def test_batch_jobs_get_own_dirs_and_clean_up(layout, new_params, workdir):
+    found = {i: sim.working_dir for i, sim in
+             iter_batch([(layout, new_params()) for _ in range(3)],
+                        max_workers = 3, relative_dir = 'runs/')}
+    assert sorted(found) == [0, 1, 2]
+    assert len(set(found.values())) == 3
+    assert os.listdir(workdir / 'runs') == []
+
+
+def test_batch_keeps_files_if_asked(layout, new_params, workdir):
+    jobs = [(layout, new_params()) for _ in range(2)]
+    run_batch(jobs, max_workers = 2, delete_files = False)
+    for i in range(2):
+        logs = os.listdir(workdir / ('batch_' + str(i)))
+        assert any(f.startswith('total_biomass') for f in logs)
+    # one model, written once for the whole batch
+    assert len(os.listdir(workdir / '.cometspy_models')) == 1
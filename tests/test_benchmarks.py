@@ -0,0 +1,49 @@
+'''
+Runs every asv benchmark once, at its smallest parameters, so that the suite
+keeps working as cometspy changes. Nothing is timed.
+'''
+
+import importlib
+import inspect
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODULES = ['bench_comets', 'bench_layout', 'bench_model', 'bench_parsers']
+PREFIXES = ('time_', 'peakmem_', 'mem_', 'track_')
+
+
+def suites():
+    for name in MODULES:
+        module = importlib.import_module('benchmarks.' + name)
+        for suite_name, suite in inspect.getmembers(module, inspect.isclass):
+            if suite.__module__ == module.__name__ and suite_name.endswith('Suite'):
+                yield(pytest.param(suite, id = name + '.' + suite_name))
+
+
+@pytest.mark.parametrize('suite', list(suites()))
+def test_benchmark_suite_runs(suite):
+    benchmark = suite()
+    # the smallest value of every parameter
+    if len(suite.param_names) == 1:
+        benchmark.params = [suite.params[0]]
+        args = [suite.params[0]]
+    else:
+        benchmark.params = tuple([values[0]] for values in suite.params)
+        args = [values[0] for values in suite.params]
+    if hasattr(benchmark, 'setup_cache'):
+        args = [benchmark.setup_cache()] + args
+    methods = [name for name in dir(benchmark) if name.startswith(PREFIXES)]
+    assert len(methods) > 0
+    for name in methods:
+        if hasattr(benchmark, 'setup'):
+            benchmark.setup(*args)
+        try:
+            result = getattr(benchmark, name)(*args)
+            if name.startswith('track_'):
+                assert result > 0
+        finally:
+            if hasattr(benchmark, 'teardown'):
+                benchmark.teardown(*args)
@@ -0,0 +1,106 @@
+import glob
+import importlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import pytest
+
+import cometspy as c
+
+# the module, which cometspy.comets, the class, hides
+comets_module = importlib.import_module('cometspy.comets')
+
+
+LIBRARIES = ['junit/junit-4.12.jar', 'hamcrest-core-1.3.jar',
+             'jogl/jogl-all.jar', 'jogl/gluegen-rt.jar', 'jogl/gluegen.jar',
+             'jogl/gluegen-rt-natives-linux-amd64.jar',
+             'jogl/jogl-all-natives-linux-amd64.jar', 'jamtio.jar',
+             'jmatio.jar', 'concurrent.jar', 'colt.jar',
+             'commons-lang3-3.7.jar', 'commons-math3-3.6.1.jar',
+             'jdistlib-0.4.5-bin.jar']
+
+
+@pytest.fixture
+def install(monkeypatch):
+    """ an empty but complete COMETS and Gurobi install, with no cached
+    classpath. It is not made below the pytest directory, whose name
+    contains 'test', which the classpath search skips """
+    root = pathlib.Path(tempfile.mkdtemp(prefix = 'cometspy_install_'))
+    home = root / 'comets'
+    for jar in ['bin/comets_2.10.2.jar'] + ['lib/' + l for l in LIBRARIES]:
+        os.makedirs(os.path.dirname(home / jar), exist_ok = True)
+        open(home / jar, 'w').close()
+    gurobi = root / 'gurobi'
+    os.makedirs(gurobi / 'lib')
+    open(gurobi / 'lib' / 'gurobi.jar', 'w').close()
+    for variable in ['GUROBI_COMETS_HOME', 'COMETS_GUROBI_HOME']:
+        monkeypatch.delenv(variable, raising = False)
+    monkeypatch.setenv('COMETS_HOME', str(home))
+    monkeypatch.setenv('GUROBI_HOME', str(gurobi))
+    monkeypatch.setattr(comets_module, '_classpath_cache', {})
+    yield(home)
+    shutil.rmtree(root)
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """ counts the globs run to find the classpath """
+    calls = []
+    original = glob.glob
+
+    def counting_glob(*args, **kwargs):
+        calls.append(args[0])
+        return(original(*args, **kwargs))
+    monkeypatch.setattr(comets_module.glob, 'glob', counting_glob)
+    return(calls)
+
+
+def test_classpath_is_found_once(install, layout, params, searches):
+    first = c.comets(layout, params, engine = 'comets')
+    assert first.VERSION == 'comets_2.10.2'
+    assert len(searches) > 0
+    n_searches = len(searches)
+    second = c.comets(layout, params, engine = 'comets')
+    assert len(searches) == n_searches
+    assert second.JAVA_CLASSPATH == first.JAVA_CLASSPATH
+
+
+def test_classpath_persists_on_disk(install, layout, params, searches,
+                                    monkeypatch):
+    first = c.comets(layout, params, engine = 'comets')
+    with open(comets_module._classpath_cache_file()) as f:
+        assert len(json.load(f)) == 1
+    # a new session: nothing in memory
+    monkeypatch.setattr(comets_module, '_classpath_cache', {})
+    n_searches = len(searches)
+    second = c.comets(layout, params, engine = 'comets')
+    assert len(searches) == n_searches
+    assert second.classpath_pieces == first.classpath_pieces
+
+
+def test_changed_install_is_searched_again(install, layout, params, searches):
+    c.comets(layout, params, engine = 'comets')
+    n_searches = len(searches)
+    os.remove(install / 'lib' / 'colt.jar')
+    os.makedirs(install / 'lib' / 'colt')
+    open(install / 'lib' / 'colt' / 'colt.jar', 'w').close()
+    sim = c.comets(layout, params, engine = 'comets')
+    assert len(searches) > n_searches
+    assert sim.classpath_pieces['colt'] == str(install / 'lib' / 'colt' / 'colt.jar')
+
+
+def test_stamp_ignores_unset_gurobi_home(install):
+    dirs = [d for d, mtime in comets_module._install_stamp(str(install), '')]
+    assert '/lib' not in dirs
+    assert str(install / 'lib') in dirs
+
+
+def test_classpath_is_cached_without_gurobi(install, layout, params, searches,
+                                            monkeypatch):
+    monkeypatch.delenv('GUROBI_HOME')
+    c.comets(layout, params, engine = 'comets')
+    n_searches = len(searches)
+    c.comets(layout, params, engine = 'comets')
+    assert len(searches) == n_searches
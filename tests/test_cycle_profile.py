@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import cometspy as c
+from cometspy.progress import parse_cycle_times
+
+
+def test_parse_cycle_times():
+    output = ('Cycle 1\nCycle time: 10.0 ms\nsomething else\n'
+              'Cycle 2\nCycle time: 30.0 ms\nEnd of simulation\n')
+    times = parse_cycle_times(output)
+    assert times['cycle'].tolist() == [1, 2]
+    assert times['cycle_time'].tolist() == pytest.approx([0.01, 0.03])
+    assert len(parse_cycle_times('End of simulation\n')) == 0
+
+
+@pytest.fixture
+def timed_sim(layout, new_params):
+    params = new_params()
+    params.set_param('showCycleTime', True)
+    params.set_param('maxCycles', 8)
+    sim = c.comets(layout, params)
+    sim.run()
+    return(sim)
+
+
+def test_run_reads_cycle_times(timed_sim):
+    assert timed_sim.cycle_times['cycle'].tolist() == list(range(1, 9))
+    assert (timed_sim.cycle_times['cycle_time'] >= 0).all()
+
+
+def test_cycle_profile(timed_sim):
+    profile = timed_sim.get_cycle_profile()
+    assert list(profile.columns) == ['cycle', 'cycle_time', 'total_biomass',
+                                     'occupied_cells', 'n_species']
+    assert profile['occupied_cells'].tolist() == [2] * 8
+    assert profile['n_species'].tolist() == [1] * 8
+    total = timed_sim.total_biomass.set_index('cycle')['toy']
+    assert profile['total_biomass'].tolist() == total.loc[profile['cycle']].tolist()
+
+
+def test_cycle_profile_needs_cycle_times(sim):
+    with pytest.raises(ValueError):
+        sim.get_cycle_profile()
+
+
+def test_cycle_time_summary_flags_superlinear_growth(timed_sim):
+    # cycles slowing down with the square of the total biomass
+    timed_sim.cycle_times = pd.DataFrame({
+        'cycle': timed_sim.total_biomass['cycle'],
+        'cycle_time': timed_sim.total_biomass['toy'] ** 2})
+    summary = timed_sim.get_cycle_time_summary()
+    assert summary.loc['total_biomass', 'exponent'] == pytest.approx(2.)
+    assert summary.loc['total_biomass', 'r_squared'] == pytest.approx(1.)
+    assert summary.loc['total_biomass', 'superlinear']
+    # occupied_cells and n_species never change, so there is nothing to fit
+    assert list(summary.index) == ['total_biomass']
@@ -0,0 +1,68 @@
+import cobra
+import numpy as np
+import pytest
+
+import cometspy as c
+
+from conftest import make_cobra_model
+
+
+@pytest.fixture
+def two_species_sim(new_params):
+    """ a run with two models of different numbers of reactions """
+    first = c.model(make_cobra_model('first'))
+    bigger = make_cobra_model('second')
+    extra = cobra.Reaction('EXTRA', lower_bound = 0., upper_bound = 1000.)
+    extra.add_metabolites({bigger.metabolites.get_by_id('ac_c'): -1.,
+                           bigger.metabolites.get_by_id('glc__D_c'): 0.2})
+    bigger.add_reactions([extra])
+    second = c.model(bigger)
+    first.initial_pop = [[0, 0, 1.e-4], [1, 1, 1.e-4]]
+    second.initial_pop = [[1, 1, 2.e-4]]
+    layout = c.layout([first, second])
+    layout.grid = [2, 2]
+    layout.set_specific_metabolite('glc__D_e', 0.01)
+    sim = c.comets(layout, new_params())
+    sim.run()
+    return(sim)
+
+
+def test_fluxes_by_species_columns(two_species_sim):
+    for m in two_species_sim.layout.models:
+        fluxes = two_species_sim.fluxes_by_species[m.id]
+        assert list(fluxes.columns) == (['cycle', 'x', 'y'] +
+                                        list(m.reactions.REACTION_NAMES))
+        assert fluxes['cycle'].dtype == 'int64'
+    assert len(two_species_sim.fluxes_by_species['first']) == 2 * 5
+    assert len(two_species_sim.fluxes_by_species['second']) == 5
+
+
+def test_wide_fluxes_are_padded_by_model(two_species_sim):
+    fluxes = two_species_sim.fluxes
+    n_first = len(two_species_sim.layout.models[0].reactions)
+    n_second = len(two_species_sim.layout.models[1].reactions)
+    assert fluxes.shape == (3 * 5, 4 + n_second)
+    assert sorted(fluxes[3].unique()) == [1, 2]
+    first = fluxes[fluxes[3] == 1]
+    assert first.iloc[:, 4 + n_first:].isna().all().all()
+    np.testing.assert_array_equal(
+        first.iloc[:, 4:4 + n_first].values,
+        two_species_sim.fluxes_by_species['first'].sort_values(
+            ['cycle', 'x', 'y']).iloc[:, 3:].values)
+
+
+def test_flux_image(two_species_sim):
+    im = two_species_sim.get_flux_image('second', 'EXTRA', 2)
+    fluxes = two_species_sim.fluxes_by_species['second']
+    value = fluxes.loc[fluxes['cycle'] == 2, 'EXTRA'].iloc[0]
+    assert im[0, 0] == 0 and im[1, 1] == value
+    with pytest.raises(NameError):
+        two_species_sim.get_flux_image('first', 'EXTRA', 2)
+    with pytest.raises(ValueError):
+        two_species_sim.get_flux_image('first', 'Biomass', 99)
+
+
+def test_species_exchange_fluxes(two_species_sim):
+    exchanges = two_species_sim.get_species_exchange_fluxes('first')
+    assert exchanges.columns[0] == 'cycle'
+    assert all(col.startswith('EX_') for col in exchanges.columns[1:])
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+
+def test_metabolite_image_matches_media_log(sim):
+    im = sim.get_metabolite_image('glc__D_e', 3)
+    assert im.shape == (3, 3)
+    expected = np.zeros((3, 3))
+    rows = sim.media[(sim.media['metabolite'] == 'glc__D_e') &
+                     (sim.media['cycle'] == 3)]
+    expected[rows['x'] - 1, rows['y'] - 1] = rows['conc_mmol']
+    np.testing.assert_array_equal(im, expected)
+
+
+def test_metabolite_stack_keeps_cycle_order(sim):
+    stack = sim.get_metabolite_stack('glc__D_e', [4, 2])
+    np.testing.assert_array_equal(stack[0], sim.get_metabolite_image('glc__D_e', 4))
+    np.testing.assert_array_equal(stack[1], sim.get_metabolite_image('glc__D_e', 2))
+    assert len(sim.get_metabolite_stack('glc__D_e')) == 5
+
+
+def test_metabolite_image_errors(sim):
+    with pytest.raises(NameError):
+        sim.get_metabolite_image('unknown_e', 3)
+    with pytest.raises(ValueError):
+        sim.get_metabolite_image('glc__D_e', 99)
+
+
+def test_media_cube(sim):
+    cube, cycles, mets = sim.get_media_cube()
+    assert cube.shape == (len(cycles), len(mets), 3, 3)
+    assert list(cycles) == [1, 2, 3, 4, 5]
+    np.testing.assert_array_equal(cube[2, list(mets).index('glc__D_e')],
+                                  sim.get_metabolite_image('glc__D_e', 3))
+
+
+def test_biomass_image_matches_biomass_log(sim):
+    im = sim.get_biomass_image('toy', 4)
+    expected = np.zeros((3, 3))
+    rows = sim.biomass[sim.biomass['cycle'] == 4]
+    expected[rows['x'] - 1, rows['y'] - 1] = rows['biomass']
+    np.testing.assert_array_equal(im, expected)
+    assert im[0, 0] > 0 and im[2, 2] > 0 and im[1, 1] == 0
+
+
+def test_biomass_stack_and_cube(sim):
+    stack = sim.get_biomass_stack('toy', [5, 1])
+    np.testing.assert_array_equal(stack[0], sim.get_biomass_image('toy', 5))
+    cube, species, cycles = sim.get_biomass_cube()
+    assert cube.shape == (1, 5, 3, 3)
+    assert list(species) == ['toy']
+    np.testing.assert_array_equal(cube[0, 0], sim.get_biomass_image('toy', 1))
+    np.testing.assert_array_equal(cube[0], sim.get_biomass_stack('toy'))
+
+
+def test_biomass_image_errors(sim):
+    with pytest.raises(NameError):
+        sim.get_biomass_image('other', 1)
+    with pytest.raises(ValueError):
+        sim.get_biomass_image('toy', 99)
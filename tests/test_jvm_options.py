@@ -0,0 +1,80 @@
+import importlib
+import pytest
+
+import cometspy as c
+
+# the module, which cometspy.comets, the class, hides
+comets_module = importlib.import_module('cometspy.comets')
+
+
+@pytest.fixture(autouse = True)
+def default_jvm_options(monkeypatch):
+    """ leaves comets.default_jvm_options as they were """
+    monkeypatch.setattr(c.comets, 'default_jvm_options',
+                        dict(c.comets.default_jvm_options))
+
+
+def test_explicit_options(layout, params):
+    sim = c.comets(layout, params)
+    sim.jvm_options = {'Xmx': '8g', 'Xms': 512, 'gc': 'G1',
+                       'TieredStopAtLevel': 1, 'extra': ['-XX:+AlwaysPreTouch']}
+    assert sim.get_jvm_args() == ['-Xms512m', '-Xmx8g', '-XX:+UseG1GC',
+                                  '-XX:TieredStopAtLevel=1',
+                                  '-XX:+AlwaysPreTouch']
+
+
+def test_defaults_apply_to_every_object(layout, params):
+    c.comets.default_jvm_options['gc'] = 'Parallel'
+    c.comets.default_jvm_options['Xmx'] = None
+    sim = c.comets(layout, params)
+    assert sim.get_jvm_args() == ['-XX:+UseParallelGC']
+    sim.jvm_options['gc'] = None
+    assert sim.get_jvm_args() == []
+
+
+def test_heap_is_left_to_java_by_default(layout, params):
+    assert c.comets(layout, params).get_jvm_args() == []
+
+
+def test_auto_heap_is_bounded_by_memory(layout, params, monkeypatch):
+    monkeypatch.setattr(comets_module, '_physical_memory_mb', lambda: 16000)
+    sim = c.comets(layout, params)
+    sim.jvm_options['Xmx'] = 'auto'
+    assert sim.get_jvm_args() == ['-Xmx4000m']
+    # no flag rather than a guess when the memory is unknown
+    monkeypatch.setattr(comets_module, '_physical_memory_mb', lambda: None)
+    assert sim.get_jvm_args() == []
+
+
+def test_memory_respects_container_limit(tmp_path, monkeypatch):
+    physical = comets_module._physical_memory_mb()
+    if physical is None:
+        pytest.skip('memory is unknown on this platform')
+    limit = tmp_path / 'memory.max'
+    monkeypatch.setattr(comets_module, '_CGROUP_MEMORY_LIMITS', [str(limit)])
+    limit.write_text('max\n')
+    assert comets_module._physical_memory_mb() == physical
+    limit.write_text(str(512 * 2**20) + '\n')
+    assert comets_module._physical_memory_mb() == min(512, physical)
+
+
+def test_heap_estimate_grows_with_grid(layout):
+    small = comets_module._estimate_heap_mb(layout)
+    layout.grid = [1000, 1000]
+    assert comets_module._estimate_heap_mb(layout) > small
+
+
+def test_options_are_in_java_command(layout, params, monkeypatch):
+    commands = []
+
+    def popen(cmd, **kwargs):
+        commands.append(cmd)
+        raise OSError('not starting java in tests')
+    monkeypatch.setattr(comets_module.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(comets_module.sp, 'Popen', popen)
+    sim = c.comets(layout, params)
+    sim.engine = 'comets'
+    sim.jvm_options = {'Xmx': '2g', 'gc': 'Serial'}
+    with pytest.raises(OSError):
+        sim.run()
+    assert commands[0].startswith('java -Xmx2g -XX:+UseSerialGC -classpath')
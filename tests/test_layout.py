@@ -0,0 +1,15 @@
+import numpy as np
+
+import cometspy as c
+
+
+def test_read_layout_with_region_map(layout, workdir):
+    region_map = np.array([[1, 1, 2], [1, 2, 2], [2, 2, 2]], dtype = int)
+    layout.set_region_map(region_map)
+    for region in [1, 2]:
+        layout.set_region_parameters(region, [1.e-6 * region] * len(layout.media), 1.)
+    layout.write_necessary_files(str(workdir) + '/')
+    read = c.layout('.current_layout')
+    np.testing.assert_array_equal(read.region_map, region_map)
+    assert read.grid == layout.grid
+    assert [m.id for m in read.models] == ['toy']
@@ -0,0 +1,62 @@
+import threading
+import time
+import pandas as pd
+
+import cometspy as c
+from cometspy import parsers
+from cometspy.comets import _log_tail
+
+
+def test_log_tail_parses_complete_lines_only(workdir):
+    path = str(workdir / 'media_log')
+    tail = _log_tail(path, parsers.read_media)
+    assert not tail.poll()  # not written yet
+    with open(path, 'w') as f:
+        f.write('glc__D_e 1 1 1 0.5\nglc__D_e 1 2 1 0.')
+    assert tail.poll()
+    assert len(tail.frame) == 1
+    with open(path, 'a') as f:
+        f.write('25\nglc__D_e 2 1 1 0.4\n')
+    assert tail.poll()
+    assert tail.frame['conc_mmol'].tolist() == [0.5, 0.25, 0.4]
+    assert not tail.poll()
+
+
+def test_log_tail_keeps_header(workdir):
+    path = str(workdir / 'specific_media_log')
+    tail = _log_tail(path, parsers.read_specific_media, header = True)
+    with open(path, 'w') as f:
+        f.write('cycle x y glc__D_e\n1 1 1 0.5\n')
+    assert tail.poll()
+    with open(path, 'a') as f:
+        f.write('2 1 1 0.4\n')
+    assert tail.poll()
+    assert tail.frame['glc__D_e'].tolist() == [0.5, 0.4]
+
+
+def test_live_run_grows_during_the_run(layout, new_params, monkeypatch):
+    monkeypatch.setenv('COMETSPY_SYNTHETIC_DELAY', '0.1')
+    params = new_params()
+    params.set_param('maxCycles', 10)
+    sim = c.comets(layout, params)
+    t = threading.Thread(target = sim.run,
+                         kwargs = {'live': True, 'live_interval': 0.05})
+    t.start()
+    seen = []
+    while t.is_alive():
+        if hasattr(sim, 'total_biomass'):
+            seen.append(sim.total_biomass['cycle'].max())
+        time.sleep(0.05)
+    t.join()
+    assert sim.run_status == 'finished'
+    assert any(cycle < 10 for cycle in seen)
+
+
+def test_live_run_matches_run(layout, new_params):
+    serial = c.comets(layout, new_params())
+    serial.run()
+    sim = c.comets(layout, new_params())
+    sim.run(live = True, live_interval = 0.01)
+    pd.testing.assert_frame_equal(sim.total_biomass, serial.total_biomass)
+    pd.testing.assert_frame_equal(sim.media, serial.media)
+    pd.testing.assert_frame_equal(sim.fluxes, serial.fluxes)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cometspy as c
+from cometspy.cache import result_cache
+from cometspy.store import log_dataset, _dataset_writer
+
+
+@pytest.fixture
+def streamed(layout, new_params, workdir):
+    """ the same simulation, in memory and streamed to disk """
+    in_memory = c.comets(layout, new_params())
+    in_memory.run()
+    sim = c.comets(layout, new_params())
+    sim.run(stream_to = str(workdir / 'big_run'))
+    return(in_memory, sim)
+
+
+def test_dataset_writer_partitions_by_cycle(workdir):
+    writer = _dataset_writer(str(workdir / 'log'), ['cycle', 'name', 'value'])
+    writer.append(pd.DataFrame({'cycle': [1, 1, 2], 'name': ['a', 'b', 'a'],
+                                'value': [0.5, 1.5, 2.5]}))
+    writer.append(pd.DataFrame({'cycle': [2, 3], 'name': ['b', 'a'],
+                                'value': [3.5, 4.5]}))
+    dataset = writer.close()
+    assert dataset.cycles == [1, 2, 3]
+    frame = dataset.read(cycles = [2])
+    assert frame['name'].tolist() == ['a', 'b']
+    assert frame['value'].tolist() == [2.5, 3.5]
+    assert dataset.read(columns = ['value'])['value'].tolist() == [
+        0.5, 1.5, 2.5, 3.5, 4.5]
+    assert list(dataset.read(cycles = [9]).columns) == ['cycle', 'name', 'value']
+    assert [cycle for cycle, frame in dataset.iter_cycles()] == [1, 2, 3]
+    # reopened from disk
+    pd.testing.assert_frame_equal(log_dataset(dataset.directory).read(),
+                                  dataset.read())
+
+
+def test_stream_to_matches_in_memory(streamed):
+    in_memory, sim = streamed
+    assert isinstance(sim.media, log_dataset)
+    assert isinstance(sim.biomass, log_dataset)
+    assert isinstance(sim.fluxes_by_species['toy'], log_dataset)
+    pd.testing.assert_frame_equal(sim.media.read(), in_memory.media)
+    pd.testing.assert_frame_equal(sim.biomass.read(), in_memory.biomass)
+    pd.testing.assert_frame_equal(sim.fluxes_by_species['toy'].read(),
+                                  in_memory.fluxes_by_species['toy'])
+    pd.testing.assert_frame_equal(sim.total_biomass, in_memory.total_biomass)
+
+
+def test_images_of_streamed_runs(streamed):
+    in_memory, sim = streamed
+    np.testing.assert_array_equal(sim.get_metabolite_image('glc__D_e', 3),
+                                  in_memory.get_metabolite_image('glc__D_e', 3))
+    np.testing.assert_array_equal(sim.get_biomass_image('toy', 3),
+                                  in_memory.get_biomass_image('toy', 3))
+    np.testing.assert_array_equal(sim.get_flux_image('toy', 'Biomass', 3),
+                                  in_memory.get_flux_image('toy', 'Biomass', 3))
+
+
+def test_stream_to_excludes_live_and_cache(layout, params, workdir):
+    sim = c.comets(layout, params)
+    with pytest.raises(ValueError):
+        sim.run(stream_to = str(workdir / 'big_run'), live = True)
+    with pytest.raises(ValueError):
+        sim.run(stream_to = str(workdir / 'big_run'),
+                cache = result_cache(str(workdir / 'results')))
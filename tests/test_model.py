@@ -0,0 +1,98 @@
+import cobra
+import numpy as np
+import pytest
+from scipy import sparse
+
+import cometspy as c
+
+from conftest import make_cobra_model
+
+
+def test_load_cobra_model_stoichiometry():
+    cobra_model = make_cobra_model()
+    model = c.model(cobra_model)
+    assert model.id == 'toy'
+    assert model.S.shape == (len(cobra_model.metabolites),
+                             len(cobra_model.reactions))
+    met_names = list(model.metabolites['METABOLITE_NAMES'])
+    S = model.S.toarray()
+    for j, rxn in enumerate(cobra_model.reactions):
+        expected = np.zeros(len(met_names))
+        for met, coef in rxn.metabolites.items():
+            expected[met_names.index(met.id)] = coef
+        np.testing.assert_array_equal(S[:, j], expected)
+
+
+def test_load_cobra_model_reactions():
+    cobra_model = make_cobra_model()
+    model = c.model(cobra_model)
+    reactions = model.reactions.set_index('REACTION_NAMES')
+    assert list(reactions.index) == [r.id for r in cobra_model.reactions]
+    assert reactions['ID'].tolist() == list(range(1, 9))
+    assert reactions.loc['EX_glc__D_e', 'LB'] == -10.
+    assert reactions['EXCH'].tolist() == [True, False] * 3 + [False, False]
+    assert reactions['EXCH_IND'].tolist() == [1, 0, 2, 0, 3, 0, 0, 0]
+    assert model.objective == 8
+    assert list(model.get_exchange_metabolites()) == ['glc__D_e', 'nh4_e', 'ac_e']
+
+
+def test_demand_reactions_are_not_exchanges():
+    cobra_model = make_cobra_model()
+    demand = cobra.Reaction('DM_ac_c', lower_bound = 0., upper_bound = 1000.)
+    demand.add_metabolites({cobra_model.metabolites.get_by_id('ac_c'): -1.})
+    cobra_model.add_reactions([demand])
+    model = c.model(cobra_model)
+    assert not model.reactions['EXCH'].iloc[-1]
+    assert model.reactions['EXCH_IND'].iloc[-1] == 0
+
+
+def test_kinetic_parameters_are_read():
+    cobra_model = make_cobra_model()
+    cobra_model.reactions.get_by_id('EX_glc__D_e').Vmax = 12.
+    model = c.model(cobra_model)
+    assert model.vmax_flag
+    assert model.reactions['V_MAX'].iloc[0] == 12.
+    assert np.isnan(model.reactions['V_MAX'].iloc[2])
+    assert not model.km_flag
+
+
+def test_S_is_sparse(model):
+    assert sparse.issparse(model.S)
+    assert model.S.nnz == sum(len(r.metabolites)
+                              for r in make_cobra_model().reactions)
+
+
+def test_smat_matches_S(model):
+    smat = model.smat
+    assert list(smat.columns) == ['metabolite', 'rxn', 's_coef']
+    S = model.S.toarray()
+    np.testing.assert_array_equal(
+        S[smat['metabolite'] - 1, smat['rxn'] - 1], smat['s_coef'])
+    assert len(smat) == model.S.nnz
+
+
+def test_S_is_reused_until_smat_changes(model):
+    S = model.S
+    model.smat
+    assert model.S is S
+    # changed in place
+    model.smat.loc[0, 's_coef'] = 7.
+    i, j = model.smat.at[0, 'metabolite'] - 1, model.smat.at[0, 'rxn'] - 1
+    assert model.S[i, j] == 7.
+    S = model.S
+    assert model.S is S
+    # replaced
+    smat = model.smat.copy()
+    smat.loc[0, 's_coef'] = 9.
+    model.smat = smat
+    assert model.S[i, j] == 9.
+
+
+def test_coefficients(model):
+    biomass = model.get_reaction_coefficients('Biomass')
+    assert biomass.to_dict() == {'glc__D_c': -1., 'nh4_c': -0.5}
+    glucose = model.get_metabolite_coefficients('glc__D_c')
+    assert glucose.to_dict() == {'T_glc__D_e': 1., 'OVERFLOW': -1.,
+                                 'Biomass': -1.}
+    with pytest.raises(ValueError):
+        model.get_reaction_coefficients('unknown')
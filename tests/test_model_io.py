@@ -0,0 +1,135 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+
+import cometspy as c
+from cometspy.model import _read_sections
+
+from conftest import make_cobra_model
+
+
+MODEL_FILE = '''SMATRIX  3  4
+    1   1   -1.0
+    1   2   -1.0
+
+    2   2   1.0
+    2   3   -1
+    3   4   -1.5
+//
+BOUNDS -1000 1000
+    1   -10.0   1000.0
+    3   0   5
+//
+OBJECTIVE
+    3
+//
+METABOLITE_NAMES
+    glc__D_e
+    glc__D_c
+    ac_e
+//
+REACTION_NAMES
+    EX_glc__D_e
+    T_glc__D_e
+    Biomass
+    EX_ac_e
+//
+EXCHANGE_REACTIONS
+ 1 4
+//
+VMAX_VALUES 12
+    1   8.5
+//
+OPTIMIZER GLOP
+//
+OBJECTIVE_STYLE
+MAX_OBJECTIVE_MIN_TOTAL
+//
+packedDensity 2.5
+//
+neutralDrift TRUE
+//
+'''
+
+
+def test_read_sections():
+    sections = _read_sections(MODEL_FILE)
+    assert sections['SMATRIX'][0] == ['SMATRIX', '3', '4']
+    assert len(sections['SMATRIX'][1]) == 5
+    assert sections['OPTIMIZER'] == (['OPTIMIZER', 'GLOP'], [])
+    assert sections['EXCHANGE_REACTIONS'][1] == [' 1 4']
+
+
+def test_read_comets_model(workdir):
+    with open('toy.cmd', 'w') as f:
+        f.write(MODEL_FILE)
+    model = c.model('toy.cmd')
+    assert model.id == 'toy'
+    np.testing.assert_array_equal(model.S.toarray(),
+                                  [[-1., -1., 0., 0.],
+                                   [0., 1., -1., 0.],
+                                   [0., 0., 0., -1.5]])
+    reactions = model.reactions.set_index('REACTION_NAMES')
+    assert reactions['LB'].tolist() == [-10., -1000., 0., -1000.]
+    assert reactions['UB'].tolist() == [1000., 1000., 5., 1000.]
+    assert reactions['EXCH_IND'].tolist() == [1, 0, 0, 2]
+    assert reactions.loc['EX_glc__D_e', 'V_MAX'] == 8.5
+    assert np.isnan(reactions.loc['EX_ac_e', 'V_MAX'])
+    assert model.vmax_flag and model.default_vmax == 12
+    assert list(model.metabolites['METABOLITE_NAMES']) == [
+        'glc__D_e', 'glc__D_c', 'ac_e']
+    assert model.objective == 3
+    assert model.optimizer == 'GLOP'
+    assert model.obj_style == 'MAX_OBJECTIVE_MIN_TOTAL'
+    assert model.convection_flag
+    assert model.convection_parameters['packedDensity'] == 2.5
+    assert model.neutral_drift_flag
+
+
+def with_everything() -> c.model:
+    """ a model using the optional sections of model files """
+    cobra_model = make_cobra_model()
+    cobra_model.reactions.get_by_id('EX_glc__D_e').Vmax = 12.
+    cobra_model.reactions.get_by_id('EX_glc__D_e').Km = 0.01
+    cobra_model.reactions.get_by_id('EX_nh4_e').Hill = 2.
+    model = c.model(cobra_model)
+    model.open_exchanges()
+    model.change_bounds('OVERFLOW', 0., 2.5)
+    model.add_convection_parameters(2., 1., 1., 0.5)
+    model.add_noise_variance_parameter(0.1)
+    model.add_neutral_drift_parameter(0.01)
+    return(model)
+
+
+@pytest.mark.parametrize('make', [lambda: c.model(make_cobra_model()),
+                                  with_everything])
+def test_model_files_round_trip(make, workdir):
+    make().write_comets_model()
+    with open('toy.cmd', 'rb') as f:
+        written = f.read()
+    model = c.model('toy.cmd')
+    model.write_comets_model()
+    with open('toy.cmd', 'rb') as f:
+        assert f.read() == written
+
+
+def test_write_to_buffer(model, workdir):
+    buffer = io.StringIO()
+    model.write_comets_model(buffer = buffer)
+    model.write_comets_model(str(workdir) + '/')
+    with open('toy.cmd') as f:
+        assert buffer.getvalue() == f.read()
+    assert not buffer.closed
+
+
+def test_written_tables_read_back(workdir):
+    model = with_everything()
+    model.write_comets_model()
+    read = c.model('toy.cmd')
+    pd.testing.assert_frame_equal(read.reactions, model.reactions,
+                                  check_dtype = False)
+    pd.testing.assert_frame_equal(read.metabolites, model.metabolites)
+    assert (read.S != model.S).nnz == 0
+    assert read.convection_parameters == model.convection_parameters
+    assert read.noise_variance == model.noise_variance
@@ -0,0 +1,111 @@
+import copy
+import gc
+import os
+import pandas as pd
+
+import cometspy as c
+from cometspy.cache import model_store, get_model_store
+
+from conftest import make_model
+
+
+def test_content_hash(model):
+    same = make_model()
+    assert model.get_content_hash() == same.get_content_hash()
+    assert model.get_content_hash() == copy.deepcopy(model).get_content_hash()
+    same.change_bounds('Biomass', 0., 10.)
+    assert model.get_content_hash() != same.get_content_hash()
+    other = make_model()
+    other.smat.loc[0, 's_coef'] = 5.
+    assert model.get_content_hash() != other.get_content_hash()
+    other = make_model()
+    other.add_noise_variance_parameter(0.1)
+    assert model.get_content_hash() != other.get_content_hash()
+
+
+def test_add_writes_once(model, workdir):
+    store = model_store(str(workdir / 'models'))
+    path = store.add(model)
+    assert os.path.isfile(path)
+    assert os.path.basename(path) == 'toy.cmd'
+    assert store.add(model) == path
+    # an identical model shares the file
+    twin = make_model()
+    assert store.add(twin) == path
+    assert store.writes == 1
+    assert store.references(path) == 2
+    assert c.model(path).get_content_hash() == model.get_content_hash()
+
+
+def test_release_removes_unused_files(model, workdir):
+    store = model_store(str(workdir / 'models'))
+    twin = make_model()
+    path = store.add(model)
+    store.add(twin)
+    store.release(model)
+    assert os.path.isfile(path)
+    store.release(twin)
+    assert not os.path.exists(path)
+    assert os.listdir(store.directory) == []
+    store.release(twin)  # nothing held any more
+
+
+def test_changed_model_gets_new_file(model, workdir):
+    store = model_store(str(workdir / 'models'))
+    old = store.add(model)
+    model.change_bounds('Biomass', 0., 10.)
+    new = store.add(model)
+    assert new != old
+    assert not os.path.exists(old)
+    assert store.writes == 2
+
+
+def test_garbage_collected_models_are_released(workdir):
+    store = model_store(str(workdir / 'models'))
+    model = make_model()
+    path = store.add(model)
+    del model
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_files_held_by_other_processes_are_kept(model, workdir):
+    store = model_store(str(workdir / 'models'))
+    path = store.add(model)
+    open(path + '.1.ref', 'w').close()  # pid 1 holds it too
+    store.release(model)
+    assert os.path.isfile(path)
+
+
+def test_one_store_per_directory(workdir):
+    store = get_model_store(str(workdir / 'models'))
+    assert get_model_store('models') is store
+    assert get_model_store(str(workdir / 'other')) is not store
+
+
+def test_runs_share_model_files(layout, new_params, workdir):
+    store = get_model_store(str(workdir / 'models'))
+    writes = store.writes
+    sims = []
+    for i in range(3):
+        sim = c.comets(layout, new_params())
+        sim.model_dir = str(workdir / 'models')
+        sim.run()
+        sims.append(sim)
+    assert store.writes == writes + 1
+    pd.testing.assert_frame_equal(sims[0].total_biomass, sims[2].total_biomass)
+    # only the model files outlive the runs
+    assert sorted(os.listdir(workdir)) == ['models']
+    path, = [os.path.join(d, f) for d, _, files in os.walk(workdir / 'models')
+             for f in files if f.endswith('.cmd')]
+    sims[-1].release_model_files()
+    assert not os.path.exists(path)
+
+
+def test_model_dir_defaults_to_class_attribute(layout, params, workdir,
+                                               monkeypatch):
+    monkeypatch.setattr(c.comets, 'model_dir', str(workdir / 'models'))
+    sim = c.comets(layout, params)
+    sim.run()
+    assert os.path.isdir(workdir / 'models')
+    sim.release_model_files()
@@ -0,0 +1,88 @@
+import io
+import re
+import numpy as np
+import pandas as pd
+import pytest
+
+import cometspy as c
+from cometspy import parsers
+
+
+def comma(text : str) -> str:
+    """ text as written by COMETS on a system with decimal commas """
+    return(re.sub(r'(\d)\.(\d)', r'\1,\2', text))
+
+
+TOTAL = '0\t1.0E-4\t2.0E-4\n1\t1.5E-4\t2.5E-4\n'
+MEDIA = 'glc__D_e 1 1 1 0.25\nnh4_e 1 2 3 1000.0\n'
+BIOMASS = '1 1 1 toy.cmd 1.5E-4\n1 3 3 toy.cmd 2.5E-4\n'
+FLUXES = '1 1 1 1 -0.5 0.25\n1 1 1 2 1.5 0.0 -2.0\n1 2 1 1 -0.75 0.5\n'
+SPECIFIC = 'cycle x y glc__D_e nh4_e\n1 1 1 0.25 1000.0\n'
+
+
+@pytest.mark.parametrize('text, expected', [
+    (MEDIA, '.'), (comma(MEDIA), ','), ('cycle x y\n1 1 1\n', '.'),
+    ('1 1 1 toy.cmd 2E-4\n', '.')])
+def test_sniff_decimal(text, expected):
+    assert parsers.sniff_decimal(io.StringIO(text)) == expected
+
+
+def test_sniff_decimal_skips_header():
+    assert parsers.sniff_decimal(io.StringIO(comma(SPECIFIC)), skip = 1) == ','
+
+
+@pytest.mark.parametrize('reader, text', [
+    (lambda src: parsers.read_total_biomass(src, ['a', 'b']), TOTAL),
+    (parsers.read_media, MEDIA),
+    (parsers.read_biomass, BIOMASS),
+    (parsers.read_specific_media, SPECIFIC)])
+def test_readers_accept_decimal_commas(reader, text):
+    pd.testing.assert_frame_equal(reader(io.StringIO(comma(text))),
+                                  reader(io.StringIO(text)))
+
+
+def test_read_total_biomass():
+    frame = parsers.read_total_biomass(io.StringIO(TOTAL), ['a', 'b'])
+    assert list(frame.columns) == ['cycle', 'a', 'b']
+    assert frame['cycle'].dtype == 'int64'
+    assert frame['b'].tolist() == [2.e-4, 2.5e-4]
+
+
+def test_read_media_and_biomass():
+    media = parsers.read_media(io.StringIO(MEDIA))
+    assert media['metabolite'].tolist() == ['glc__D_e', 'nh4_e']
+    assert media['conc_mmol'].tolist() == [0.25, 1000.]
+    biomass = parsers.read_biomass(io.StringIO(BIOMASS))
+    assert biomass['species'].tolist() == ['toy', 'toy']
+    assert biomass['biomass'].tolist() == [1.5e-4, 2.5e-4]
+
+
+@pytest.mark.parametrize('text', [FLUXES, comma(FLUXES)])
+def test_read_fluxes_by_species(text):
+    fluxes = parsers.read_fluxes_by_species(io.StringIO(text), [2, 3])
+    np.testing.assert_array_equal(fluxes[1], [[1, 1, 1, -0.5, 0.25],
+                                              [1, 2, 1, -0.75, 0.5]])
+    np.testing.assert_array_equal(fluxes[2], [[1, 1, 1, 1.5, 0., -2.]])
+
+
+def test_iter_flux_chunks_bounds_lines():
+    chunks = list(parsers.iter_flux_chunks(io.StringIO(FLUXES), [2, 3],
+                                           chunk_lines = 2))
+    assert len(chunks) == 2
+    assert [len(chunk[1]) for chunk in chunks] == [1, 1]
+
+
+def test_runs_with_decimal_commas_give_same_frames(layout, new_params,
+                                                   monkeypatch):
+    sims = {}
+    for decimal in ['.', ',']:
+        monkeypatch.setenv('COMETSPY_SYNTHETIC_DECIMAL', decimal)
+        params = new_params()
+        params.set_param('writeSpecificMediaLog', True)
+        params.set_param('specificMedia', 'glc__D_e,nh4_e')
+        sims[decimal] = c.comets(layout, params)
+        sims[decimal].run()
+    for name in ['total_biomass', 'biomass', 'media', 'specific_media',
+                 'fluxes']:
+        pd.testing.assert_frame_equal(getattr(sims[','], name),
+                                      getattr(sims['.'], name))
@@ -0,0 +1,56 @@
+import time
+import pytest
+
+import cometspy as c
+from cometspy.progress import parse_cycle_line, progress_tracker
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('Cycle 12\n', ('cycle', 12)),
+    ('  Cycle 3  ', ('cycle', 3)),
+    ('Cycle time: 250.0 ms', ('cycle_time', 0.25)),
+    ('Cycle time: 250,0 ms', ('cycle_time', 0.25)),
+    ('cycle time = 1.5 s', ('cycle_time', 1.5)),
+    ('Total biomass: 12', None),
+    ('Cycle 12 of 100', None)])
+def test_parse_cycle_line(line, expected):
+    assert parse_cycle_line(line) == expected
+
+
+def test_tracker_follows_cycles():
+    progress = progress_tracker(10)
+    assert progress.eta is None
+    assert progress.feed('Cycle 1\n')
+    assert not progress.feed('Cycle time: 5.0 ms\n')
+    time.sleep(0.01)
+    assert progress.feed('Cycle 5\n')
+    assert progress.cycle == 5
+    assert progress.updates == 2
+    assert progress.cycle_time == 0.005
+    assert progress.fraction_done == 0.5
+    assert progress.cycles_per_second > 0
+    assert progress.eta > 0
+    assert 'cycle 5/10 (50%)' in repr(progress)
+
+
+def test_tracker_detects_stalls():
+    progress = progress_tracker(10)
+    progress.stall_after = 0.05
+    progress.feed('Cycle 1\n')
+    assert not progress.check_stall()
+    time.sleep(0.1)
+    assert progress.check_stall()
+    assert progress.stalled
+    assert not progress.check_stall()  # only reported once
+    progress.feed('Cycle 2\n')
+    assert not progress.stalled
+
+
+def test_run_reports_progress(layout, new_params):
+    seen = []
+    sim = c.comets(layout, new_params())
+    sim.run(progress = lambda p: seen.append(p.cycle))
+    assert seen[-1] == 5
+    assert seen == sorted(seen)
+    assert sim.progress.cycle == 5
+    assert sim.progress.fraction_done == 1.
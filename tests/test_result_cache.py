@@ -0,0 +1,98 @@
+import os
+import pandas as pd
+
+import cometspy as c
+from cometspy.cache import result_cache, hash_files
+
+
+def test_get_misses_then_hits(workdir):
+    cache = result_cache(str(workdir / 'results'))
+    assert cache.get('abc') is None
+    cache.put('abc', {'total_biomass': pd.DataFrame({'cycle': [0, 1]})})
+    assert cache.keys() == ['abc']
+    pd.testing.assert_frame_equal(cache.get('abc')['total_biomass'],
+                                  pd.DataFrame({'cycle': [0, 1]}))
+    cache.invalidate('abc')
+    assert cache.get('abc') is None
+
+
+def test_evicts_least_recently_used(workdir):
+    cache = result_cache(str(workdir / 'results'), max_bytes = 2500)
+    for key in ['a', 'b']:
+        cache.put(key, {'data': bytes(1000)})
+    # make a older than b, then use it
+    os.utime(os.path.join(cache.directory, 'a.pkl'), (1000, 1000))
+    os.utime(os.path.join(cache.directory, 'b.pkl'), (2000, 2000))
+    assert cache.get('a') is not None
+    cache.put('c', {'data': bytes(1000)})
+    assert sorted(cache.keys()) == ['a', 'c']
+    assert cache.size() <= 2500
+    cache.clear()
+    assert cache.keys() == []
+
+
+def test_entries_removed_by_other_processes(workdir, monkeypatch):
+    cache = result_cache(str(workdir / 'results'), max_bytes = 1500)
+    cache.put('a', {'data': bytes(1000)})
+    # listed, but gone by the time they are looked at
+    keys = cache.keys
+    monkeypatch.setattr(cache, 'keys', lambda: keys() + ['gone'])
+    assert cache.size() == os.path.getsize(os.path.join(cache.directory,
+                                                        'a.pkl'))
+    cache.put('b', {'data': bytes(1000)})
+    assert cache.keys() == ['b', 'gone']
+    cache.invalidate('gone')
+
+    def utime(path, *args):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, 'utime', utime)
+    assert cache.get('b') is not None
+
+
+def test_hash_files_strips_pattern(workdir):
+    for name, text in [('one', 'log_0x1f_0x2a end'), ('two', 'log_0x3b end')]:
+        with open(name, 'w') as f:
+            f.write(text)
+    assert hash_files(['one']) != hash_files(['two'])
+    assert (hash_files(['one'], strip = '_0x[0-9a-f]+') ==
+            hash_files(['two'], strip = '_0x[0-9a-f]+'))
+    assert (hash_files(['one'], extra = 'v1') !=
+            hash_files(['one'], extra = 'v2'))
+
+
+def test_run_hits_cache_for_same_inputs(layout, new_params, workdir):
+    cache = result_cache(str(workdir / 'results'))
+    first = c.comets(layout, new_params())
+    first.run(cache = cache)
+    assert first.run_status == 'finished'
+    second = c.comets(layout, new_params())
+    second.run(cache = cache)
+    assert second.run_status == 'cached'
+    assert second.cache_key == first.cache_key
+    pd.testing.assert_frame_equal(second.total_biomass, first.total_biomass)
+    pd.testing.assert_frame_equal(second.fluxes, first.fluxes)
+
+
+def test_run_misses_cache_for_changed_inputs(layout, new_params, workdir):
+    cache = result_cache(str(workdir / 'results'))
+    first = c.comets(layout, new_params())
+    first.run(cache = cache)
+    params = new_params()
+    params.set_param('maxCycles', 6)
+    second = c.comets(layout, params)
+    second.run(cache = cache)
+    assert second.run_status == 'finished'
+    layout.models[0].change_bounds('EX_glc__D_e', -5., 1000.)
+    third = c.comets(layout, new_params())
+    third.run(cache = cache)
+    assert third.run_status == 'finished'
+    assert len({first.cache_key, second.cache_key, third.cache_key}) == 3
+
+
+def test_run_reusing_params_hits_cache(layout, params, workdir):
+    """ each comets object appends its suffix to the log names of params """
+    cache = result_cache(str(workdir / 'results'))
+    c.comets(layout, params).run(cache = cache)
+    sim = c.comets(layout, params)
+    sim.run(cache = cache)
+    assert sim.run_status == 'cached'
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import pandas as pd
+import pytest
+import time
+
+import cometspy as c
+from cometspy.cache import result_cache
+
+
+def test_run_async_matches_run(layout, new_params):
+    serial = c.comets(layout, new_params())
+    serial.run()
+    sim = c.comets(layout, new_params())
+    asyncio.run(sim.run_async())
+    assert sim.run_status == 'finished'
+    pd.testing.assert_frame_equal(sim.total_biomass, serial.total_biomass)
+    pd.testing.assert_frame_equal(sim.biomass, serial.biomass)
+
+
+@pytest.mark.parametrize('is_coroutine', [False, True])
+def test_run_async_streams_stdout(layout, new_params, is_coroutine):
+    lines = []
+    if is_coroutine:
+        async def callback(line):
+            lines.append(line)
+    else:
+        callback = lines.append
+    sim = c.comets(layout, new_params())
+    asyncio.run(sim.run_async(stdout_callback = callback))
+    assert 'Cycle 5' in [line.strip() for line in lines]
+    assert ''.join(lines) == sim.run_output
+
+
+def test_run_async_uses_cache(layout, new_params, workdir):
+    cache = result_cache(str(workdir / 'results'))
+    first = c.comets(layout, new_params())
+    asyncio.run(first.run_async(cache = cache))
+    second = c.comets(layout, new_params())
+    asyncio.run(second.run_async(cache = cache))
+    assert second.run_status == 'cached'
+    assert second.cache_key == first.cache_key
+    pd.testing.assert_frame_equal(second.total_biomass, first.total_biomass)
+
+
+def test_cancelled_task_cleans_up(layout, new_params, workdir, monkeypatch):
+    monkeypatch.setenv('COMETSPY_SYNTHETIC_DELAY', '0.2')
+    sim = c.comets(layout, new_params())
+
+    async def main():
+        task = asyncio.ensure_future(sim.run_async())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main())
+    assert os.listdir(workdir) == []
+
+
+def test_file_work_does_not_block_the_loop(layout, new_params, workdir,
+                                           monkeypatch):
+    cache = result_cache(str(workdir / 'results'))
+    get = cache.get
+
+    def slow_get(key):
+        time.sleep(0.3)
+        return(get(key))
+    monkeypatch.setattr(cache, 'get', slow_get)
+    sim = c.comets(layout, new_params())
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0.05)
+        await sim.run_async(cache = cache)
+        task.cancel()
+
+    asyncio.run(main())
+    assert sim.run_status == 'finished'
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.2
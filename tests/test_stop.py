@@ -0,0 +1,85 @@
+import asyncio
+import os
+import pickle
+import threading
+import time
+import pytest
+
+import cometspy as c
+
+
+@pytest.fixture
+def slow_params(new_params, monkeypatch):
+    """ params of a run taking about 20 * 0.1 s """
+    monkeypatch.setenv('COMETSPY_SYNTHETIC_DELAY', '0.1')
+    params = new_params()
+    params.set_param('maxCycles', 20)
+    return(params)
+
+
+def current_files(directory) -> list:
+    return([f for f in os.listdir(directory) if f.startswith('.current_')])
+
+
+def test_max_wall_time_stops_run(layout, slow_params, workdir):
+    sim = c.comets(layout, slow_params)
+    start = time.monotonic()
+    with pytest.raises(c.CometsTimeoutError) as info:
+        sim.run(max_wall_time = 0.3)
+    assert time.monotonic() - start < 1.5
+    assert info.value.reason == 'max_wall_time'
+    assert sim.run_status == 'max_wall_time'
+    assert 'Cycle 1' in info.value.run_output
+    assert os.listdir(workdir) == []
+
+
+def test_timeout_stops_silent_run(layout, new_params, workdir, monkeypatch):
+    monkeypatch.setenv('COMETSPY_SYNTHETIC_DELAY', '0.5')
+    sim = c.comets(layout, new_params())
+    with pytest.raises(c.CometsTimeoutError) as info:
+        sim.run(timeout = 0.2)
+    assert info.value.reason == 'timeout'
+    assert os.listdir(workdir) == []
+
+
+def test_stopped_run_keeps_logs_if_asked(layout, slow_params, workdir):
+    sim = c.comets(layout, slow_params)
+    with pytest.raises(c.CometsTimeoutError):
+        sim.run(max_wall_time = 0.3, delete_files = False)
+    assert current_files(workdir) == []
+    assert any(f.startswith('total_biomass') for f in os.listdir(workdir))
+
+
+def test_cancel_from_another_thread(layout, slow_params, workdir):
+    sim = c.comets(layout, slow_params)
+    errors = []
+
+    def run():
+        try:
+            sim.run()
+        except c.CometsStoppedError as e:
+            errors.append(e)
+    t = threading.Thread(target = run)
+    t.start()
+    time.sleep(0.3)
+    sim.cancel()
+    t.join(5)
+    assert not t.is_alive()
+    assert len(errors) == 1
+    assert type(errors[0]) is c.CometsStoppedError
+    assert errors[0].reason == 'cancelled'
+    assert sim.run_status == 'cancelled'
+    assert os.listdir(workdir) == []
+
+
+def test_run_async_timeout(layout, slow_params, workdir):
+    sim = c.comets(layout, slow_params)
+    with pytest.raises(c.CometsTimeoutError):
+        asyncio.run(sim.run_async(max_wall_time = 0.3))
+    assert os.listdir(workdir) == []
+
+
+def test_errors_survive_pickling():
+    error = pickle.loads(pickle.dumps(c.CometsTimeoutError('timeout', 2.5, 'out')))
+    assert isinstance(error, c.CometsTimeoutError)
+    assert (error.reason, error.elapsed, error.run_output) == ('timeout', 2.5, 'out')
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cometspy as c
+from cometspy.store import _write_tables, stored_results
+
+
+def as_objects(frame : pd.DataFrame) -> pd.DataFrame:
+    """ frame with Categorical columns turned back into strings """
+    frame = frame.copy()
+    for position, dtype in enumerate(frame.dtypes):
+        if str(dtype) == 'category':
+            frame.isetitem(position, frame.iloc[:, position].astype(object))
+    return(frame)
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_and_load_results_round_trip(sim, workdir, mmap):
+    sim.save_results(str(workdir / 'run_1'))
+    res = c.load_results(str(workdir / 'run_1'), mmap = mmap)
+    assert sorted(res.tables) == ['biomass', 'fluxes_by_species/toy',
+                                  'media', 'total_biomass']
+    pd.testing.assert_frame_equal(res.total_biomass, sim.total_biomass)
+    pd.testing.assert_frame_equal(as_objects(res.media), sim.media)
+    pd.testing.assert_frame_equal(as_objects(res.biomass), sim.biomass)
+    pd.testing.assert_frame_equal(res.fluxes_by_species['toy'],
+                                  sim.fluxes_by_species['toy'])
+
+
+def test_column_reads_single_columns(sim, workdir):
+    sim.save_results(str(workdir / 'run_1'))
+    res = c.load_results(str(workdir / 'run_1'))
+    conc = res.column('media', 'conc_mmol')
+    assert isinstance(conc, np.memmap)
+    np.testing.assert_array_equal(conc, sim.media['conc_mmol'].values)
+    mets = res.column('media', 'metabolite')
+    assert isinstance(mets, pd.Categorical)
+    assert list(mets) == sim.media['metabolite'].tolist()
+    pd.testing.assert_frame_equal(res.read('media', ['cycle', 'conc_mmol']),
+                                  sim.media[['cycle', 'conc_mmol']])
+
+
+def test_unknown_tables_raise(sim, workdir):
+    sim.save_results(str(workdir / 'run_1'))
+    res = c.load_results(str(workdir / 'run_1'))
+    with pytest.raises(AttributeError):
+        res.genotypes
+
+
+def test_save_results_needs_a_run(layout, params, workdir):
+    with pytest.raises(ValueError):
+        c.comets(layout, params).save_results(str(workdir / 'run_1'))
+
+
+def test_labels_need_not_be_unique_strings(workdir):
+    frame = pd.DataFrame([[1., 'x', 2., 3], [4., 'y', 5., 6]],
+                         columns = [0, 'a', 'a', 7.5])
+    _write_tables(str(workdir / 'run_1'), {'table': frame})
+    res = stored_results(str(workdir / 'run_1'))
+    read = as_objects(res.table)
+    assert list(read.columns) == ['0', 'a', 'a', '7.5']
+    read.columns = frame.columns
+    pd.testing.assert_frame_equal(read, frame)
+    np.testing.assert_array_equal(res.column('table', '0'), [1., 4.])
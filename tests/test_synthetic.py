@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+import cometspy as c
+
+
+def test_engine_selection(layout, params, monkeypatch):
+    assert c.comets(layout, params).engine == 'synthetic'
+    assert c.comets(layout, params, engine = 'synthetic').VERSION == 'synthetic'
+    with pytest.raises(ValueError):
+        c.comets(layout, params, engine = 'matlab')
+    monkeypatch.setenv('COMETSPY_ENGINE', 'java')
+    with pytest.raises(ValueError):
+        c.comets(layout, params)
+
+
+def test_runs_are_deterministic(layout, new_params):
+    first = c.comets(layout, new_params())
+    first.run()
+    second = c.comets(layout, new_params())
+    second.run()
+    pd.testing.assert_frame_equal(first.biomass, second.biomass)
+    pd.testing.assert_frame_equal(first.fluxes, second.fluxes)
+
+
+def test_logs_follow_layout_and_params(layout, new_params):
+    params = new_params()
+    params.set_param('maxCycles', 6)
+    params.set_param('BiomassLogRate', 2)
+    sim = c.comets(layout, params)
+    sim.run()
+    assert 'End of simulation' in sim.run_output
+    assert sim.total_biomass['cycle'].tolist() == list(range(7))
+    # two founders, logged every other cycle
+    assert sim.biomass['cycle'].tolist() == [2, 2, 4, 4, 6, 6]
+    assert sorted(set(zip(sim.biomass['x'], sim.biomass['y']))) == [(1, 1), (3, 3)]
+    assert (sim.total_biomass['toy'].diff().dropna() > 0).all()
+    assert list(sim.fluxes_by_species['toy'].columns[3:]) == \
+        list(layout.models[0].reactions.REACTION_NAMES)
+
+
+def test_evolution_writes_genotypes(layout, new_params):
+    params = new_params()
+    params.set_param('evolution', True)
+    sim = c.comets(layout, params)
+    sim.run()
+    assert sim.genotypes['Species'].tolist() == ['toy']
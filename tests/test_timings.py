@@ -0,0 +1,36 @@
+import logging
+
+import cometspy as c
+from cometspy.cache import result_cache
+
+
+def test_run_records_timings(sim):
+    seconds = sim.timings['seconds']
+    for phase in ['write_layout', 'write_params', 'jvm_startup', 'simulation',
+                  'read_total_biomass', 'read_media', 'total']:
+        assert phase in seconds
+        assert seconds[phase] >= 0
+    assert seconds['total'] >= seconds['simulation']
+    assert any(name.startswith('.current_layout')
+               for name in sim.timings['bytes_written'])
+    assert all(size > 0 for size in sim.timings['bytes_read'].values())
+
+
+def test_cached_run_records_lookup(layout, new_params, workdir):
+    cache = result_cache(str(workdir / 'results'))
+    c.comets(layout, new_params()).run(cache = cache)
+    sim = c.comets(layout, new_params())
+    sim.run(cache = cache)
+    assert 'cache_lookup' in sim.timings['seconds']
+    assert 'simulation' not in sim.timings['seconds']
+
+
+def test_timings_hook_and_log(layout, new_params, monkeypatch, caplog):
+    seen = []
+    monkeypatch.setattr(c.comets, 'timings_hook', seen.append)
+    sim = c.comets(layout, new_params())
+    with caplog.at_level(logging.INFO, logger = 'cometspy.comets'):
+        sim.run()
+    assert seen == [sim]
+    record, = [r for r in caplog.records if r.name == 'cometspy.comets']
+    assert record.timings is sim.timings
@@ -0,0 +1,47 @@
+import pytest
+
+import cometspy as c
+
+
+def test_to_layout_takes_biomass_and_media(sim):
+    layout = sim.to_layout(3)
+    biomass = sim.biomass[sim.biomass['cycle'] == 3]
+    assert sorted(layout.models[0].initial_pop) == sorted(
+        [x - 1, y - 1, b] for x, y, b in
+        zip(biomass['x'], biomass['y'], biomass['biomass']))
+    media = sim.media[(sim.media['cycle'] == 3) &
+                      (sim.media['metabolite'] == 'glc__D_e')]
+    for x, y, conc in zip(media['x'], media['y'], media['conc_mmol']):
+        assert layout.local_media[(x - 1, y - 1)]['glc__D_e'] == conc
+    # the static nh4_e is still static, and everything else starts at 0
+    media = layout.media.set_index('metabolite')
+    assert media.loc['nh4_e', 'g_static'] == 1
+    assert media.loc['nh4_e', 'g_static_val'] == 1000.
+    assert media.loc['glc__D_e', 'init_amount'] == 0.
+    # the simulation itself is unchanged
+    assert sim.layout.models[0].initial_pop == [[0, 0, 1.e-4], [2, 2, 2.e-4]]
+
+
+def test_to_layout_defaults_to_last_cycle(sim):
+    assert (sorted(sim.to_layout().models[0].initial_pop) ==
+            sorted(sim.to_layout(5).models[0].initial_pop))
+
+
+def test_to_layout_needs_logged_cycle(sim, layout, params):
+    with pytest.raises(ValueError):
+        sim.to_layout(99)
+    params.set_param('writeMediaLog', False)
+    unlogged = c.comets(layout, params)
+    unlogged.run()
+    with pytest.raises(ValueError):
+        unlogged.to_layout()
+
+
+def test_continue_run_starts_from_last_state(sim):
+    more = sim.continue_run(3)
+    assert more.run_status == 'finished'
+    assert more.total_biomass['cycle'].tolist() == [0, 1, 2, 3]
+    assert (more.total_biomass['toy'].iloc[0] ==
+            pytest.approx(sim.total_biomass['toy'].iloc[-1]))
+    assert more.parameters.all_params['maxCycles'] == 3
+    assert sim.parameters.all_params['maxCycles'] == 5
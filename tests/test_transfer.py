@@ -0,0 +1,106 @@
+import os
+import numpy as np
+import pytest
+
+import cometspy as c
+from cometspy.transfer import (serial_transfer, dilute, replace_media,
+                               reinoculate)
+
+
+def totals(experiment, transfer : int):
+    frame = experiment.total_biomass
+    return(frame.loc[frame['transfer'] == transfer, 'toy'].values)
+
+
+def test_cycles_are_continuous(layout, params):
+    experiment = serial_transfer(layout, params, 3)
+    experiment.run()
+    frame = experiment.total_biomass
+    assert frame['transfer'].tolist() == [0] * 6 + [1] * 6 + [2] * 6
+    cycles = frame['cycle'].values
+    assert (np.diff(cycles) >= 0).all()
+    assert sorted(set(cycles)) == list(range(16))
+    # cycle 0 of each later run is the end of the run before
+    assert frame.loc[frame['transfer'] == 1, 'cycle'].iloc[0] == 5
+    assert totals(experiment, 1)[0] == pytest.approx(totals(experiment, 0)[-1])
+    for name in ['biomass', 'media']:
+        log = getattr(experiment, name)
+        assert log['cycle'].max() == 15
+        assert sorted(log['transfer'].unique()) == [0, 1, 2]
+    fluxes = experiment.fluxes_by_species['toy']
+    assert sorted(set(fluxes['cycle'])) == list(range(1, 16))
+    assert len(experiment.run_outputs) == 3
+
+
+def test_dilute_and_replace_media(layout, params):
+    experiment = serial_transfer(layout, params, 2,
+                                 [dilute(0.1), replace_media({'glc__D_e': 0.02})])
+    experiment.run()
+    assert totals(experiment, 1)[0] == pytest.approx(0.1 * totals(experiment, 0)[-1])
+    layout = experiment.sim.layout
+    assert all(amounts['glc__D_e'] == 0.02
+               for amounts in layout.local_media.values())
+    media = layout.media.set_index('metabolite')
+    assert media.loc['glc__D_e', 'init_amount'] == 0.02
+    assert media.loc['nh4_e', 'g_static_val'] == 1000.
+
+
+def test_reinoculate(layout, params):
+    experiment = serial_transfer(layout, params, 2,
+                                 reinoculate('toy', 1.e-3, (1, 1)))
+    experiment.run()
+    assert [1, 1, 1.e-3] in experiment.sim.layout.models[0].initial_pop
+    assert totals(experiment, 1)[0] == pytest.approx(totals(experiment, 0)[-1] + 1.e-3)
+
+
+def test_runs_leave_no_files(layout, params, workdir):
+    serial_transfer(layout, params, 2).run()
+    assert os.listdir(workdir) == []
+
+
+def test_failed_transfer_leaves_no_files(layout, params, workdir):
+    experiment = serial_transfer(layout, params, 2,
+                                 reinoculate('toy', 1.e-3, (7, 7)))
+    with pytest.raises(ValueError):
+        experiment.run()
+    assert os.listdir(workdir) == []
+
+
+def test_changed_models_are_written_again(layout, params, workdir):
+    bounds = []
+
+    def limit_growth(layout, index):
+        layout.models[0].change_bounds('Biomass', 0., 1. / index)
+
+    def record(layout, index):
+        bounds.append(c.model('toy.cmd').reactions.set_index(
+            'REACTION_NAMES').loc['Biomass', 'UB'])
+    experiment = serial_transfer(layout, params, 3, [record, limit_growth])
+    experiment.run(delete_files = False)
+    # as written for the run before each transfer, then after the last
+    bounds.append(c.model('toy.cmd').reactions.set_index(
+        'REACTION_NAMES').loc['Biomass', 'UB'])
+    assert bounds == [1000., 1., 0.5]
+
+
+def test_failed_run_keeps_finished_runs(layout, params):
+    def fail(layout, index):
+        if index == 2:
+            raise RuntimeError('contaminated')
+    experiment = serial_transfer(layout, params, 3, fail)
+    with pytest.raises(RuntimeError):
+        experiment.run()
+    for name in ['total_biomass', 'biomass', 'media']:
+        assert sorted(getattr(experiment, name)['transfer'].unique()) == [0, 1]
+    assert sorted(set(experiment.fluxes_by_species['toy']['transfer'])) == [0, 1]
+
+
+def test_log_rates_must_divide_max_cycles(layout, params):
+    params.set_param('BiomassLogRate', 2)
+    with pytest.raises(ValueError):
+        serial_transfer(layout, params, 2)
+
+
+def test_stream_to_is_not_supported(layout, params):
+    with pytest.raises(ValueError):
+        serial_transfer(layout, params, 2).run(stream_to = 'runs')